@@ -2,10 +2,17 @@
 import os
 import pkgutil
 import importlib
+import importlib.util
+import contextlib
+import hashlib
 import sys
-from typing import Type
+from typing import Dict, List, Tuple, Type
 from app.commands import CommandHandler, Command
 from app.plugins.menu import MenuCommand
+from app.calculator import Calculator
+from app.calculator.limits import OperationLimits
+from app.jobs import scheduler
+from app.utils.trace import TraceRecorder
 from dotenv import load_dotenv
 import logging
 import logging.config
@@ -19,7 +26,14 @@ class App:
         load_dotenv()
         self.settings = self.load_environment_variables()
         self.settings.setdefault('ENVIRONMENT', 'PRODUCTION')
+        self.configure_limits()
+        self.configure_history()
+        self.configure_vectors()
+        self.configure_numbers()
         self.command_handler = CommandHandler()
+        # Plugin name -> (file stat signature, content hash) as loaded, for reload_plugins
+        self.plugin_versions: Dict[str, Tuple[tuple, str]] = {}
+        self.configure_jobs()
 
     def configure_logging(self):
         logging_conf_path = 'logging.conf'
@@ -34,6 +48,86 @@ class App:
         logging.info("Environment variables loaded.")
         return settings
 
+    def configure_limits(self):
+        '''Apply per-operation resource limits from CALC_MAX_SECONDS ('none' for no time limit), CALC_MAX_DIGITS, CALC_MAX_EXPONENT and CALC_MAX_STEPS, and the reduction worker count from CALC_REDUCE_WORKERS'''
+        defaults = OperationLimits()
+        max_seconds = self.settings.get('CALC_MAX_SECONDS', '').strip().lower()
+        Calculator.limits = OperationLimits(
+            max_seconds=None if max_seconds == 'none' else self.parse_limit('CALC_MAX_SECONDS', float, defaults.max_seconds),
+            max_digits=self.parse_limit('CALC_MAX_DIGITS', int, defaults.max_digits),
+            max_exponent=self.parse_limit('CALC_MAX_EXPONENT', int, defaults.max_exponent),
+            max_steps=self.parse_limit('CALC_MAX_STEPS', int, defaults.max_steps),
+            # A heavy calculation at a time for each background job, plus one for the foreground
+            workers=self.parse_limit('CALC_JOB_WORKERS', int, scheduler.max_workers) + 1)
+        Calculator.cells.limits = Calculator.limits
+        Calculator.reduce_workers = self.parse_limit('CALC_REDUCE_WORKERS', int, Calculator.reduce_workers)
+        logging.info("Operation limits configured.")
+
+    def configure_history(self):
+        '''Apply the history recording policy from CALC_HISTORY_POLICY (full, sampled[:N], aggregate or off)'''
+        policy = self.settings.get('CALC_HISTORY_POLICY', '').strip()
+        if not policy:
+            return
+        try:
+            Calculator.history.parse_policy(policy)
+            logging.info(f"History recording policy set to '{policy}'.")
+        except ValueError:
+            logging.warning(f"Invalid CALC_HISTORY_POLICY '{policy}'; keeping '{Calculator.history.policy.value}'.")
+
+    def configure_vectors(self):
+        '''Read vectors and matrices as exact Decimals or as floats, from CALC_VECTOR_MODE (exact or float)'''
+        mode = self.settings.get('CALC_VECTOR_MODE', '').strip().lower()
+        if not mode:
+            return
+        if mode not in ('exact', 'float'):
+            logging.warning(f"Invalid CALC_VECTOR_MODE '{mode}'; keeping '{'exact' if Calculator.vector_exact else 'float'}'.")
+            return
+        Calculator.vector_exact = mode == 'exact'
+        logging.info(f"Vector mode set to '{mode}'.")
+
+    def configure_numbers(self):
+        '''Compute + - * / and cell formulas with rounded Decimals or exact Rationals, from CALC_NUMBER_MODE (decimal or rational)'''
+        mode = self.settings.get('CALC_NUMBER_MODE', '').strip().lower()
+        if not mode:
+            return
+        if mode not in ('decimal', 'rational'):
+            logging.warning(f"Invalid CALC_NUMBER_MODE '{mode}'; keeping '{'rational' if Calculator.rational else 'decimal'}'.")
+            return
+        Calculator.rational = Calculator.cells.rational = mode == 'rational'
+        logging.info(f"Number mode set to '{mode}'.")
+
+    def configure_jobs(self):
+        '''Run background jobs ('command &') with this App's commands, at most CALC_JOB_WORKERS at a time'''
+        scheduler.configure(self.command_handler, self.parse_limit('CALC_JOB_WORKERS', int, scheduler.max_workers))
+        logging.info(f"Background jobs limited to {scheduler.max_workers} at a time.")
+
+    def start_capture(self):
+        '''Open a trace recorder if CALC_CAPTURE names a trace file (.gz to compress), for replay with app.utils.trace'''
+        path = self.settings.get('CALC_CAPTURE', '').strip()
+        if not path:
+            return None
+        try:
+            recorder = TraceRecorder(path)
+        except OSError as e:
+            logging.warning(f"Cannot capture to CALC_CAPTURE '{path}': {e}")
+            return None
+        logging.info(f"Capturing commands to '{path}'.")
+        return recorder
+
+    def parse_limit(self, env_var: str, convert, default_value):
+        '''Read a positive limit from the settings, falling back to default_value with a warning if it is malformed'''
+        raw_value = self.settings.get(env_var)
+        if raw_value is None or not raw_value.strip():
+            return default_value
+        try:
+            value = convert(raw_value)
+            if not value > 0:
+                raise ValueError(raw_value)
+            return value
+        except ValueError:
+            logging.warning(f"Invalid {env_var} '{raw_value}'; using default {default_value}.")
+            return default_value
+
     def get_environment_variable(self, env_var: str = 'ENVIRONMENT', default_value = None):
         return self.settings.get(env_var, default_value)
 
@@ -49,6 +143,8 @@ class App:
                 try:
                     plugin_module = importlib.import_module(f'{plugins_package}.{plugin_name}')
                     self.register_plugin_commands(plugin_module, plugin_name)
+                    plugin_path = os.path.join(plugins_path, plugin_name)
+                    self.plugin_versions[plugin_name] = (_plugin_signature(plugin_path), _plugin_digest(plugin_path))
                 except ImportError as e:
                     logging.error(f"Error importing plugin {plugin_name}: {e}")
                 except Exception as e:
@@ -56,31 +152,98 @@ class App:
 
     def register_plugin_commands(self, plugin_module, plugin_name):
         '''Register commands from a plugin module'''
+        for command_name, command in self.plugin_commands(plugin_module, plugin_name).items():
+            self.command_handler.register_command(command_name, command)
+
+    def plugin_commands(self, plugin_module, plugin_name) -> Dict[str, Command]:
+        '''Instantiate the commands a plugin module defines, keyed by the plugin name they are registered under'''
+        commands = {}
         for item_name in dir(plugin_module):
             item = getattr(plugin_module, item_name)
             if isinstance(item, type) and issubclass(item, Command) and item is not Command:
-                # Register all commands except MenuCommand
-                if plugin_name != "menu":
-                    self.command_handler.register_command(plugin_name, item())
-                    logging.info(f"Command '{item_name}' from plugin '{plugin_name}' registered.")
+                if plugin_name == "menu":
+                    # MenuCommand lists the registered commands, so it gets the CommandHandler
+                    commands[plugin_name] = item(self.command_handler)
+                elif plugin_name == "reload":
+                    # ReloadCommand reloads this App's plugins
+                    commands[plugin_name] = item(self)
                 else:
-                    # Register MenuCommand specifically for "menu" plugin
-                    self.command_handler.register_command(plugin_name, MenuCommand(self.command_handler))
-                    logging.info(f"Command 'MenuCommand' from plugin '{plugin_name}' registered.")
+                    commands[plugin_name] = item()
+                logging.info(f"Command '{item_name}' from plugin '{plugin_name}' registered.")
+        return commands
+
+    def reload_plugins(self) -> Dict[str, List[str]]:
+        '''
+        Pick up plugin packages added, changed or removed since they were loaded, without restarting.
+
+        A package counts as changed when the size or mtime of one of its files has changed and its
+        content hash differs too (so touching a file reloads nothing). Only new and changed packages
+        are imported, each into a fresh module, and their commands replace the old ones in a single
+        swap of the command table; commands already running finish on the old version. A package
+        that fails to import keeps its old version. Returns the names loaded, reloaded and removed.
+        '''
+        plugins_package = 'app.plugins'
+        plugins_path = plugins_package.replace('.', '/')
+        changes = {'loaded': [], 'reloaded': [], 'removed': []}
+        present = {plugin_name for _, plugin_name, is_pkg in pkgutil.iter_modules([plugins_path]) if is_pkg}
+        updates = {}
+        for plugin_name in sorted(present):
+            plugin_path = os.path.join(plugins_path, plugin_name)
+            signature = _plugin_signature(plugin_path)
+            known = self.plugin_versions.get(plugin_name)
+            if known is not None and known[0] == signature:
+                continue
+            digest = _plugin_digest(plugin_path)
+            if known is not None and known[1] == digest:
+                self.plugin_versions[plugin_name] = (signature, digest)
+                continue
+            try:
+                plugin_module = _import_fresh(f'{plugins_package}.{plugin_name}')
+                updates.update(self.plugin_commands(plugin_module, plugin_name))
+            except Exception as e:
+                logging.error(f"Error reloading plugin {plugin_name}: {e}")
+                continue
+            self.plugin_versions[plugin_name] = (signature, digest)
+            changes['reloaded' if known is not None else 'loaded'].append(plugin_name)
+        changes['removed'] = sorted(set(self.plugin_versions) - present)
+        for plugin_name in changes['removed']:
+            del self.plugin_versions[plugin_name]
+        self.command_handler.replace_commands(updates, changes['removed'])
+        logging.info(f"Plugins reloaded: {changes}")
+        return changes
+
+    def start_job(self, cmd_input: str):
+        '''Run a command line in the background and print its job id'''
+        try:
+            job = scheduler.submit(cmd_input)
+        except (KeyError, ValueError) as e:  # unknown command, or unbalanced quotes
+            logging.error(f"Cannot start job '{cmd_input}': {e}")
+            print(f"Cannot start job: {e.args[0] if e.args else cmd_input}")
+            return None
+        logging.info(f"Job {job.id} started: {cmd_input}")
+        print(f"[{job.id}] started")
+        return job
 
     def start(self):
         '''Register commands from plugin module'''
         self.load_plugins()
         logging.info("Application started.\n")
         print("Welcome to my basic calculator program.\n\tType 'menu' to see available commands. Type 'exit' to quit application.")
+        recorder = self.start_capture()
         try:
             while True:  #REPL Read, Evaluate, Print, Loop
+                for job in scheduler.finished():
+                    print(job)
                 cmd_input = input(">>> ").strip()
                 if cmd_input.lower() == 'exit':
                     logging.info("Application exit.")
                     sys.exit(0)  # Use sys.exit(0) for a clean exit, indicating success.
+                if cmd_input.endswith('&'):
+                    self.start_job(cmd_input[:-1].strip())
+                    continue
                 try:
-                    self.command_handler.execute_command(cmd_input)
+                    with recorder.command(cmd_input) if recorder else contextlib.nullcontext():
+                        self.command_handler.execute_command(cmd_input)
                 except KeyError: # Assuming execute_command raises KeyError for unknown commands
                     logging.error(f"Unknown command: {cmd_input}")
                     continue  # Continue prompting for input
@@ -88,4 +251,54 @@ class App:
             logging.info("Application interrupted and exiting gracefully.")
             sys.exit(0) # Assuming a KeyboardInterrupt should also result in a clean exit.
         finally:
+            scheduler.shutdown()
+            if recorder:
+                recorder.close()
+                logging.info(f"Captured {recorder.records} commands to '{recorder.path}'.")
             logging.info("Application shutdown.")
+
+def _plugin_files(plugin_path: str) -> List[str]:
+    '''The source files of a plugin package, in a stable order'''
+    files = []
+    for directory, subdirectories, names in os.walk(plugin_path):
+        subdirectories[:] = sorted(name for name in subdirectories if name != '__pycache__')
+        files.extend(os.path.join(directory, name) for name in sorted(names) if name.endswith('.py'))
+    return files
+
+def _plugin_signature(plugin_path: str) -> tuple:
+    '''Cheap change check for a plugin package: the path, size and mtime of each of its files'''
+    signature = []
+    for path in _plugin_files(plugin_path):
+        stat = os.stat(path)
+        signature.append((path, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+def _plugin_digest(plugin_path: str) -> str:
+    '''Hash of the names and contents of a plugin package's files'''
+    digest = hashlib.sha256()
+    for path in _plugin_files(plugin_path):
+        digest.update(path.encode('utf-8'))
+        with open(path, 'rb') as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+def _import_fresh(module_name: str):
+    '''
+    Import a package and its submodules as new module objects, leaving the old ones to whoever holds them.
+
+    Cached bytecode is dropped first: it is validated by whole-second mtime and size, which an edit
+    can leave unchanged. If the import fails, the old modules are put back.
+    '''
+    old_modules = {name: module for name, module in sys.modules.items() if name == module_name or name.startswith(module_name + '.')}
+    for name, module in old_modules.items():
+        del sys.modules[name]
+        source = getattr(module, '__file__', None)
+        if source and source.endswith('.py'):
+            with contextlib.suppress(OSError):
+                os.remove(importlib.util.cache_from_source(source))
+    importlib.invalidate_caches()
+    try:
+        return importlib.import_module(module_name)
+    except BaseException:
+        sys.modules.update(old_modules)
+        raise
@@ -1,19 +1,155 @@
 '''app/calculator/__init__.py : Imports and integrates various modules and functions needed for the calculator. Defines a class with methods for performing arithmetic operations, managing calculations and history.'''
+import threading
+from contextlib import contextmanager
 from decimal import Decimal
-from typing import Callable
-from app.calculator.calculation import Calculation
+from typing import Callable, Iterable, Optional
+from app.calculator.calculation import Calculation, ReductionCalculation
 from app.calculator.operations import Operations as op
-from app.calculator.calc_history import CalculationHistory as his
+from app.calculator.scientific import ScientificOperations as sci
+from app.calculator.stats import StreamSummary, describe
+from app.calculator.vectors import Matrix, VectorOperations as vec
+from app.calculator.calc_history import CalculationHistory, RecordingPolicy
+from app.calculator.limits import OperationLimits, OperationAborted
+from app.calculator.cells import CellSheet
+from app.calculator.rational import Rational
+from app.events import CALCULATION_EVENTS, bus
 
 class Calculator:
     '''Serves as a core componet of a basic calculator system. Integrates components for performing arithmetic calculations and managing history.'''
+    # Resource limits applied to every calculation; replace to change them for the session.
+    limits = OperationLimits()
+    # Chunk size and worker processes used by the n-ary reductions; workers <= 1 reduces inline.
+    reduce_chunk_size = 4096
+    reduce_workers = 1
+    # Size (accuracy) and seed of the quantile sketch used by stats; a fixed seed gives reproducible quantiles
+    stats_sketch_size = 200
+    stats_seed = 0
+    # Vectors and matrices are read as exact Decimals, or as floats (computed with NumPy when installed)
+    vector_exact = True
+    # Exact rational mode: + - * / work on Rationals, shown as Decimals rounded to the context only when printed
+    rational = False
+    # Named cells for the session (set/let commands)
+    cells = CellSheet()
+    # Per-thread cancel event set by Calculator.cancellable
+    _cancel = threading.local()
+    # The default session's calculation history; Calculator.session binds another one to the current thread
+    history = CalculationHistory()
+    _session = threading.local()
 
     @staticmethod
-    def _perform_calculation(a: Decimal, b: Decimal, operation: Callable[[Decimal, Decimal], Decimal]) -> Decimal:
-        '''Performs a calculation with the given operands and operation, and returns the result'''
-        calculation = Calculation.create_calculation(a, b, operation)
-        his.add_calculation(calculation)
-        return calculation.compute()
+    @contextmanager
+    def session(history: Optional[CalculationHistory] = None):
+        '''Calculations made by this thread inside the with block are recorded in history (a new, empty one by default)'''
+        history = CalculationHistory() if history is None else history
+        previous = getattr(Calculator._session, 'history', None)
+        Calculator._session.history = history
+        try:
+            yield history
+        finally:
+            Calculator._session.history = previous
+
+    @staticmethod
+    def session_history() -> CalculationHistory:
+        '''The history calculations made by the current thread are recorded in'''
+        history = getattr(Calculator._session, 'history', None)
+        return Calculator.history if history is None else history
+
+    @staticmethod
+    @contextmanager
+    def cancellable(cancel_event: threading.Event):
+        '''Calculations run by this thread inside the with block are cancelled when cancel_event is set'''
+        previous = getattr(Calculator._cancel, 'event', None)
+        Calculator._cancel.event = cancel_event
+        try:
+            yield cancel_event
+        finally:
+            Calculator._cancel.event = previous
+
+    @staticmethod
+    def _cancel_event() -> Optional[threading.Event]:
+        '''The cancel event for the current thread, if any'''
+        return getattr(Calculator._cancel, 'event', None)
+
+    @staticmethod
+    def _perform_calculation(a: Decimal, b: Optional[Decimal], operation: Callable[[Decimal, Decimal], Decimal],
+                             runner: Optional[Callable] = None) -> Decimal:
+        '''
+        Performs a calculation with the given operands and operation, and returns the result.
+
+        runner checks and runs the calculation within the limits; it defaults to limits.run, and batched
+        operands such as matrices use limits.run_batch.
+        What is recorded follows the history's recording policy; a Calculation is only created when an entry
+        is stored, and with the policy off nothing is counted or created. Aborted calculations are not recorded.
+        '''
+        runner = runner or Calculator.limits.run
+        if Calculator.rational and operation in _RATIONAL_OPERATIONS:
+            a, b = Calculator._exact(a, b)
+        his = Calculator.session_history()
+        if his.policy is RecordingPolicy.OFF:
+            return runner(a, b, operation, Calculator._cancel_event())
+        try:
+            result = runner(a, b, operation, Calculator._cancel_event())
+        except OperationAborted:
+            raise
+        except Exception:
+            if his.record(operation):
+                his.add_calculation(Calculation.create_calculation(a, b, operation))
+            raise
+        if his.record(operation):
+            his.add_calculation(Calculation.create_calculation(a, b, operation))
+        return result
+
+    @staticmethod
+    def _exact(a, b):
+        '''
+        Both operands as Rationals; a NaN or infinite operand leaves both as Decimals, which have no exact fraction.
+        Decimal operands are checked against the limits first, as the exact fraction of 1E+99999999 is itself
+        too large to build quickly.
+        '''
+        operands = (a, b)
+        if any(isinstance(operand, Decimal) and not operand.is_finite() for operand in operands):
+            return tuple(operand.to_decimal() if isinstance(operand, Rational) else operand for operand in operands)
+        for operand in operands:
+            if isinstance(operand, Decimal):
+                Calculator.limits.check_operand(operand)
+        return Rational.exact(a), Rational.exact(b)
+
+    @staticmethod
+    def _perform_calculation_with_hooks(a: Decimal, b: Optional[Decimal], operation: Callable[[Decimal, Decimal], Decimal],
+                                        runner: Optional[Callable] = None) -> Decimal:
+        '''_perform_calculation, publishing calculation.before, calculation.after (with the result) and calculation.error events'''
+        bus.publish('calculation.before', a=a, b=b, operation=operation.__name__)
+        try:
+            result = Calculator._perform_plain(a, b, operation, runner)
+        except Exception as e:
+            bus.publish('calculation.error', a=a, b=b, operation=operation.__name__, error=e)
+            raise
+        bus.publish('calculation.after', a=a, b=b, operation=operation.__name__, result=result)
+        return result
+
+    # The hook-free version, swapped back in when the calculation events lose their last subscriber
+    _perform_plain = _perform_calculation
+
+    @staticmethod
+    def _perform_reduction(values: Iterable[Decimal], operation: Callable[[Iterable[Decimal]], Decimal], **options) -> Decimal:
+        '''Performs an n-ary reduction over a stream of values, records it as a single history entry, and returns the result; options are passed on to the operation'''
+        his = Calculator.session_history()
+        count = 0
+        def counted(items):
+            nonlocal count
+            for item in items:
+                count += 1
+                yield item
+        try:
+            result = Calculator.limits.reduce(counted(values), operation, Calculator._cancel_event(),
+                                              chunk_size=Calculator.reduce_chunk_size, workers=Calculator.reduce_workers, **options)
+        except ValueError as e:
+            if his.record(operation):
+                his.add_calculation(ReductionCalculation(operation, count, error=str(e)))
+            raise
+        if his.record(operation):
+            his.add_calculation(ReductionCalculation(operation, count, result))
+        return result
 
     @staticmethod
     def add(a: Decimal, b: Decimal) -> Decimal:
@@ -34,3 +170,107 @@ class Calculator:
     def divide(a: Decimal, b: Decimal) -> Decimal:
         '''Perform division by delegating to the perform_calculation method'''
         return Calculator._perform_calculation(a, b, op.division)
+
+    @staticmethod
+    def power(a: Decimal, b: Decimal) -> Decimal:
+        '''Raise a to the power b by delegating to the perform_calculation method'''
+        return Calculator._perform_calculation(a, b, sci.power)
+
+    @staticmethod
+    def root(a: Decimal, b: Decimal) -> Decimal:
+        '''Take the b-th root of a by delegating to the perform_calculation method'''
+        return Calculator._perform_calculation(a, b, sci.root)
+
+    @staticmethod
+    def sqrt(a: Decimal) -> Decimal:
+        '''Take the square root of a by delegating to the perform_calculation method'''
+        return Calculator._perform_calculation(a, None, sci.square_root)
+
+    @staticmethod
+    def exp(a: Decimal) -> Decimal:
+        '''Raise e to the power a by delegating to the perform_calculation method'''
+        return Calculator._perform_calculation(a, None, sci.exponential)
+
+    @staticmethod
+    def ln(a: Decimal) -> Decimal:
+        '''Take the natural logarithm of a by delegating to the perform_calculation method'''
+        return Calculator._perform_calculation(a, None, sci.natural_log)
+
+    @staticmethod
+    def log10(a: Decimal) -> Decimal:
+        '''Take the base-10 logarithm of a by delegating to the perform_calculation method'''
+        return Calculator._perform_calculation(a, None, sci.log10)
+
+    @staticmethod
+    def log(a: Decimal, b: Decimal) -> Decimal:
+        '''Take the logarithm of a in base b by delegating to the perform_calculation method'''
+        return Calculator._perform_calculation(a, b, sci.logarithm)
+
+    @staticmethod
+    def vector_add(a: Matrix, b: Matrix) -> Matrix:
+        '''Add element-wise by delegating to the perform_calculation method; one history entry for the whole operation'''
+        return Calculator._perform_calculation(a, b, vec.vector_addition, Calculator.limits.run_batch)
+
+    @staticmethod
+    def vector_subtract(a: Matrix, b: Matrix) -> Matrix:
+        '''Subtract element-wise by delegating to the perform_calculation method; one history entry for the whole operation'''
+        return Calculator._perform_calculation(a, b, vec.vector_subtraction, Calculator.limits.run_batch)
+
+    @staticmethod
+    def vector_multiply(a: Matrix, b: Matrix) -> Matrix:
+        '''Multiply element-wise by delegating to the perform_calculation method; one history entry for the whole operation'''
+        return Calculator._perform_calculation(a, b, vec.vector_multiplication, Calculator.limits.run_batch)
+
+    @staticmethod
+    def vector_divide(a: Matrix, b: Matrix) -> Matrix:
+        '''Divide element-wise by delegating to the perform_calculation method; one history entry for the whole operation'''
+        return Calculator._perform_calculation(a, b, vec.vector_division, Calculator.limits.run_batch)
+
+    @staticmethod
+    def dot(a: Matrix, b: Matrix) -> Decimal:
+        '''Take the dot product of two vectors by delegating to the perform_calculation method'''
+        return Calculator._perform_calculation(a, b, vec.dot_product, Calculator.limits.run_batch)
+
+    @staticmethod
+    def matmul(a: Matrix, b: Matrix) -> Matrix:
+        '''Multiply two matrices by delegating to the perform_calculation method'''
+        return Calculator._perform_calculation(a, b, vec.matrix_multiplication, Calculator.limits.run_batch)
+
+    @staticmethod
+    def sum(values: Iterable[Decimal]) -> Decimal:
+        '''Sum many values by delegating to the perform_reduction method'''
+        return Calculator._perform_reduction(values, op.summation)
+
+    @staticmethod
+    def product(values: Iterable[Decimal]) -> Decimal:
+        '''Multiply many values by delegating to the perform_reduction method'''
+        return Calculator._perform_reduction(values, op.product)
+
+    @staticmethod
+    def mean(values: Iterable[Decimal]) -> Decimal:
+        '''Average many values by delegating to the perform_reduction method'''
+        return Calculator._perform_reduction(values, op.mean)
+
+    @staticmethod
+    def min(values: Iterable[Decimal]) -> Decimal:
+        '''Find the smallest of many values by delegating to the perform_reduction method'''
+        return Calculator._perform_reduction(values, op.minimum)
+
+    @staticmethod
+    def max(values: Iterable[Decimal]) -> Decimal:
+        '''Find the largest of many values by delegating to the perform_reduction method'''
+        return Calculator._perform_reduction(values, op.maximum)
+
+    @staticmethod
+    def stats(values: Iterable[Decimal]) -> StreamSummary:
+        '''Summarize many values (count, mean, variance, min, max, quantiles) in one pass by delegating to the perform_reduction method'''
+        return Calculator._perform_reduction(values, describe, k=Calculator.stats_sketch_size, seed=Calculator.stats_seed)
+
+# The operations that stay exact on Rationals in rational mode
+_RATIONAL_OPERATIONS = (op.addition, op.subtraction, op.multiplication, op.division)
+
+def _select_dispatch(hooked: bool) -> None:
+    '''Use the hooked _perform_calculation only while someone subscribes to calculation events'''
+    Calculator._perform_calculation = Calculator.__dict__['_perform_calculation_with_hooks' if hooked else '_perform_plain']
+
+bus.watch(CALCULATION_EVENTS, _select_dispatch)
@@ -1,31 +1,250 @@
-'''app/calculator/calc_history.py: Manages history of calculations. Contains methods for adding to, clearing, and retrieving calculation history.'''
-from typing import List
-from app.calculator.calculation import Calculation
+'''app/calculator/calc_history.py: Manages per-session history of calculations. Contains methods for adding to, clearing, and retrieving calculation history (as copy-on-write snapshots, or a page at a time), plus memory accounting and opt-in operand interning and deduplication.'''
+import sys
+import threading
+from array import array
+from decimal import Decimal
+from collections.abc import Sequence
+from enum import Enum
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from app.calculator.calculation import Calculation, RepeatedCalculation
+from app.calculator.vectors import Matrix
+from app.calculator.rational import Rational
+
+def entry_bytes(entry, seen: Optional[Set[int]] = None) -> int:
+    '''
+    Bytes held by one history entry: the object plus the Decimals, Rationals, arrays and matrices it references.
+
+    Objects whose id is already in seen are not counted again, so operands shared between entries
+    (e.g. interned ones) are only counted once; seen is updated in place.
+    '''
+    seen = set() if seen is None else seen
+    total = sys.getsizeof(entry)
+    attributes = dict(getattr(entry, '__dict__', {}))
+    if hasattr(entry, '__dict__'):
+        total += sys.getsizeof(entry.__dict__)
+    for cls in type(entry).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            attributes[name] = getattr(entry, name, None)
+    for value in attributes.values():
+        if isinstance(value, (Decimal, Rational, array, Matrix)) and id(value) not in seen:
+            seen.add(id(value))
+            total += sys.getsizeof(value)
+    return total
+
+class RecordingPolicy(Enum):
+    '''What the Calculator records for each calculation'''
+    FULL = 'full'            # every calculation is stored
+    SAMPLED = 'sampled'      # one calculation in every sample_rate is stored; all are counted
+    AGGREGATE = 'aggregate'  # calculations are only counted, per operation
+    OFF = 'off'              # nothing is stored or counted
+
+class HistorySnapshot(Sequence):
+    '''
+    A read-only view of the history as it was when the snapshot was taken, made in O(1).
+
+    The history only ever appends to its entry list and starts a new list when it is cleared, so a
+    snapshot is just the list and its length at that moment: later appends and clears are not seen,
+    and nothing is copied. (A deduplicated record's repeat count is the one exception: it keeps counting.)
+    '''
+    __slots__ = ('_entries', '_length')
+
+    def __init__(self, entries: List[Calculation], length: int) -> None:
+        '''Constructor method with type hints'''
+        self._entries = entries
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._entries[position] for position in range(self._length)[index]]
+        return self._entries[range(self._length)[index]]
+
+    def __iter__(self):
+        return islice(self._entries, self._length)
+
+    def __eq__(self, other):
+        return isinstance(other, Sequence) and len(self) == len(other) and all(x == y for x, y in zip(self, other))
+
+    def __repr__(self):
+        return f"HistorySnapshot({list(self)!r})"
 
 class CalculationHistory():
-    '''Manage a singular history of many calculations.'''
-    # Class variable history represents a list that will store instances of the 'Calculation' class.
-    history: List[Calculation] = []
+    '''
+    Manage the history of calculations for one session.
+
+    Each session (see Calculator.session) has its own instance; readers take snapshots rather than
+    iterating the live entries. Writers (recording, adding, merging a background job's entries,
+    clearing) take the history's lock, so a job can merge while the session keeps recording.
+    '''
+
+    def __init__(self, policy: RecordingPolicy = RecordingPolicy.FULL, sample_rate: int = 10) -> None:
+        '''Constructor method with type hints'''
+        self._lock = threading.RLock()
+        # Entries are only ever appended; clearing starts a new list so that snapshots stay valid
+        self._entries: List[Calculation] = []
+        # Opt-in: share one Decimal object between equal operands (up to intern_limit distinct values)
+        self.intern_operands = False
+        self.intern_limit = 4096
+        # Opt-in: store repeated (a, b, operation) calculations once as a RepeatedCalculation
+        self.deduplicate = False
+        self._operands: Dict[tuple, Decimal] = {}
+        self._records: Dict[tuple, RepeatedCalculation] = {}
+        self._latest: Optional[Calculation] = None
+        self._sequence = 0
+        # Recording policy applied by the Calculator, and the per-operation counts it keeps
+        self.set_policy(policy, sample_rate)
+        self.counts: Dict[str, int] = {}
+        self._counted = 0
+
+    def record(self, operation) -> bool:
+        '''Count a calculation under the recording policy and return True if it should also be stored'''
+        name = operation.__name__
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+            self._counted += 1
+            counted = self._counted
+        if self.policy is RecordingPolicy.FULL:
+            return True
+        if self.policy is RecordingPolicy.SAMPLED:
+            return counted % self.sample_rate == 1 or self.sample_rate == 1
+        return False
+
+    def parse_policy(self, text: str):
+        '''Apply a policy written as 'full', 'aggregate', 'off', 'sampled' or 'sampled:N'; raises ValueError if malformed'''
+        name, _, rate = text.strip().lower().partition(':')
+        policy = RecordingPolicy(name)
+        if rate and policy is not RecordingPolicy.SAMPLED:
+            raise ValueError(f"Only the sampled policy takes a rate: {text}")
+        self.set_policy(policy, int(rate) if rate else self.sample_rate)
 
-    @classmethod
-    def add_calculation(cls, calculation: Calculation):
+    def set_policy(self, policy: RecordingPolicy, sample_rate: int = 10):
+        '''Change the recording policy; sample_rate is the N in "one in N" for the sampled policy'''
+        if sample_rate < 1:
+            raise ValueError("The sample rate must be at least 1.")
+        self.policy = policy
+        self.sample_rate = sample_rate
+
+    def add_calculation(self, calculation: Calculation):
         '''Add a new calculation to the history: 'Calculation' object is added to history'''
-        cls.history.append(calculation)
-
-    @classmethod
-    def get_history(cls) -> List[Calculation]:
-        '''Retrieve the entire history of calculations'''
-        return cls.history
-    
-    @classmethod
-    def clear_history(cls):
-        '''Clears the history of calculations'''
-        return cls.history.clear()
-    
-    @classmethod
-    def get_latest_history(cls):
+        with self._lock:
+            self._sequence += 1
+            if isinstance(calculation, Calculation) and (self.intern_operands or self.deduplicate):
+                calculation = self._compact(calculation)
+                if calculation is None:
+                    return
+            self._latest = calculation
+            self._entries.append(calculation)
+
+    def _compact(self, calculation: Calculation) -> Optional[Calculation]:
+        '''Intern the operands and/or fold a repeat into its existing record; returns None when folded'''
+        a, b = calculation.a, calculation.b
+        if self.intern_operands:
+            a, b = self._intern(a), self._intern(b)
+        if not self.deduplicate:
+            calculation.a, calculation.b = a, b
+            return calculation
+        key = (_exact_key(a), _exact_key(b), calculation.operation)
+        record = self._records.get(key)
+        if record is not None:
+            record.repeat(self._sequence)
+            self._latest = record
+            return None
+        record = RepeatedCalculation(a, b, calculation.operation, self._sequence)
+        self._records[key] = record
+        return record
+
+    def _intern(self, operand):
+        '''Return the shared object for an operand equal (digit for digit) to one seen before'''
+        if not isinstance(operand, Decimal):
+            return operand
+        key = operand.as_tuple()
+        shared = self._operands.get(key)
+        if shared is not None:
+            return shared
+        if len(self._operands) < self.intern_limit:
+            self._operands[key] = operand
+        return operand
+
+    def merge(self, other: 'CalculationHistory'):
+        '''Append the entries another history recorded, and add its per-operation counts to this one's'''
+        with self._lock:
+            for entry in other.snapshot():
+                self.add_calculation(entry)
+            for name, count in other.counts.items():
+                self.counts[name] = self.counts.get(name, 0) + count
+            self._counted += other._counted
+
+    def get_history(self) -> HistorySnapshot:
+        '''Retrieve the entire history of calculations as a snapshot, in O(1)'''
+        return self.snapshot()
+
+    def snapshot(self) -> HistorySnapshot:
+        '''A stable, read-only view of the entries recorded so far; nothing is copied'''
+        return HistorySnapshot(self._entries, len(self._entries))
+
+    def clear_history(self):
+        '''Clears the history of calculations; snapshots taken before keep their entries'''
+        with self._lock:
+            self._operands = {}
+            self._records = {}
+            self._latest = None
+            self._sequence = 0
+            self.counts = {}
+            self._counted = 0
+            self._entries = []
+
+    def get_latest_history(self):
         '''Retrieves the most recent calculation & returns None if there are no calculations in history'''
-        if cls.history:
-            return cls.history[-1]
+        if self.deduplicate and self._latest is not None:
+            return self._latest
+        if self._entries:
+            return self._entries[-1]
         else:
             return None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def memory_usage(self) -> Dict[str, float]:
+        '''Report the bytes held by the history: the list, the entries (shared operands counted once), the total and bytes per calculation made'''
+        entries_list = self._entries
+        seen: Set[int] = set()
+        entries = sum(entry_bytes(entry, seen) for entry in entries_list)
+        container = sys.getsizeof(entries_list)
+        calculations = sum(getattr(entry, 'count', 1) if isinstance(entry, RepeatedCalculation) else 1 for entry in entries_list)
+        total = container + entries
+        return {
+            'entries': len(entries_list),
+            'calculations': calculations,
+            'entry_bytes': entries,
+            'total_bytes': total,
+            'bytes_per_calculation': total / calculations if calculations else 0.0,
+        }
+
+def page_entries(entries: Sequence, cursor: int = 0, limit: int = 20, operation: Optional[str] = None,
+                 offset: int = 0, backwards: bool = False) -> List[Tuple[int, Calculation]]:
+    '''
+    One page of history: up to limit (position, entry) pairs in history order.
+
+    The page starts at position cursor, skipping the first offset matches, or with backwards it ends just
+    before cursor. With operation, only entries of that operation (e.g. 'addition') are listed. Only the
+    entries up to the end of the page are looked at, so a page of a long history costs O(limit) without a
+    filter. The next page starts after the last position returned; the previous one ends at the first.
+    '''
+    positions = range(cursor - 1, -1, -1) if backwards else range(max(cursor, 0), len(entries))
+    page = list(islice(_matching(entries, positions, operation), offset, offset + limit))
+    return page[::-1] if backwards else page
+
+def _matching(entries: Sequence, positions: range, operation: Optional[str]) -> Iterator[Tuple[int, Calculation]]:
+    '''The (position, entry) pairs at positions whose operation is called operation (any, if None)'''
+    for position in positions:
+        entry = entries[position]
+        if operation is None or getattr(getattr(entry, 'operation', None), '__name__', None) == operation:
+            yield position, entry
+
+def _exact_key(operand):
+    '''Dedup key that tells 1.0 from 1.00, unlike Decimal equality'''
+    return operand.as_tuple() if isinstance(operand, Decimal) else operand
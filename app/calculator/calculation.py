@@ -1,9 +1,12 @@
 '''app/calculator/calculation.py: Defines a single calculation. Provides abstraction for handeling individual calculations in the Calculator class.'''
+from array import array
 from decimal import Decimal
-from typing import Callable
+from typing import Callable, Iterable, Optional
 
 class Calculation:
     '''Defines a single calculation'''
+    # Slots keep each history entry small: no per-instance attribute dict
+    __slots__ = ('a', 'b', 'operation')
 
     def __init__(self, a: Decimal, b: Decimal, operation: Callable[[Decimal, Decimal], Decimal]) -> None:
         '''Constructor method with type hints'''
@@ -21,5 +24,53 @@ class Calculation:
         return self.operation(self.a, self.b)
 
     def __repr__(self):
-        '''Returns a simple string representation of the calculation'''
+        '''Returns a simple string representation of the calculation; unary operations have no b'''
+        if self.b is None:
+            return f"Calculation({self.a}, {self.operation.__name__})"
         return f"Calculation({self.a}, {self.b}, {self.operation.__name__})"
+
+class RepeatedCalculation(Calculation):
+    '''A calculation made several times, stored once with a repeat count and the sequence numbers of each repeat'''
+    __slots__ = ('count', 'sequence')
+
+    def __init__(self, a: Decimal, b: Decimal, operation: Callable[[Decimal, Decimal], Decimal], sequence: int) -> None:
+        '''Constructor method with type hints; sequence is the position of the first occurrence'''
+        super().__init__(a, b, operation)
+        self.count = 1
+        self.sequence = array('q', [sequence])
+
+    def repeat(self, sequence: int) -> None:
+        '''Record another occurrence of this calculation'''
+        self.count += 1
+        self.sequence.append(sequence)
+
+    def __repr__(self):
+        '''Returns a simple string representation of the calculation and its repeat count'''
+        return f"{super().__repr__()} x{self.count}"
+
+class ReductionCalculation:
+    '''
+    Defines a single n-ary reduction (sum, product, mean, min, max) over many operands.
+
+    Reductions stream their input, so only the operand count and the result are kept, not the operands.
+    An undefined reduction (e.g. the mean of no values) keeps its error message instead of a result.
+    '''
+    __slots__ = ('operation', 'count', 'result', 'error')
+
+    def __init__(self, operation: Callable[[Iterable[Decimal]], Decimal], count: int,
+                 result: Optional[Decimal] = None, error: Optional[str] = None) -> None:
+        '''Constructor method with type hints'''
+        self.operation = operation
+        self.count = count
+        self.result = result
+        self.error = error
+
+    def compute(self):
+        '''Return the recorded result; raises ValueError for an undefined reduction'''
+        if self.error is not None:
+            raise ValueError(self.error)
+        return self.result
+
+    def __repr__(self):
+        '''Returns a simple string representation of the reduction'''
+        return f"ReductionCalculation({self.count} values, {self.operation.__name__})"
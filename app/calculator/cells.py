@@ -0,0 +1,230 @@
+'''app/calculator/cells.py: Spreadsheet-style named cells. Formulas built from the arithmetic Operations form a dependency graph; changing a cell recomputes only its dependents, in topological order.'''
+import ast
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Set
+from app.calculator.limits import OperationAborted, OperationLimits
+from app.calculator.operations import Operations as op
+from app.calculator.rational import Rational
+
+_BINARY_OPERATIONS = {
+    ast.Add: op.addition,
+    ast.Sub: op.subtraction,
+    ast.Mult: op.multiplication,
+    ast.Div: op.division,
+}
+
+class Cell:
+    '''A named value: either a constant or a formula over other cells'''
+
+    def __init__(self, name: str) -> None:
+        '''Constructor method with type hints'''
+        self.name = name
+        self.formula: Optional[ast.expr] = None
+        self.source = ''
+        self.depends_on: Set[str] = set()
+        self.dependents: Set[str] = set()
+        self.value: Optional[Decimal] = None
+        self.error: Optional[str] = None
+
+    def __repr__(self):
+        '''Returns a simple string representation of the cell'''
+        shown = self.error if self.error is not None else self.value
+        if self.formula is None:
+            return f"{self.name} = {shown}"
+        return f"{self.name} = {self.source} -> {shown}"
+
+class CellSheet:
+    '''
+    A graph of named cells.
+
+    Values are memoized on each cell. Setting or redefining a cell recomputes it and then visits its
+    dependents in topological order, recomputing a dependent only if one of its inputs actually changed,
+    so an update costs time proportional to what changed rather than to the size of the sheet.
+    '''
+
+    def __init__(self) -> None:
+        '''Constructor method with type hints'''
+        self.cells: Dict[str, Cell] = {}
+        # Exact rational mode: numbers become Rationals, so chains such as 1/3*3 come out exact
+        self.rational = False
+        # Operands are checked against these before they are made exact
+        self.limits = OperationLimits()
+        self.recomputations = 0
+        self.last_recomputations = 0
+
+    def set(self, name: str, value) -> int:
+        '''
+        Set a cell to a constant and update its dependents; returns the number of formulas recomputed.
+
+        The name and value are validated before anything changes, so a bad value leaves the sheet as it was.
+
+        Raises:
+            ValueError: If the name is not an identifier or the value is not a number.
+        '''
+        if not name.isidentifier():
+            raise ValueError(f"Invalid cell name: {name}")
+        try:
+            new_value = value if isinstance(value, (Decimal, Rational)) else Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError(f"Invalid number: {value}") from None
+        if self.rational:
+            new_value = self._exact(new_value)
+        cell = self._cell(name)
+        self._replace_dependencies(cell, set())
+        cell.formula, cell.source = None, ''
+        changed = (cell.value, cell.error) != (new_value, None)
+        cell.value, cell.error = new_value, None
+        return self._propagate(cell, changed, recomputed=0)
+
+    def let(self, name: str, source: str) -> int:
+        '''
+        Define a cell by a formula such as 'price * (1 + rate)' and update its dependents.
+
+        Returns the number of formulas recomputed, including the cell itself.
+
+        Raises:
+            ValueError: If the formula is invalid, refers to an unknown cell, or would create a cycle.
+        '''
+        formula = _parse(source)
+        references = {node.id for node in ast.walk(formula) if isinstance(node, ast.Name)}
+        unknown = sorted(reference for reference in references if reference not in self.cells)
+        if unknown:
+            raise ValueError(f"Unknown cell(s): {', '.join(unknown)}")
+        if name in references or name in self._upstream(references):
+            raise ValueError(f"Formula for '{name}' would create a cycle.")
+        cell = self._cell(name)
+        self._replace_dependencies(cell, references)
+        cell.formula, cell.source = formula, source.strip()
+        changed = self._recompute(cell)
+        return self._propagate(cell, changed, recomputed=1)
+
+    def get(self, name: str) -> Decimal:
+        '''The memoized value of a cell; raises KeyError for an unknown cell and ValueError for an undefined one'''
+        cell = self.cells[name]
+        if cell.error is not None:
+            raise ValueError(cell.error)
+        if cell.value is None:
+            raise ValueError(f"Cell '{name}' has no value.")
+        return cell.value
+
+    def clear(self) -> None:
+        '''Remove every cell and reset the recomputation counters'''
+        self.cells.clear()
+        self.recomputations = 0
+        self.last_recomputations = 0
+
+    def _cell(self, name: str) -> Cell:
+        '''Fetch a cell, creating it if needed; names must be identifiers'''
+        if not name.isidentifier():
+            raise ValueError(f"Invalid cell name: {name}")
+        if name not in self.cells:
+            self.cells[name] = Cell(name)
+        return self.cells[name]
+
+    def _upstream(self, names: Set[str]) -> Set[str]:
+        '''Every cell that names (transitively) depend on'''
+        seen: Set[str] = set()
+        stack = list(names)
+        while stack:
+            for dependency in self.cells[stack.pop()].depends_on:
+                if dependency not in seen:
+                    seen.add(dependency)
+                    stack.append(dependency)
+        return seen
+
+    def _replace_dependencies(self, cell: Cell, references: Set[str]) -> None:
+        '''Rewire the graph edges of cell to point at references'''
+        for dependency in cell.depends_on - references:
+            self.cells[dependency].dependents.discard(cell.name)
+        for dependency in references - cell.depends_on:
+            self.cells[dependency].dependents.add(cell.name)
+        cell.depends_on = set(references)
+
+    def _recompute(self, cell: Cell) -> bool:
+        '''Evaluate a formula cell from its dependencies' memoized values; returns True if its value changed'''
+        self.recomputations += 1
+        before = (cell.value, cell.error)
+        try:
+            cell.value, cell.error = self._evaluate(cell.formula), None
+        except (ValueError, ArithmeticError, OperationAborted) as e:
+            cell.value, cell.error = None, str(e) or "undefined"
+        return (cell.value, cell.error) != before
+
+    def _propagate(self, source: Cell, changed: bool, recomputed: int) -> int:
+        '''Recompute the dependents of source in topological order, skipping any whose inputs did not change'''
+        if changed:
+            affected = self._downstream(source.name)
+            changed_cells = {source.name}
+            for name in self._topological_order(affected):
+                cell = self.cells[name]
+                if cell.depends_on & changed_cells:
+                    recomputed += 1
+                    if self._recompute(cell):
+                        changed_cells.add(name)
+        self.last_recomputations = recomputed
+        return recomputed
+
+    def _downstream(self, name: str) -> Set[str]:
+        '''Every cell that (transitively) depends on name'''
+        seen: Set[str] = set()
+        stack = [name]
+        while stack:
+            for dependent in self.cells[stack.pop()].dependents:
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return seen
+
+    def _topological_order(self, names: Set[str]) -> List[str]:
+        '''Order names so every cell comes after the cells it depends on (Kahn's algorithm on the subgraph)'''
+        waiting = {name: len(self.cells[name].depends_on & names) for name in names}
+        ready = sorted(name for name, count in waiting.items() if count == 0)
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dependent in self.cells[name].dependents:
+                if dependent in waiting:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        ready.append(dependent)
+        return order
+
+    def _exact(self, value) -> Rational:
+        '''value as a Rational, once a Decimal has passed the limits; 1E+99999999 is too large to make exact quickly'''
+        if isinstance(value, Decimal) and value.is_finite():
+            self.limits.check_operand(value)
+        return Rational.exact(value)
+
+    def _evaluate(self, node: ast.expr) -> Decimal:
+        '''Evaluate a parsed formula with the arithmetic Operations'''
+        if isinstance(node, ast.Constant):
+            return self._exact(node.value) if self.rational else node.value
+        if isinstance(node, ast.Name):
+            return self.get(node.id)
+        if isinstance(node, ast.UnaryOp):
+            operand = self._evaluate(node.operand)
+            return -operand if isinstance(node.op, ast.USub) else operand
+        return _BINARY_OPERATIONS[type(node.op)](self._evaluate(node.left), self._evaluate(node.right))
+
+def _parse(source: str) -> ast.expr:
+    '''Parse a formula, allowing only numbers, cell names, + - * / and parentheses; numbers become exact Decimals'''
+    try:
+        tree = ast.parse(source.strip(), mode='eval')
+    except SyntaxError:
+        raise ValueError(f"Invalid formula: {source}") from None
+    for node in ast.walk(tree.body):
+        if isinstance(node, ast.Constant):
+            try:
+                node.value = Decimal(ast.get_source_segment(source.strip(), node))
+            except (InvalidOperation, TypeError):
+                raise ValueError(f"Invalid number in formula: {source}") from None
+        elif isinstance(node, ast.BinOp):
+            if type(node.op) not in _BINARY_OPERATIONS:
+                raise ValueError(f"Unsupported operator in formula: {source}")
+        elif isinstance(node, ast.UnaryOp):
+            if not isinstance(node.op, (ast.UAdd, ast.USub)):
+                raise ValueError(f"Unsupported operator in formula: {source}")
+        elif not isinstance(node, (ast.Name, ast.Load, ast.operator, ast.unaryop)):
+            raise ValueError(f"Unsupported expression in formula: {source}")
+    return tree.body
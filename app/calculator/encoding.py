@@ -0,0 +1,256 @@
+'''app/calculator/encoding.py: Compact, versioned binary encoding of Calculation records. Operation ids and Decimal sign, digits and exponent are packed as varints, for moving calculations between processes or to disk.'''
+from decimal import Context, Decimal, MAX_EMAX, MAX_PREC, MIN_EMIN, MIN_ETINY
+from typing import List, Optional, Sequence, Tuple, Union
+from app.calculator.calculation import Calculation
+from app.calculator.operations import Operations as op
+from app.calculator.rational import Rational
+from app.calculator.scientific import ScientificOperations as sci
+
+MAGIC = b'CALC'
+VERSION = 1
+
+# Wire ids of the operations, by position. Append only: an id is never reused or renumbered, so a new
+# operation needs no new version.
+OPERATIONS = (None, op.addition, op.subtraction, op.multiplication, op.division, sci.power, sci.root,
+              sci.square_root, sci.exponential, sci.natural_log, sci.log10, sci.logarithm)
+_OPERATION_IDS = {operation: number for number, operation in enumerate(OPERATIONS) if operation is not None}
+
+# Record flags
+_HAS_B = 1
+_HAS_RESULT = 2
+
+# Number kinds, in the low two bits of a number's first varint
+_FINITE, _SPECIAL, _RATIONAL = 0, 1, 2
+_SPECIALS = ('F', 'n', 'N')  # Infinity, NaN, sNaN, as in Decimal.as_tuple().exponent
+# A NaN payload is written through its digit string, so it can never be longer than Python's int-string limit
+_MAX_PAYLOAD_BITS = 4300 * 10 // 3
+
+# Shifting a coefficient by its exponent is exact in this context, whatever the caller's precision
+_EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+Number = Union[Decimal, Rational]
+
+def _leb128(value: int) -> bytes:
+    '''A non-negative int as an LEB128 varint: 7 bits a byte, low bits first, the high bit set on all but the last'''
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+# The one- and two-byte varints, so that the common case is a table lookup rather than a Python loop
+_CACHED = 1 << 14
+_VARINTS = tuple(_leb128(value) for value in range(_CACHED))
+
+def _write_varint(out: bytearray, value: int) -> None:
+    '''Append a non-negative int as a varint'''
+    out += _VARINTS[value] if value < _CACHED else _leb128(value)
+
+def _read_varint(view: memoryview, position: int) -> Tuple[int, int]:
+    '''(value, position after it) of the varint at position'''
+    byte = view[position]
+    if byte < 0x80:
+        return byte, position + 1
+    value, shift = byte & 0x7f, 7
+    while True:
+        position += 1
+        byte = view[position]
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, position + 1
+        shift += 7
+
+def _write_natural(out: bytearray, value: int) -> None:
+    '''
+    Append a non-negative int of any size: below 2**13 a varint of value << 1 (one or two bytes), otherwise
+    a varint of the byte count << 1 | 1 and the bytes, little-endian, which int.to_bytes writes in one call.
+    '''
+    if value < _CACHED >> 1:
+        out += _VARINTS[value << 1]
+    else:
+        size = (value.bit_length() + 7) >> 3
+        _write_varint(out, size << 1 | 1)
+        out += value.to_bytes(size, 'little')
+
+def _read_natural(view: memoryview, position: int) -> Tuple[int, int]:
+    '''(value, position after it) of the natural number at position'''
+    head = view[position]
+    if head < 0x80:
+        position += 1
+    else:
+        head, position = _read_varint(view, position)
+    if not head & 1:
+        return head >> 1, position
+    end = position + (head >> 1)
+    if end > len(view):
+        raise IndexError
+    return int.from_bytes(view[position:end], 'little'), end
+
+def _zigzag(value: int) -> int:
+    '''Map a signed int to a non-negative one, small magnitudes to small numbers'''
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+def _unzigzag(value: int) -> int:
+    '''The signed int _zigzag mapped to value'''
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+def _write_number(out: bytearray, value: Number) -> None:
+    '''
+    Append a Decimal, or a Rational, exactly.
+
+    A finite Decimal is zigzag(exponent) and its kind in one varint, then its coefficient and sign in
+    another, so 1.0 and 1.00 stay distinct. Infinities and NaNs store their sign and NaN payload; a Rational
+    stores its numerator and denominator.
+    '''
+    if isinstance(value, Rational):
+        _write_varint(out, _RATIONAL)
+        _write_natural(out, _zigzag(value.numerator))
+        _write_natural(out, value.denominator)
+        return
+    if not isinstance(value, Decimal):
+        raise ValueError(f"Cannot encode a {type(value).__name__} operand.")
+    sign, digits, exponent = value.as_tuple()
+    if isinstance(exponent, str):
+        _write_varint(out, (_SPECIALS.index(exponent) << 1 | sign) << 2 | _SPECIAL)
+        _write_natural(out, int(''.join(map(str, digits))) if digits and exponent != 'F' else 0)
+        return
+    head = _zigzag(exponent) << 2 | _FINITE
+    out += _VARINTS[head] if head < _CACHED else _leb128(head)
+    coefficient = int(value) if exponent == 0 else int(value.scaleb(-exponent, _EXACT))
+    _write_natural(out, (-coefficient << 1 | 1) if sign else coefficient << 1)
+
+def _read_number(view: memoryview, position: int) -> Tuple[Number, int]:
+    '''
+    (value, position after it) of the number at position.
+
+    Raises:
+        ValueError: If the number is malformed: an unknown kind, an exponent outside the Decimal range, an
+            oversized NaN payload or a zero denominator (IndexError, as elsewhere, if it is truncated).
+    '''
+    head = view[position]
+    if head < 0x80:
+        position += 1
+    else:
+        head, position = _read_varint(view, position)
+    kind = head & 3
+    try:
+        if kind == _FINITE:
+            packed, position = _read_natural(view, position)
+            coefficient = packed >> 1
+            value = Decimal(-coefficient if packed & 1 else coefficient)
+            if head > 3:
+                exponent = _unzigzag(head >> 2)
+                if not MIN_ETINY <= exponent <= MAX_EMAX:
+                    raise ValueError(f"Exponent {exponent} out of range in calculation batch.")
+                value = value.scaleb(exponent, _EXACT)
+            if packed & 1 and not coefficient:
+                value = value.copy_negate()
+            return value, position
+        if kind == _SPECIAL:
+            payload, position = _read_natural(view, position)
+            code, sign = head >> 3, head >> 2 & 1
+            if code >= len(_SPECIALS):
+                raise ValueError(f"Unknown special value {code} in calculation batch.")
+            if payload.bit_length() > _MAX_PAYLOAD_BITS:
+                raise ValueError("NaN payload too long in calculation batch.")
+            text = ('-' if sign else '') + ('Infinity', 'NaN', 'sNaN')[code] + (str(payload) if payload else '')
+            return Decimal(text), position
+        if kind == _RATIONAL:
+            numerator, position = _read_natural(view, position)
+            denominator, position = _read_natural(view, position)
+            return Rational(_unzigzag(numerator), denominator), position
+    except ArithmeticError as e:
+        raise ValueError(f"Malformed number in calculation batch: {e}") from None
+    raise ValueError(f"Unknown number kind {kind} in calculation batch.")
+
+def encode_batch(calculations: Sequence[Calculation], results: Optional[Sequence[Optional[Number]]] = None,
+                 out: Optional[bytearray] = None) -> bytearray:
+    '''
+    Encode calculations, with their results, as one batch appended to out (a new bytearray by default).
+
+    results defaults to computing each calculation in the current context; an undefined result (or None
+    in results) is recorded as absent. Records are written straight into out, with no per-record buffer;
+    if one cannot be encoded, out is left as it was.
+
+    Raises:
+        ValueError: If results and calculations differ in length, an entry is not a Calculation, an
+            operation has no wire id or an operand is not a Decimal or Rational (e.g. a matrix).
+    '''
+    if results is not None and len(results) != len(calculations):
+        raise ValueError(f"{len(results)} results given for {len(calculations)} calculations.")
+    out = bytearray() if out is None else out
+    start = len(out)
+    out += MAGIC
+    _write_varint(out, VERSION)
+    _write_varint(out, len(calculations))
+    results = iter(results) if results is not None else None
+    try:
+        _encode_records(out, calculations, results)
+    except ValueError:
+        del out[start:]
+        raise
+    return out
+
+def _encode_records(out: bytearray, calculations: Sequence[Calculation], results) -> None:
+    '''Append one record per calculation; results is an iterator of results, or None to compute them'''
+    for calculation in calculations:
+        if not isinstance(calculation, Calculation):
+            raise ValueError(f"Cannot encode a {type(calculation).__name__}.")
+        number = _OPERATION_IDS.get(calculation.operation)
+        if number is None:
+            raise ValueError(f"Cannot encode the operation {calculation.operation.__name__}.")
+        if results is None:
+            try:
+                result = calculation.compute()
+            except (ValueError, ArithmeticError, TypeError):
+                result = None
+        else:
+            result = next(results)
+        _write_varint(out, number)
+        out.append((_HAS_B if calculation.b is not None else 0) | (_HAS_RESULT if result is not None else 0))
+        _write_number(out, calculation.a)
+        if calculation.b is not None:
+            _write_number(out, calculation.b)
+        if result is not None:
+            _write_number(out, result)
+
+def decode_batch(buffer, offset: int = 0) -> Tuple[List[Calculation], List[Optional[Number]], int]:
+    '''
+    Decode the batch at offset in buffer (anything supporting the buffer protocol) through a memoryview,
+    without copying it.
+
+    Returns:
+        tuple: (calculations, their results with None for absent ones, the offset just past the batch),
+        so batches written one after another can be read in turn.
+
+    Raises:
+        ValueError: If the buffer does not hold a batch of a supported version, is truncated, or holds a
+            malformed record or number.
+    '''
+    view = memoryview(buffer).cast('B')
+    if bytes(view[offset:offset + len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a calculation batch.")
+    try:
+        version, position = _read_varint(view, offset + len(MAGIC))
+        if version != VERSION:
+            raise ValueError(f"Unsupported calculation batch version {version}.")
+        count, position = _read_varint(view, position)
+        calculations: List[Calculation] = []
+        results: List[Optional[Number]] = []
+        for _ in range(count):
+            number, position = _read_varint(view, position)
+            if not 0 < number < len(OPERATIONS):
+                raise ValueError(f"Unknown operation id {number} in calculation batch.")
+            flags = view[position]
+            a, position = _read_number(view, position + 1)
+            b = result = None
+            if flags & _HAS_B:
+                b, position = _read_number(view, position)
+            if flags & _HAS_RESULT:
+                result, position = _read_number(view, position)
+            calculations.append(Calculation(a, b, OPERATIONS[number]))
+            results.append(result)
+    except IndexError:
+        raise ValueError("Truncated calculation batch.") from None
+    return calculations, results, position
@@ -0,0 +1,199 @@
+'''app/calculator/finance.py: Loan and compound-interest arithmetic in Decimal. Payment, future and present value by closed-form formulas, amortization schedules streamed period by period, and batched schedules for many loans.'''
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN, ROUND_HALF_UP, localcontext
+from functools import partial
+from itertools import chain
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+from app.calculator.operations import _reduce_chunks
+from app.calculator.scientific import GUARD_DIGITS, ScientificOperations as sci
+
+Loan = Tuple[Decimal, Decimal, int]
+
+def _growth(rate: Decimal, periods: int) -> Decimal:
+    '''(1 + rate) ** periods by repeated squaring; callers hold guard digits'''
+    if periods < 0:
+        raise ValueError("The number of periods cannot be negative.")
+    if rate <= -1:
+        raise ValueError("The interest rate must be greater than -100%.")
+    return sci.integer_power(1 + rate, Decimal(periods))
+
+def _annuity_factor(rate: Decimal, periods: int, growth: Decimal, due: bool) -> Decimal:
+    '''Present value of 1 paid at the end (or, if due, the start) of each of periods periods'''
+    if rate == 0:
+        return Decimal(periods)
+    factor = (1 - 1 / growth) / rate
+    return factor * (1 + rate) if due else factor
+
+def payment(principal: Decimal, rate: Decimal, periods: int, balloon: Decimal = Decimal(0), due: bool = False) -> Decimal:
+    '''
+    The level payment per period that repays principal at rate per period over periods periods, leaving
+    balloon owed at the end; due for payments at the start of each period. Rounded once to the context.
+    '''
+    if periods < 1:
+        raise ValueError("A loan needs at least one period.")
+    with localcontext() as ctx:
+        ctx.prec += GUARD_DIGITS
+        growth = _growth(rate, periods)
+        result = (principal - balloon / growth) / _annuity_factor(rate, periods, growth, due)
+    return +result
+
+def future_value(present: Decimal, rate: Decimal, periods: int, deposit: Decimal = Decimal(0), due: bool = False) -> Decimal:
+    '''The balance after periods periods of present growing at rate per period, plus deposit paid in each period'''
+    with localcontext() as ctx:
+        ctx.prec += GUARD_DIGITS
+        growth = _growth(rate, periods)
+        result = present * growth + deposit * _annuity_factor(rate, periods, growth, due) * growth
+    return +result
+
+def present_value(future: Decimal, rate: Decimal, periods: int, deposit: Decimal = Decimal(0), due: bool = False) -> Decimal:
+    '''The amount today worth future after periods periods at rate per period, plus deposit received in each period'''
+    with localcontext() as ctx:
+        ctx.prec += GUARD_DIGITS
+        growth = _growth(rate, periods)
+        result = future / growth + deposit * _annuity_factor(rate, periods, growth, due)
+    return +result
+
+@dataclass(frozen=True)
+class Rounding:
+    '''
+    How a schedule's amounts are rounded each period: to places decimal places (2 for cents) with a
+    Decimal rounding mode. Interest is rounded with mode and the level payment with payment_mode; the
+    final payment clears whatever the rounding left over.
+    '''
+    places: int = 2
+    mode: str = ROUND_HALF_EVEN
+    payment_mode: str = ROUND_HALF_UP
+
+    @property
+    def quantum(self) -> Decimal:
+        '''The smallest amount kept, e.g. 0.01'''
+        return Decimal(1).scaleb(-self.places)
+
+    def amount(self, value: Decimal) -> Decimal:
+        '''value rounded as an interest amount'''
+        return value.quantize(self.quantum, rounding=self.mode)
+
+    def payment(self, value: Decimal) -> Decimal:
+        '''value rounded as a payment'''
+        return value.quantize(self.quantum, rounding=self.payment_mode)
+
+class Period(NamedTuple):
+    '''One row of an amortization schedule'''
+    number: int
+    payment: Decimal
+    interest: Decimal
+    principal: Decimal
+    balance: Decimal
+
+def amortize(principal: Decimal, rate: Decimal, periods: int, rounding: Rounding = Rounding(),
+             level_payment: Optional[Decimal] = None, check: Optional[Callable[[], None]] = None) -> Iterator[Period]:
+    '''
+    Yield the schedule of a loan one period at a time, so a schedule of any length is never held in memory.
+
+    Each period's interest is rounded by the rounding rule and the rest of the (rounded) level payment
+    repays principal; the last payment is whatever clears the balance. level_payment defaults to the
+    closed-form payment. check, e.g. OperationLimits.checkpoint, is called once per period and may
+    raise to stop the schedule.
+
+    Raises:
+        ValueError: If the principal is not positive or the level payment rounds to nothing.
+    '''
+    if principal <= 0:
+        raise ValueError("The principal must be positive.")
+    if level_payment is None:
+        level_payment = payment(principal, rate, periods)
+    level_payment = rounding.payment(level_payment)
+    if level_payment <= 0:
+        raise ValueError(f"The payment rounds to {level_payment}; use fewer periods or more decimal places.")
+    quantum, mode = rounding.quantum, rounding.mode
+    balance = principal.quantize(quantum, rounding=mode)
+    for number in range(1, periods + 1):
+        if check is not None:
+            check()
+        interest = (balance * rate).quantize(quantum, rounding=mode)
+        owed = balance + interest
+        paid = owed if number == periods or level_payment >= owed else level_payment
+        balance = owed - paid
+        yield Period(number, paid, interest, paid - interest, balance)
+        if not balance:
+            return
+
+def write_schedule(periods: Iterable[Period], out: TextIO) -> int:
+    '''Write schedule rows to out as CSV with a header, as they are produced; returns the number of rows'''
+    out.write("period,payment,interest,principal,balance\n")
+    count = 0
+    for row in periods:
+        out.write(f"{row.number},{row.payment},{row.interest},{row.principal},{row.balance}\n")
+        count += 1
+    return count
+
+class LoanSummary(NamedTuple):
+    '''The totals of one loan's schedule'''
+    payment: Decimal
+    periods: int
+    total_paid: Decimal
+    total_interest: Decimal
+
+def summarize(principal: Decimal, rate: Decimal, periods: int, rounding: Optional[Rounding] = Rounding(),
+              check: Optional[Callable[[], None]] = None) -> LoanSummary:
+    '''
+    Totals of a loan's schedule: walked period by period through amortize with per-period rounding, or,
+    with rounding None, by the closed form (periods level payments) in O(1).
+    '''
+    level_payment = payment(principal, rate, periods)
+    if rounding is None:
+        total_paid = level_payment * periods
+        return LoanSummary(level_payment, periods, total_paid, total_paid - principal)
+    level_payment = rounding.payment(level_payment)
+    total_interest = Decimal(0)
+    for row in amortize(principal, rate, periods, rounding, level_payment, check):
+        total_interest += row.interest
+    paid = principal.quantize(rounding.quantum, rounding=rounding.mode) + total_interest
+    return LoanSummary(level_payment, row.number, paid, total_interest)
+
+def _summarize_chunk(loans: List[Loan], rounding: Optional[Rounding],
+                     check: Optional[Callable[[], None]] = None) -> List[LoanSummary]:
+    '''Summarize a chunk of loans; the unit of work sent to a worker process'''
+    return [summarize(principal, rate, periods, rounding, check) for principal, rate, periods in loans]
+
+def summarize_many(loans: Iterable[Loan], rounding: Optional[Rounding] = Rounding(), chunk_size: int = 1024,
+                   workers: int = 0, check: Optional[Callable[[], None]] = None) -> Iterator[LoanSummary]:
+    '''
+    Summarize many loans in order, a chunk at a time.
+
+    The loans are read lazily; with workers > 1 chunks are summarized in worker processes, with only a
+    few chunks in flight at once, so a stream of any number of loans runs in bounded memory. check is
+    called once per period when summarizing inline; worker processes cannot call back, so with workers
+    it is called once per loan as each summary comes back, and chunks not yet started are dropped if it raises.
+    '''
+    if workers <= 1:
+        return chain.from_iterable(_reduce_chunks(loans, partial(_summarize_chunk, rounding=rounding, check=check), chunk_size, workers))
+    summaries = chain.from_iterable(_reduce_chunks(loans, partial(_summarize_chunk, rounding=rounding), chunk_size, workers))
+    return summaries if check is None else _checked(summaries, check)
+
+def _checked(items: Iterable, check: Callable[[], None]) -> Iterator:
+    '''Pass items through, calling check before each'''
+    for item in items:
+        check()
+        yield item
+
+def read_loans(lines: Iterable[str], max_periods: Optional[int] = None) -> Iterator[Loan]:
+    '''
+    Parse loans written as 'principal rate periods' per line (commas also separate); blank lines are skipped.
+    A loan with a principal that is not positive, or more than max_periods periods, is invalid.
+    '''
+    for number, line in enumerate(lines, 1):
+        fields = line.replace(',', ' ').split()
+        if not fields:
+            continue
+        try:
+            if len(fields) != 3:
+                raise ValueError
+            principal, rate, periods = Decimal(fields[0]), Decimal(fields[1]), int(fields[2])
+        except (ValueError, InvalidOperation):
+            raise ValueError(f"Invalid loan on line {number}, expected 'principal rate periods': {line.strip()}") from None
+        if not principal > 0:
+            raise ValueError(f"Invalid loan on line {number}, the principal must be positive: {line.strip()}")
+        if max_periods is not None and periods > max_periods:
+            raise ValueError(f"Invalid loan on line {number}, more than {max_periods} periods: {line.strip()}")
+        yield principal, rate, periods
@@ -0,0 +1,313 @@
+'''app/calculator/limits.py: Per-operation resource limits. Rejects calculations whose inputs obviously exceed the limits and runs heavy ones in a worker process that can be timed out or cancelled.'''
+import multiprocessing
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Context, Decimal, InvalidOperation, Overflow, getcontext, localcontext
+from typing import Callable, Iterable, Iterator, List, Optional
+from app.calculator.operations import Operations as op
+from app.calculator.rational import Rational
+from app.calculator.scientific import ScientificOperations as sci
+
+class OperationAborted(Exception):
+    '''Base class for calculations that were stopped before producing a result'''
+
+class LimitExceeded(OperationAborted):
+    '''Raised when a calculation would exceed, or did exceed, a configured limit'''
+
+class OperationCancelled(OperationAborted):
+    '''Raised when a running calculation is cancelled'''
+
+def _compute_in_context(a: Decimal, b: Decimal, operation: Callable[[Decimal, Decimal], Decimal], context: Context) -> Decimal:
+    '''Worker process entry point: compute the operation under the caller's Decimal context'''
+    with localcontext(context):
+        return operation(a, b)
+
+def _as_decimal(value) -> Decimal:
+    '''Operands may arrive as ints or floats; limits are measured on their Decimal form'''
+    return value if isinstance(value, Decimal) else Decimal(value)
+
+# ln(10), enough to estimate the decimal exponent of exp(a)
+_LN10 = Decimal('2.302585092994046')
+
+def _digits(value: Decimal) -> int:
+    '''Number of significant digits stored in value'''
+    return len(value.as_tuple().digits)
+
+def _size(value) -> int:
+    '''Digits stored in an operand: its significant digits, or a Rational's longer numerator or denominator'''
+    return value.digits if isinstance(value, Rational) else _digits(_as_decimal(value))
+
+@dataclass
+class OperationLimits:
+    '''
+    Limits applied to every calculation; unary operations pass None as b.
+
+    Attributes:
+        max_seconds (float): Wall time allowed for a calculation run in a worker process; None for no limit.
+        max_digits (int): Largest number of significant digits allowed in an operand or result.
+        max_exponent (int): Largest absolute adjusted exponent allowed in an operand or result; never more
+            than the current Decimal context's Emax, past which Decimal itself overflows.
+        inline_digits (int): Calculations whose operands and precision stay at or below this many digits
+            cannot be slow, so they run inline; anything larger runs in a worker process.
+        poll_interval (float): How often, in seconds, a worker calculation checks for cancellation.
+        workers (int): Heavy calculations that may run at once, each in its own worker process; size it to
+            the foreground plus the background jobs. Further ones wait, cancellable, for a free worker.
+        check_every (int): How many operands a guarded reduction reads (or steps a streamed calculation
+            takes) between time and cancellation checks.
+        max_steps (int): Largest number of steps, such as schedule periods, a streamed calculation may take.
+    '''
+    max_seconds: Optional[float] = 10.0
+    max_digits: int = 100000
+    max_exponent: int = 10 ** 8
+    inline_digits: int = 2000
+    poll_interval: float = 0.05
+    workers: int = 3
+    check_every: int = 4096
+    max_steps: int = 10 ** 6
+
+    def __post_init__(self):
+        # Idle single-process pools, reused between calculations; one is terminated on its own when its
+        # calculation is abandoned, without disturbing the others
+        self._idle: List = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers)
+
+    def check(self, a: Decimal, b: Decimal, operation: Callable[[Decimal, Decimal], Decimal]) -> None:
+        '''Reject, without computing anything, a calculation whose operands or estimated result exceed the limits'''
+        if isinstance(a, Rational) or isinstance(b, Rational):
+            self.check_rational(a, b)
+            return
+        precision = getcontext().prec
+        max_exponent = self.effective_max_exponent()
+        a = _as_decimal(a)
+        self.check_operand(a, max_exponent)
+        if b is None:
+            if operation is sci.exponential and a.is_finite() and abs(a / _LN10) > max_exponent:
+                raise LimitExceeded(f"Result exponent would exceed {max_exponent}.")
+            return
+        b = _as_decimal(b)
+        self.check_operand(b, max_exponent)
+        if not (a.is_finite() and b.is_finite()) or not a or not b:
+            return
+        if operation in (sci.power, sci.integer_power):
+            with localcontext() as ctx:
+                ctx.prec = 15
+                ctx.traps[Overflow] = False
+                exponent = abs(a).log10() * b
+            digits = precision
+        elif operation in (op.addition, op.subtraction):
+            exponent = max(a.adjusted(), b.adjusted()) + 1
+            digits = exponent - min(a.as_tuple().exponent, b.as_tuple().exponent)
+        elif operation is op.multiplication:
+            exponent = a.adjusted() + b.adjusted() + 1
+            digits = _digits(a) + _digits(b)
+        elif operation is op.division:
+            exponent = a.adjusted() - b.adjusted() + 1
+            digits = precision
+        else:
+            return
+        if abs(exponent) > max_exponent:
+            raise LimitExceeded(f"Result exponent would exceed {max_exponent}.")
+        if min(digits, precision) > self.max_digits:
+            raise LimitExceeded(f"Result would have more than {self.max_digits} digits.")
+
+    def check_rational(self, a: Rational, b: Optional[Rational]) -> None:
+        '''Reject exact rational operands, or a result (at most as long as both together), with too many digits'''
+        sizes = [_size(operand) for operand in (a, b) if operand is not None]
+        if max(sizes) > self.max_digits:
+            raise LimitExceeded(f"Operand has more than {self.max_digits} digits.")
+        if sum(sizes) > self.max_digits:
+            raise LimitExceeded(f"Result would have more than {self.max_digits} digits.")
+
+    def effective_max_exponent(self) -> int:
+        '''The exponent limit actually enforced: max_exponent capped at the context's Emax'''
+        return min(self.max_exponent, getcontext().Emax)
+
+    def check_operand(self, operand: Decimal, max_exponent: Optional[int] = None) -> None:
+        '''Reject a single operand with too many digits or too large an exponent'''
+        max_exponent = self.effective_max_exponent() if max_exponent is None else max_exponent
+        if _digits(operand) > self.max_digits:
+            raise LimitExceeded(f"Operand has more than {self.max_digits} digits.")
+        if abs(operand.adjusted()) > max_exponent:
+            raise LimitExceeded(f"Operand exponent exceeds {max_exponent}.")
+
+    def check_result(self, result) -> None:
+        '''Reject a finite Decimal or a Rational result with too many digits or too large an exponent'''
+        if isinstance(result, Rational) and result.digits > self.max_digits:
+            raise LimitExceeded("Result exceeds the configured limits.")
+        if isinstance(result, Decimal) and result.is_finite():
+            if _digits(result) > self.max_digits or abs(result.adjusted()) > self.effective_max_exponent():
+                raise LimitExceeded("Result exceeds the configured limits.")
+
+    def check_steps(self, steps: int) -> None:
+        '''Reject a streamed calculation that would take more than max_steps steps'''
+        if steps > self.max_steps:
+            raise LimitExceeded(f"More than {self.max_steps} steps requested.")
+
+    def checkpoint(self, cancel_event: Optional[threading.Event] = None) -> Callable[[], None]:
+        '''
+        A function to call once per step of an inline calculation: every check_every calls it raises
+        OperationCancelled if cancel_event is set, or LimitExceeded once max_seconds have passed since
+        checkpoint was called.
+        '''
+        deadline = time.monotonic() + self.max_seconds if self.max_seconds is not None else None
+        check_every = self.check_every
+        count = 0
+
+        def check() -> None:
+            nonlocal count
+            count += 1
+            if count % check_every:
+                return
+            if cancel_event is not None and cancel_event.is_set():
+                raise OperationCancelled("Calculation cancelled.")
+            if deadline is not None and time.monotonic() >= deadline:
+                raise LimitExceeded(f"Calculation took longer than {self.max_seconds} seconds.")
+        return check
+
+    def guard(self, values: Iterable, cancel_event: Optional[threading.Event] = None) -> Iterator:
+        '''
+        Pass values through, checking each Decimal operand against the limits and, every check_every
+        operands, the wall time limit and cancel_event. Used to bound streaming reductions, which run inline.
+        '''
+        max_exponent = self.effective_max_exponent()
+        check = self.checkpoint(cancel_event)
+        for value in values:
+            if isinstance(value, Decimal):
+                self.check_operand(value, max_exponent)
+            check()
+            yield value
+
+    def reduce(self, values: Iterable, reduction: Callable, cancel_event: Optional[threading.Event] = None, **options):
+        '''Run an n-ary reduction over guarded values, translating Decimal overflow into LimitExceeded'''
+        try:
+            result = reduction(self.guard(values, cancel_event), **options)
+        except Overflow:
+            raise LimitExceeded("Result exceeds the Decimal exponent range.") from None
+        except KeyboardInterrupt:
+            raise OperationCancelled("Calculation cancelled.") from None
+        self.check_result(result)
+        return result
+
+    def is_heavy(self, a: Decimal, b: Decimal) -> bool:
+        '''True when a calculation is large enough that it may need to be timed out or cancelled; exact rationals ignore the precision'''
+        digits = [_size(operand) for operand in (a, b) if operand is not None]
+        if isinstance(a, Rational):
+            return max(digits) > self.inline_digits
+        return max(getcontext().prec, *digits) > self.inline_digits
+
+    def run(self, a: Decimal, b: Decimal, operation: Callable[[Decimal, Decimal], Decimal],
+            cancel_event: Optional[threading.Event] = None) -> Decimal:
+        '''
+        Check and compute operation(a, b) within the limits.
+
+        Small calculations run inline. Heavy ones run in a worker process that is terminated if the
+        wall time limit passes, cancel_event is set, or the user presses Ctrl-C while waiting.
+
+        Raises:
+            LimitExceeded: If the inputs or result exceed a limit, or the time limit passes.
+            OperationCancelled: If the calculation was cancelled.
+        '''
+        self.check(a, b, operation)
+        try:
+            if self.is_heavy(a, b):
+                result = self._run_in_worker(a, b, operation, cancel_event)
+            else:
+                result = operation(a, b)
+        except Overflow:
+            raise LimitExceeded("Result exceeds the Decimal exponent range.") from None
+        except InvalidOperation:
+            raise OperationAborted("Result is undefined in the current Decimal context.") from None
+        self.check_result(result)
+        return result
+
+    def run_batch(self, a, b, operation: Callable, cancel_event: Optional[threading.Event] = None):
+        '''
+        Check every value of two batched operands (e.g. matrices, anything with values()) and compute
+        operation(a, b). Small batches run inline. A batch with more than check_every values, or with values
+        or a precision past inline_digits, runs in a worker process like a heavy run, so the time limit
+        and cancel_event stop the operation itself (an exact matrix product, say) and not just the checks.
+
+        Raises:
+            LimitExceeded: If a value or the result exceeds a limit, or the time limit passes.
+            OperationCancelled: If the calculation was cancelled.
+        '''
+        count, digits = 0, 0
+        for operand in (a, b):
+            for value in self.guard(operand.values(), cancel_event):
+                count += 1
+                if isinstance(value, Decimal):
+                    digits = max(digits, _digits(value))
+        try:
+            if count > self.check_every or max(digits, getcontext().prec) > self.inline_digits:
+                result = self._run_in_worker(a, b, operation, cancel_event)
+            else:
+                result = operation(a, b)
+        except Overflow:
+            raise LimitExceeded("Result exceeds the Decimal exponent range.") from None
+        except InvalidOperation:
+            raise OperationAborted("Result is undefined in the current Decimal context.") from None
+        for value in (result.values() if hasattr(result, 'values') else (result,)):
+            self.check_result(value)
+        return result
+
+    def _run_in_worker(self, a, b, operation, cancel_event) -> Decimal:
+        '''
+        Run one calculation in a worker process of its own, terminating that worker if the calculation must
+        be abandoned. The time limit runs, and cancel_event is honoured, from the moment of the call,
+        including while waiting for a free worker; the lock is held only to take or return a worker.
+        '''
+        deadline = time.monotonic() + self.max_seconds if self.max_seconds is not None else None
+        try:
+            while not self._slots.acquire(timeout=self.poll_interval):
+                self._check_waiting(cancel_event, deadline)
+            try:
+                self._check_waiting(cancel_event, deadline)
+                with self._lock:
+                    worker = self._idle.pop() if self._idle else multiprocessing.Pool(1)
+                try:
+                    result = self._wait(worker.apply_async(_compute_in_context, (a, b, operation, getcontext().copy())),
+                                        cancel_event, deadline)
+                except (OperationAborted, KeyboardInterrupt):
+                    worker.terminate()
+                    worker.join()
+                    raise
+                except BaseException:
+                    self._release(worker)
+                    raise
+                self._release(worker)
+                return result
+            finally:
+                self._slots.release()
+        except KeyboardInterrupt:
+            raise OperationCancelled("Calculation cancelled.") from None
+
+    def _wait(self, pending, cancel_event, deadline):
+        '''The result of a submitted calculation, polling for cancellation and the deadline'''
+        while True:
+            self._check_waiting(cancel_event, deadline)
+            try:
+                return pending.get(self.poll_interval)
+            except multiprocessing.TimeoutError:
+                continue
+
+    def _check_waiting(self, cancel_event, deadline) -> None:
+        '''Raise OperationCancelled or LimitExceeded if a waiting calculation should be abandoned'''
+        if cancel_event is not None and cancel_event.is_set():
+            raise OperationCancelled("Calculation cancelled.")
+        if deadline is not None and time.monotonic() >= deadline:
+            raise LimitExceeded(f"Calculation took longer than {self.max_seconds} seconds.")
+
+    def _release(self, worker) -> None:
+        '''Return a worker that finished its calculation to the idle list'''
+        with self._lock:
+            self._idle.append(worker)
+
+    def shutdown(self):
+        '''Stop the idle worker processes; workers still busy are returned and stopped by the next shutdown'''
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.terminate()
+            worker.join()
@@ -1,5 +1,10 @@
-'''app/calculator/operation.py: Contains simple arithmetic operations: addition, subtraction, multiplication, and division'''
-from decimal import Decimal # Define operation functions with type hints
+'''app/calculator/operation.py: Contains simple arithmetic operations: addition, subtraction, multiplication, and division, plus n-ary reductions over many operands'''
+import math
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Context, Decimal, MAX_PREC, getcontext, localcontext # Define operation functions with type hints
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
 class Operations():
     '''Basic arithemtic operations'''
@@ -26,3 +31,106 @@ class Operations():
             raise ValueError("Cannot divide by zero.")
         else:
             return a / b
+
+    @staticmethod
+    def summation(values: Iterable, chunk_size: int = 4096, workers: int = 0):
+        '''N-ary sum: exact for Decimal (rounded once to the current context), compensated (math.fsum) for float'''
+        first, values = _peek(values)
+        if first is None:
+            return Decimal(0)
+        if isinstance(first, float):
+            return math.fsum(_reduce_chunks(values, math.fsum, chunk_size, workers))
+        with localcontext() as ctx:
+            ctx.prec = MAX_PREC
+            total = sum(_reduce_chunks(values, _exact_sum, chunk_size, workers), Decimal(0))
+        return +total
+
+    @staticmethod
+    def product(values: Iterable, chunk_size: int = 4096, workers: int = 0):
+        '''N-ary product of values: rounded to the current context at each step for Decimal, plain float multiplication for float'''
+        first, values = _peek(values)
+        start = 1.0 if isinstance(first, float) else Decimal(1)
+        return math.prod(_reduce_chunks(values, _chunk_product, chunk_size, workers), start=start)
+
+    @staticmethod
+    def mean(values: Iterable, chunk_size: int = 4096, workers: int = 0):
+        '''Arithmetic mean of values using the exact sum; raises ValueError for no values'''
+        count = 0
+        def counted(items):
+            nonlocal count
+            for item in items:
+                count += 1
+                yield item
+        total = Operations.summation(counted(values), chunk_size, workers)
+        if count == 0:
+            raise ValueError("Cannot take the mean of no values.")
+        return total / count
+
+    @staticmethod
+    def minimum(values: Iterable, chunk_size: int = 4096, workers: int = 0):
+        '''Smallest of values; raises ValueError for no values'''
+        partials = list(_reduce_chunks(values, min, chunk_size, workers))
+        if not partials:
+            raise ValueError("Cannot take the minimum of no values.")
+        return min(partials)
+
+    @staticmethod
+    def maximum(values: Iterable, chunk_size: int = 4096, workers: int = 0):
+        '''Largest of values; raises ValueError for no values'''
+        partials = list(_reduce_chunks(values, max, chunk_size, workers))
+        if not partials:
+            raise ValueError("Cannot take the maximum of no values.")
+        return max(partials)
+
+def _exact_sum(chunk: List[Decimal]) -> Decimal:
+    '''Sum a chunk of Decimals without rounding'''
+    with localcontext() as ctx:
+        ctx.prec = MAX_PREC
+        return sum(chunk, Decimal(0))
+
+def _chunk_product(chunk: List[Decimal]) -> Decimal:
+    '''Multiply a chunk of Decimals (or floats) together'''
+    return math.prod(chunk, start=1.0 if isinstance(chunk[0], float) else Decimal(1))
+
+def _peek(values: Iterable) -> Tuple[Optional[object], Iterator]:
+    '''Return the first value (None if there are none) and an iterator that still yields it'''
+    values = iter(values)
+    first = next(values, None)
+    return first, values if first is None else chain((first,), values)
+
+def _reduce_in_context(reducer: Callable, chunk: List, context: Context):
+    '''Reduce one chunk under the caller's Decimal context; worker processes do not inherit it'''
+    with localcontext(context):
+        return reducer(chunk)
+
+def _chunks(values: Iterable, chunk_size: int) -> Iterator[List]:
+    '''Split a (possibly endless) iterable into lists of at most chunk_size items'''
+    values = iter(values)
+    while chunk := list(islice(values, chunk_size)):
+        yield chunk
+
+def _reduce_chunks(values: Iterable, reducer: Callable, chunk_size: int, workers: int) -> Iterator:
+    '''
+    Apply reducer to each chunk of values under the current Decimal context, yielding the partial results in order.
+
+    With workers > 1 chunks are reduced in worker processes, with at most two chunks per worker in flight
+    so that a long stream is never read into memory ahead of the workers.
+    '''
+    context = getcontext().copy()
+    if workers <= 1:
+        for chunk in _chunks(values, chunk_size):
+            yield _reduce_in_context(reducer, chunk, context)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        try:
+            for chunk in _chunks(values, chunk_size):
+                if len(in_flight) >= 2 * workers:
+                    yield in_flight.popleft().result()
+                in_flight.append(executor.submit(_reduce_in_context, reducer, chunk, context))
+            while in_flight:
+                yield in_flight.popleft().result()
+        finally:
+            # Abandoned (e.g. cancelled) part way: drop the chunks not yet started rather than wait for them
+            for pending in in_flight:
+                pending.cancel()
@@ -0,0 +1,214 @@
+'''app/calculator/rational.py: Exact rational numbers for the rational calculation mode. Keeps fractions unreduced between steps and reduces them in batches, converting to Decimal only for display.'''
+import math
+from decimal import Decimal
+from fractions import Fraction
+from numbers import Rational as RationalNumber
+from typing import Tuple, Union
+
+# A result is reduced once its numerator and denominator together are this many bits more than twice
+# the size of its largest operand when that was last reduced; small fractions wait until they are read.
+_SLACK_BITS = 64
+
+# log10(2), to turn bit lengths into decimal digit counts
+_LOG10_2 = 0.30102999566398120
+
+class Rational:
+    '''
+    An exact fraction numerator/denominator that defers normalisation.
+
+    fractions.Fraction takes a gcd after every operation. Rational keeps the raw cross-multiplied
+    numerator and denominator instead, and reduces them only when they have grown well past the size
+    of the reduced operands they came from (or when the value is hashed or read as a Fraction). A chain
+    whose reduced values stay small is reduced every few dozen steps; one whose reduced values keep
+    growing is reduced each time its size doubles. Values are shown, and exported, as a Decimal rounded
+    once to the current context. Integers, Decimals and Fractions mix with Rationals exactly.
+    '''
+    __slots__ = ('numerator', 'denominator', '_reduced_bits')
+
+    def __init__(self, numerator: int, denominator: int = 1) -> None:
+        '''Constructor method with type hints; raises ZeroDivisionError for a zero denominator'''
+        if denominator == 0:
+            raise ZeroDivisionError("Rational with a zero denominator.")
+        if denominator < 0:
+            numerator, denominator = -numerator, -denominator
+        self.numerator = numerator
+        self.denominator = denominator
+        self._reduced_bits = 0
+
+    @classmethod
+    def exact(cls, value) -> 'Rational':
+        '''The Rational equal to an int, Decimal, Fraction or Rational; raises ValueError for NaN or infinity'''
+        if isinstance(value, Rational):
+            return value
+        if isinstance(value, int):
+            return cls(value)._mark_reduced()
+        if isinstance(value, Decimal):
+            if not value.is_finite():
+                raise ValueError(f"{value} has no exact rational value.")
+            return cls(*value.as_integer_ratio())._mark_reduced()
+        if isinstance(value, RationalNumber):
+            return cls(value.numerator, value.denominator)._mark_reduced()
+        raise TypeError(f"Cannot make a Rational from {type(value).__name__}.")
+
+    def normalize(self) -> 'Rational':
+        '''Reduce to lowest terms in place (the value does not change) and return self'''
+        divisor = math.gcd(self.numerator, self.denominator)
+        if divisor > 1:
+            self.numerator //= divisor
+            self.denominator //= divisor
+        return self._mark_reduced()
+
+    def _mark_reduced(self) -> 'Rational':
+        '''Record that the fraction is in lowest terms at its current size'''
+        self._reduced_bits = self.bits
+        return self
+
+    @property
+    def bits(self) -> int:
+        '''Combined size of the numerator and denominator'''
+        return self.numerator.bit_length() + self.denominator.bit_length()
+
+    @property
+    def digits(self) -> int:
+        '''Approximate decimal digits in the larger of the numerator and denominator, for limits'''
+        return int(max(self.numerator.bit_length(), self.denominator.bit_length()) * _LOG10_2) + 1
+
+    @property
+    def fraction(self) -> Fraction:
+        '''The value as a normalised Fraction'''
+        self.normalize()
+        return Fraction(self.numerator, self.denominator)
+
+    def to_decimal(self) -> Decimal:
+        '''The value as a Decimal, rounded once to the current context'''
+        return Decimal(self.numerator) / Decimal(self.denominator)
+
+    def _result(self, numerator: int, denominator: int, reduced_bits: int) -> 'Rational':
+        '''A new Rational from raw parts, reduced only if it has outgrown the reduced size of its operands'''
+        result = Rational(numerator, denominator)
+        result._reduced_bits = reduced_bits
+        if result.bits > 2 * reduced_bits + _SLACK_BITS:
+            result.normalize()
+        return result
+
+    def _parts(self, other) -> Union[Tuple[int, int, int], None]:
+        '''(numerator, denominator, reduced bits) of another operand, or None if it does not mix exactly'''
+        if isinstance(other, Rational):
+            return other.numerator, other.denominator, other._reduced_bits
+        if isinstance(other, (int, Decimal, Fraction)):
+            try:
+                other = Rational.exact(other)
+            except ValueError:
+                return None
+            return other.numerator, other.denominator, other._reduced_bits
+        return None
+
+    def __add__(self, other):
+        parts = self._parts(other)
+        if parts is None:
+            return NotImplemented
+        numerator, denominator, reduced_bits = parts
+        reduced_bits = max(self._reduced_bits, reduced_bits)
+        if denominator == self.denominator:
+            return self._result(self.numerator + numerator, denominator, reduced_bits)
+        return self._result(self.numerator * denominator + numerator * self.denominator, self.denominator * denominator,
+                            reduced_bits)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        parts = self._parts(other)
+        if parts is None:
+            return NotImplemented
+        negated = Rational(-parts[0], parts[1])
+        negated._reduced_bits = parts[2]
+        return self + negated
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        parts = self._parts(other)
+        if parts is None:
+            return NotImplemented
+        numerator, denominator, reduced_bits = parts
+        return self._result(self.numerator * numerator, self.denominator * denominator, max(self._reduced_bits, reduced_bits))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        parts = self._parts(other)
+        if parts is None:
+            return NotImplemented
+        numerator, denominator, reduced_bits = parts
+        if numerator == 0:
+            raise ZeroDivisionError("Rational division by zero.")
+        return self._result(self.numerator * denominator, self.denominator * numerator, max(self._reduced_bits, reduced_bits))
+
+    def __rtruediv__(self, other):
+        parts = self._parts(other)
+        if parts is None:
+            return NotImplemented
+        dividend = Rational(parts[0], parts[1])
+        dividend._reduced_bits = parts[2]
+        return dividend / self
+
+    def __neg__(self):
+        result = Rational(-self.numerator, self.denominator)
+        result._reduced_bits = self._reduced_bits
+        return result
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return -self if self.numerator < 0 else self
+
+    def __bool__(self):
+        return self.numerator != 0
+
+    def _compare(self, other):
+        '''(self numerator * other denominator, other numerator * self denominator), or None'''
+        parts = self._parts(other)
+        if parts is None:
+            return None
+        return self.numerator * parts[1], parts[0] * self.denominator
+
+    def __eq__(self, other):
+        sides = self._compare(other)
+        return NotImplemented if sides is None else sides[0] == sides[1]
+
+    def __lt__(self, other):
+        sides = self._compare(other)
+        return NotImplemented if sides is None else sides[0] < sides[1]
+
+    def __le__(self, other):
+        sides = self._compare(other)
+        return NotImplemented if sides is None else sides[0] <= sides[1]
+
+    def __gt__(self, other):
+        sides = self._compare(other)
+        return NotImplemented if sides is None else sides[0] > sides[1]
+
+    def __ge__(self, other):
+        sides = self._compare(other)
+        return NotImplemented if sides is None else sides[0] >= sides[1]
+
+    def __hash__(self):
+        '''Equal to the hash of the equal Fraction, Decimal or int'''
+        return hash(self.fraction)
+
+    def __sizeof__(self):
+        '''Bytes held by the fraction and its two integers, for history memory accounting'''
+        return object.__sizeof__(self) + self.numerator.__sizeof__() + self.denominator.__sizeof__()
+
+    def __reduce__(self):
+        return (Rational, (self.numerator, self.denominator))
+
+    def __str__(self):
+        '''The value as a Decimal in the current context, e.g. 0.3333333333333333333333333333'''
+        return str(self.to_decimal())
+
+    def __repr__(self):
+        self.normalize()
+        return f"Rational({self.numerator}, {self.denominator})"
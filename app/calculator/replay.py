@@ -0,0 +1,90 @@
+'''app/calculator/replay.py: Re-evaluates calculation history under a different Decimal context and reports which results changed.'''
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from decimal import Context, Decimal, getcontext, localcontext
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from app.calculator import Calculator
+from app.calculator.calculation import Calculation
+
+@dataclass(frozen=True)
+class ReplayChange:
+    '''A history entry whose result differs under the replay context'''
+    index: int
+    calculation: Calculation
+    original: Optional[Decimal]
+    replayed: Optional[Decimal]
+
+def _evaluate_batch(calculations: Sequence[Calculation], context: Context) -> List[Optional[Decimal]]:
+    '''Evaluate one batch of calculations sharing an operation under context; undefined results become None'''
+    results: List[Optional[Decimal]] = []
+    with localcontext(context):
+        for calculation in calculations:
+            try:
+                results.append(calculation.compute())
+            except (ValueError, ArithmeticError):
+                results.append(None)
+    return results
+
+def _group_by_operation(entries: Sequence[Tuple[int, Calculation]]) -> Dict[Callable, List[Tuple[int, Calculation]]]:
+    '''Group (index, calculation) pairs by their operation, preserving order within each group'''
+    groups: Dict[Callable, List[Tuple[int, Calculation]]] = {}
+    for index, calculation in entries:
+        groups.setdefault(calculation.operation, []).append((index, calculation))
+    return groups
+
+def _evaluate_all(groups: Dict[Callable, List[Tuple[int, Calculation]]], contexts: Sequence[Context], batch_size: int,
+                  parallel_threshold: int) -> List[Dict[int, Optional[Decimal]]]:
+    '''
+    Evaluate every grouped entry under each of contexts, batching per operation.
+
+    Groups at least parallel_threshold long are evaluated in worker processes from a single pool shared by all contexts.
+    '''
+    results: List[Dict[int, Optional[Decimal]]] = [{} for _ in contexts]
+    pending = []
+    executor = None
+    try:
+        for group in groups.values():
+            for start in range(0, len(group), batch_size):
+                batch = group[start:start + batch_size]
+                calculations = [calc for _, calc in batch]
+                indexes = [index for index, _ in batch]
+                for context, context_results in zip(contexts, results):
+                    if len(group) >= parallel_threshold:
+                        executor = executor or ProcessPoolExecutor()
+                        pending.append((indexes, context_results, executor.submit(_evaluate_batch, calculations, context)))
+                    else:
+                        context_results.update(zip(indexes, _evaluate_batch(calculations, context)))
+        for indexes, context_results, future in pending:
+            context_results.update(zip(indexes, future.result()))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return results
+
+def replay_history(context: Context, start: int = 0, stop: Optional[int] = None, batch_size: int = 1000,
+                   parallel_threshold: int = 50000, history: Optional[Sequence[Calculation]] = None) -> List[ReplayChange]:
+    '''
+    Recompute history entries under context and return the entries whose result changed.
+
+    Args:
+        context (Context): Decimal context (precision, rounding) to replay under.
+        start, stop (int): Slice of the history to replay; defaults to all of it.
+        batch_size (int): Number of entries evaluated per batch.
+        parallel_threshold (int): Operation groups at least this large are evaluated in worker processes.
+        history (list): Calculations to replay; defaults to a snapshot of the session history.
+
+    The original entries are never modified. Calculations do not store their results, so "original" means
+    the result recomputed under the current context, which differs from what was shown at the time if the
+    context has changed since.
+    N-ary reductions record only their result, not their operands, so they replay unchanged.
+    '''
+    if history is None:
+        history = Calculator.session_history().snapshot()
+    entries = list(enumerate(history))[start:stop]
+    original, replayed = _evaluate_all(_group_by_operation(entries), (getcontext().copy(), context),
+                                       batch_size, parallel_threshold)
+    changes = []
+    for index, calculation in entries:
+        if str(original[index]) != str(replayed[index]):
+            changes.append(ReplayChange(index, calculation, original[index], replayed[index]))
+    return changes
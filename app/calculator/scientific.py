@@ -0,0 +1,133 @@
+'''app/calculator/scientific.py: Scientific operations at arbitrary Decimal precision: powers, roots, exponentials and logarithms.'''
+from decimal import Decimal, getcontext, localcontext
+from functools import lru_cache
+from typing import Optional
+
+# Extra digits carried through intermediate steps so the final rounding is the only visible one
+GUARD_DIGITS = 5
+
+class ScientificOperations():
+    '''
+    Scientific operations. Unary operations take (a, b=None) so they fit Calculation's (a, b, operation) shape.
+
+    sqrt, exp, ln and log10 use Decimal's own correctly rounded implementations (libmpdec, in C), which are
+    faster than any Python-level iteration; integer powers use binary exponentiation and n-th roots use
+    Newton iteration with precision doubling.
+    '''
+
+    @staticmethod
+    def integer_power(a: Decimal, b: Decimal) -> Decimal:
+        '''a raised to the integer b by repeated squaring: O(log b) multiplications with guard digits and one final rounding'''
+        if not b.is_finite():
+            raise ValueError("The exponent must be a finite integer.")
+        exponent = int(b)
+        if exponent != b:
+            raise ValueError("The exponent must be an integer.")
+        if exponent < 0:
+            if a == 0:
+                raise ValueError("Cannot raise zero to a negative power.")
+            with localcontext() as ctx:
+                ctx.prec += GUARD_DIGITS
+                inverse = 1 / ScientificOperations.integer_power(a, Decimal(-exponent))
+            return +inverse
+        with localcontext() as ctx:
+            ctx.prec += len(str(exponent)) + GUARD_DIGITS
+            result, base = Decimal(1), a
+            while exponent:
+                if exponent & 1:
+                    result *= base
+                exponent >>= 1
+                if exponent:
+                    base *= base
+        return +result
+
+    @staticmethod
+    def power(a: Decimal, b: Decimal) -> Decimal:
+        '''a raised to b: integer exponents use integer_power, others a ** b (exp(b ln a), correctly rounded)'''
+        if b.is_infinite():
+            raise ValueError("The exponent must be finite.")
+        if b == b.to_integral_value():
+            return ScientificOperations.integer_power(a, b)
+        if a < 0:
+            raise ValueError("Cannot raise a negative number to a fractional power.")
+        if a == 0:
+            if b < 0:
+                raise ValueError("Cannot raise zero to a negative power.")
+            return Decimal(0)
+        return a ** b
+
+    @staticmethod
+    def square_root(a: Decimal, b: Optional[Decimal] = None) -> Decimal:
+        '''Square root of a (correctly rounded)'''
+        if a < 0:
+            raise ValueError("Cannot take the square root of a negative number.")
+        return a.sqrt()
+
+    @staticmethod
+    def root(a: Decimal, b: Decimal) -> Decimal:
+        '''The b-th root of a by Newton iteration, doubling the working precision each step'''
+        if not b.is_finite():
+            raise ValueError("The root degree must be a positive integer.")
+        degree = int(b)
+        if degree != b or degree < 1:
+            raise ValueError("The root degree must be a positive integer.")
+        if a < 0 and degree % 2 == 0:
+            raise ValueError("Cannot take an even root of a negative number.")
+        if a == 0 or degree == 1:
+            return +a
+        if a < 0:
+            return -ScientificOperations.root(-a, b)
+        target = getcontext().prec + GUARD_DIGITS
+        with localcontext() as ctx:
+            # Start from a 15-digit estimate; each Newton step roughly doubles the correct digits
+            ctx.prec = 15
+            x = (a.ln() / degree).exp()
+            precisions = [target]
+            while precisions[-1] > 15:
+                precisions.append(precisions[-1] // 2 + 1)
+            # Run each step at roughly twice the previous precision, plus one extra step at the target
+            for precision in [*reversed(precisions), target]:
+                ctx.prec = precision
+                x = ((degree - 1) * x + a / x ** (degree - 1)) / degree
+            # Exact integer roots are returned without trailing zeros, as Decimal.sqrt does
+            nearest = x.to_integral_value()
+            if nearest ** degree == a:
+                return +nearest
+        return +x
+
+    @staticmethod
+    def exponential(a: Decimal, b: Optional[Decimal] = None) -> Decimal:
+        '''e raised to a (correctly rounded)'''
+        return a.exp()
+
+    @staticmethod
+    def natural_log(a: Decimal, b: Optional[Decimal] = None) -> Decimal:
+        '''Natural logarithm of a (correctly rounded)'''
+        if a <= 0:
+            raise ValueError("Logarithms are only defined for positive numbers.")
+        return a.ln()
+
+    @staticmethod
+    def log10(a: Decimal, b: Optional[Decimal] = None) -> Decimal:
+        '''Base-10 logarithm of a (correctly rounded)'''
+        if a <= 0:
+            raise ValueError("Logarithms are only defined for positive numbers.")
+        return a.log10()
+
+    @staticmethod
+    def logarithm(a: Decimal, b: Decimal) -> Decimal:
+        '''Logarithm of a in base b, as ln(a) / ln(b) with ln(b) cached for each base and precision'''
+        if a <= 0 or b <= 0 or b == 1:
+            raise ValueError("Logarithms need a positive number and a positive base other than 1.")
+        precision = getcontext().prec
+        with localcontext() as ctx:
+            ctx.prec = precision + GUARD_DIGITS
+            quotient = a.ln() / _cached_ln(b, ctx.prec)
+        return +quotient
+
+@lru_cache(maxsize=256)
+def _cached_ln(base: Decimal, precision: int) -> Decimal:
+    '''ln(base) at the given precision; bases such as 10 or 2 are reused across calls'''
+    with localcontext() as ctx:
+        ctx.prec = precision
+        return base.ln()
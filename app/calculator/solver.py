@@ -0,0 +1,341 @@
+'''app/calculator/solver.py: Formulas in one variable built from the Operations. Tabulates them over a grid a chunk at a time, and finds their roots by bisection, Newton or Brent iteration.'''
+import ast
+import math
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation, ROUND_FLOOR, getcontext
+from itertools import repeat
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+from app.calculator.limits import LimitExceeded, OperationCancelled
+from app.calculator.operations import Operations as op
+from app.calculator.rational import Rational
+from app.calculator.scientific import ScientificOperations as sci
+from app.calculator.vectors import np
+
+Number = Union[Decimal, float]
+
+# Exact formulas run on the Decimal Operations; float ones on NumPy ufuncs when it is installed, else on math
+_EXACT_OPERATIONS = {ast.Add: op.addition, ast.Sub: op.subtraction, ast.Mult: op.multiplication,
+                     ast.Div: op.division, ast.Pow: sci.power}
+_EXACT_FUNCTIONS = {'sqrt': sci.square_root, 'exp': sci.exponential, 'ln': sci.natural_log, 'log10': sci.log10}
+_FLOAT_OPERATIONS = {ast.Add: op.addition, ast.Sub: op.subtraction, ast.Mult: op.multiplication,
+                     ast.Div: op.division, ast.Pow: math.pow}
+_FLOAT_FUNCTIONS = {'sqrt': math.sqrt, 'exp': math.exp, 'ln': math.log, 'log10': math.log10}
+if np is not None:
+    _ARRAY_OPERATIONS = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply,
+                         ast.Div: np.divide, ast.Pow: np.power}
+    _ARRAY_FUNCTIONS = {'sqrt': np.sqrt, 'exp': np.exp, 'ln': np.log, 'log10': np.log10}
+
+class Formula:
+    '''
+    A formula in one variable, such as '1000 * (1 + x) ** 10 - 2000', over + - * / **, parentheses and
+    sqrt, exp, ln and log10. Other names are constants, e.g. the values of named cells.
+
+    Calling a formula evaluates it at one point and raises for an undefined value. evaluate works on a
+    whole column of points: each operation in the formula is applied to the entire column before the
+    next, so the tree is walked once per column rather than once per point. A point where the formula is
+    undefined comes out as None (NaN for NumPy columns) instead of stopping the column.
+    '''
+
+    def __init__(self, source: str, variable: str = 'x', constants: Optional[Dict[str, object]] = None,
+                 exact: bool = True) -> None:
+        '''Constructor method with type hints; raises ValueError for an invalid formula or an unknown name'''
+        self.source = source.strip()
+        self.variable = variable
+        self.exact = exact
+        self._tree = _parse(self.source, exact)
+        constants = constants or {}
+        functions = {id(node.func) for node in ast.walk(self._tree) if isinstance(node, ast.Call)}
+        names = {node.id for node in ast.walk(self._tree) if isinstance(node, ast.Name) and id(node) not in functions} - {variable}
+        unknown = sorted(name for name in names if name not in constants or constants[name] is None)
+        if unknown:
+            raise ValueError(f"Unknown name(s) in formula: {', '.join(unknown)}")
+        self.constants = {name: self.number(constants[name]) for name in names}
+
+    def number(self, value) -> Number:
+        '''value as the formula's number type'''
+        if isinstance(value, Rational):
+            value = value.to_decimal()
+        if self.exact:
+            return value if isinstance(value, Decimal) else Decimal(str(value))
+        return float(value)
+
+    def __call__(self, x) -> Number:
+        '''The value at x; raises ValueError or ArithmeticError where the formula is undefined'''
+        return self._evaluate(self._tree, self.number(x), _EXACT_OPERATIONS if self.exact else _FLOAT_OPERATIONS,
+                              _EXACT_FUNCTIONS if self.exact else _FLOAT_FUNCTIONS)
+
+    def evaluate(self, xs):
+        '''The values at a column of points: a list, or a NumPy array for float formulas when NumPy is installed'''
+        if not self.exact and np is not None:
+            with np.errstate(all='ignore'):
+                column = self._evaluate(self._tree, np.asarray(xs, dtype=float), _ARRAY_OPERATIONS, _ARRAY_FUNCTIONS)
+            return np.broadcast_to(column, np.shape(xs))
+        column = self._evaluate(self._tree, list(xs), _EXACT_OPERATIONS if self.exact else _FLOAT_OPERATIONS,
+                                _EXACT_FUNCTIONS if self.exact else _FLOAT_FUNCTIONS)
+        return column if isinstance(column, list) else [column] * len(xs)
+
+    def derivative(self, x) -> Number:
+        '''Central-difference estimate of the slope at x, with a step balancing truncation and rounding error'''
+        x = self.number(x)
+        step = _epsilon(x) ** (Decimal(1) / 3 if self.exact else 1 / 3) * max(abs(x), 1)
+        return (self(x + step) - self(x - step)) / (2 * step)
+
+    def _evaluate(self, node: ast.expr, x, operations: Dict, functions: Dict):
+        '''Evaluate node with x (a point or a column) for the variable'''
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            return x if node.id == self.variable else self.constants[node.id]
+        if isinstance(node, ast.UnaryOp):
+            operand = self._evaluate(node.operand, x, operations, functions)
+            if isinstance(node.op, ast.UAdd):
+                return operand
+            return _apply(lambda value: -value, operand) if isinstance(operand, list) else -operand
+        if isinstance(node, ast.Call):
+            return _apply(functions[node.func.id], self._evaluate(node.args[0], x, operations, functions))
+        return _apply(operations[type(node.op)], self._evaluate(node.left, x, operations, functions),
+                      self._evaluate(node.right, x, operations, functions))
+
+    def __repr__(self):
+        return f"Formula({self.source!r})"
+
+def _apply(function: Callable, *arguments):
+    '''
+    Apply function to scalars, or element by element to list columns with scalars broadcast.
+
+    Columns are computed in one comprehension; only a column containing an undefined point is redone
+    point by point, with None for each undefined point.
+    '''
+    if not any(isinstance(argument, list) for argument in arguments):
+        return function(*arguments)
+    length = next(len(argument) for argument in arguments if isinstance(argument, list))
+    def rows():
+        return zip(*(argument if isinstance(argument, list) else repeat(argument, length) for argument in arguments))
+    try:
+        return [function(*row) for row in rows()]
+    except (ValueError, ArithmeticError, TypeError):
+        return [_defined(function, row) for row in rows()]
+
+def _defined(function: Callable, row: Tuple):
+    '''function(*row), or None where it is undefined or an input already was'''
+    if any(value is None for value in row):
+        return None
+    try:
+        return function(*row)
+    except (ValueError, ArithmeticError):
+        return None
+
+def _parse(source: str, exact: bool) -> ast.expr:
+    '''Parse a formula, allowing only numbers, names, + - * / **, parentheses and the known functions'''
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError:
+        raise ValueError(f"Invalid formula: {source}") from None
+    for node in ast.walk(tree.body):
+        if isinstance(node, ast.Constant):
+            try:
+                text = ast.get_source_segment(source, node)
+                node.value = Decimal(text) if exact else float(text)
+            except (InvalidOperation, TypeError, ValueError):
+                raise ValueError(f"Invalid number in formula: {source}") from None
+        elif isinstance(node, ast.BinOp):
+            if type(node.op) not in _EXACT_OPERATIONS:
+                raise ValueError(f"Unsupported operator in formula: {source}")
+        elif isinstance(node, ast.UnaryOp):
+            if not isinstance(node.op, (ast.UAdd, ast.USub)):
+                raise ValueError(f"Unsupported operator in formula: {source}")
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in _EXACT_FUNCTIONS or len(node.args) != 1 or node.keywords:
+                raise ValueError(f"Unsupported function in formula: {source} (use {', '.join(_EXACT_FUNCTIONS)})")
+        elif not isinstance(node, (ast.Name, ast.Load, ast.operator, ast.unaryop)):
+            raise ValueError(f"Unsupported expression in formula: {source}")
+    return tree.body
+
+def grid(start: Number, stop: Number, step: Number) -> Tuple[int, Callable[[int], Number]]:
+    '''
+    (number of points, point i) for start, start + step, ... up to stop; each point is computed from i,
+    so errors do not accumulate. A float span a few ulps short of a whole number of steps, as 0.3 / 0.1
+    is, still reaches stop.
+    '''
+    if not all(value.is_finite() if isinstance(value, Decimal) else math.isfinite(value) for value in (start, stop, step)):
+        raise ValueError("The grid must have finite ends and step.")
+    if step == 0:
+        raise ValueError("The grid step cannot be zero.")
+    if (stop - start) * step < 0:
+        raise ValueError("The grid step must go from the first point towards the last.")
+    span = (stop - start) / step
+    if isinstance(span, Decimal):
+        count = int(span.to_integral_value(ROUND_FLOOR)) + 1
+    else:
+        count = math.floor(span * (1 + 4 * sys.float_info.epsilon)) + 1
+    return count, lambda i: start + step * i
+
+def tabulate(formula: Formula, start: Number, stop: Number, step: Number, chunk_size: int = 4096,
+             cancel_event: Optional[threading.Event] = None, max_points: Optional[int] = None,
+             check: Optional[Callable[[], None]] = None) -> Iterator[Tuple[Number, Optional[Number]]]:
+    '''
+    Yield (x, formula(x)) for the points of a grid, evaluating chunk_size points at a time.
+
+    Only one chunk is held in memory, so grids of any size stream in bounded memory; cancel_event is
+    checked between chunks. check, e.g. OperationLimits.checkpoint, is called once per point and may
+    raise to stop the table. Undefined points yield None (NaN for NumPy columns).
+
+    Raises:
+        ValueError: If the grid is empty, infinite or its step is zero.
+        LimitExceeded: If the grid has more than max_points points.
+        OperationCancelled: If cancel_event is set.
+    '''
+    start, stop, step = formula.number(start), formula.number(stop), formula.number(step)
+    count, point = grid(start, stop, step)
+    if max_points is not None and count > max_points:
+        raise LimitExceeded(f"More than {max_points} steps requested.")
+    for begin in range(0, count, chunk_size):
+        _check_cancelled(cancel_event)
+        end = min(begin + chunk_size, count)
+        if not formula.exact and np is not None:
+            xs = start + step * np.arange(begin, end, dtype=float)
+        else:
+            xs = [point(i) for i in range(begin, end)]
+        if check is None:
+            yield from zip(xs, formula.evaluate(xs))
+            continue
+        for row in zip(xs, formula.evaluate(xs)):
+            check()
+            yield row
+
+@dataclass
+class Solution:
+    '''The outcome of a root search: the root found, the value there, and how long it took'''
+    method: str
+    root: Number
+    value: Number
+    iterations: int
+    seconds: float
+    converged: bool = True
+
+    def __str__(self):
+        status = '' if self.converged else ' (not converged to the tolerance)'
+        return (f"{self.method}: x = {self.root}, f(x) = {self.value} after {self.iterations} iteration(s) "
+                f"in {self.seconds * 1e3:.3f} ms{status}")
+
+def _epsilon(x: Number) -> Number:
+    '''The relative rounding error of x's number type: the Decimal context's precision, or a double's'''
+    if isinstance(x, Decimal):
+        return Decimal(10) ** (1 - getcontext().prec)
+    return sys.float_info.epsilon
+
+def _bracket(f: Callable, low: Number, high: Number) -> Tuple[Number, Number, Number, Number]:
+    '''(low, f(low), high, f(high)); raises ValueError unless f changes sign between them'''
+    f_low, f_high = f(low), f(high)
+    if (f_low > 0 and f_high > 0) or (f_low < 0 and f_high < 0):
+        raise ValueError(f"f({low}) and f({high}) have the same sign; the bracket must contain a root.")
+    return low, f_low, high, f_high
+
+def bisection(f: Callable, low: Number, high: Number, tolerance: Number, max_iterations: int = 500,
+              cancel_event: Optional[threading.Event] = None) -> Solution:
+    '''Halve a bracket [low, high] over which f changes sign until it is narrower than 2 * tolerance'''
+    started = time.perf_counter()
+    low, f_low, high, f_high = _bracket(f, low, high)
+    for iterations in range(1, max_iterations + 1):
+        _check_cancelled(cancel_event)
+        if f_low == 0 or f_high == 0:
+            root, value = (low, f_low) if f_low == 0 else (high, f_high)
+            return Solution('bisection', root, value, iterations - 1, time.perf_counter() - started)
+        middle = (low + high) / 2
+        f_middle = f(middle)
+        if f_middle == 0 or abs(high - low) / 2 <= tolerance or middle in (low, high):
+            return Solution('bisection', middle, f_middle, iterations, time.perf_counter() - started)
+        if (f_middle < 0) == (f_low < 0):
+            low, f_low = middle, f_middle
+        else:
+            high, f_high = middle, f_middle
+    return Solution('bisection', middle, f_middle, max_iterations, time.perf_counter() - started, converged=False)
+
+def newton(f: Callable, guess: Number, tolerance: Number, max_iterations: int = 100,
+           derivative: Optional[Callable] = None, cancel_event: Optional[threading.Event] = None) -> Solution:
+    '''
+    Newton iteration from guess until a step is no larger than tolerance.
+
+    derivative defaults to f.derivative (a central difference) for a Formula.
+
+    Raises:
+        ValueError: If the derivative vanishes at an iterate.
+    '''
+    started = time.perf_counter()
+    derivative = derivative or f.derivative
+    x, value = guess, f(guess)
+    for iterations in range(1, max_iterations + 1):
+        _check_cancelled(cancel_event)
+        if value == 0:
+            return Solution('newton', x, value, iterations - 1, time.perf_counter() - started)
+        slope = derivative(x)
+        if slope == 0:
+            raise ValueError(f"The derivative is zero at x = {x}; try another starting guess.")
+        step = value / slope
+        x = x - step
+        value = f(x)
+        if abs(step) <= tolerance:
+            return Solution('newton', x, value, iterations, time.perf_counter() - started)
+    return Solution('newton', x, value, max_iterations, time.perf_counter() - started, converged=False)
+
+def brent(f: Callable, low: Number, high: Number, tolerance: Number, max_iterations: int = 200,
+          cancel_event: Optional[threading.Event] = None) -> Solution:
+    '''
+    Brent's method on a bracket [low, high] over which f changes sign.
+
+    Inverse quadratic interpolation or secant steps where they make progress, bisection where they do
+    not: as robust as bisection and usually as fast as the secant method (Brent, 1973, as in Numerical Recipes' zbrent).
+    '''
+    started = time.perf_counter()
+    a, fa, b, fb = _bracket(f, low, high)
+    c, fc = b, fb
+    d = e = b - a
+    epsilon = _epsilon(b)
+    for iterations in range(1, max_iterations + 1):
+        _check_cancelled(cancel_event)
+        if (fb > 0 and fc > 0) or (fb < 0 and fc < 0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        bound = 2 * epsilon * abs(b) + tolerance / 2
+        middle = (c - b) / 2
+        if abs(middle) <= bound or fb == 0:
+            return Solution('brent', b, fb, iterations - 1, time.perf_counter() - started)
+        if abs(e) >= bound and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                p, q = 2 * middle * s, 1 - s
+            else:
+                q, r = fa / fc, fb / fc
+                p = s * (2 * middle * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * middle * q - abs(bound * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = middle
+        else:
+            d = e = middle
+        a, fa = b, fb
+        b += d if abs(d) > bound else (bound if middle > 0 else -bound)
+        fb = f(b)
+    return Solution('brent', b, fb, max_iterations, time.perf_counter() - started, converged=False)
+
+def _check_cancelled(cancel_event: Optional[threading.Event]) -> None:
+    '''Raise OperationCancelled once cancel_event is set'''
+    if cancel_event is not None and cancel_event.is_set():
+        raise OperationCancelled("Calculation cancelled.")
+
+# Root finders by name, for the solve plugin
+METHODS: Dict[str, Callable[..., Solution]] = {'bisection': bisection, 'newton': newton, 'brent': brent}
+
+def default_tolerance(exact: bool) -> Number:
+    '''A tolerance the root finders can reach for roots near 1: a few digits short of the Decimal precision, or 1e-12'''
+    return Decimal(10) ** (8 - getcontext().prec) if exact else 1e-12
@@ -0,0 +1,189 @@
+'''app/calculator/stats.py: One-pass descriptive statistics over streams of numbers, with a mergeable KLL sketch for approximate quantiles.'''
+import math
+import random
+from decimal import Decimal, MAX_PREC, localcontext
+from functools import partial
+from typing import Iterable, List, Optional, Sequence, Tuple
+from app.calculator.operations import _reduce_chunks, _chunks
+
+DEFAULT_QUANTILES = (Decimal('0.01'), Decimal('0.25'), Decimal('0.5'), Decimal('0.75'), Decimal('0.99'))
+
+class KLLSketch:
+    '''
+    KLL quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Keeps a stack of compactors; level h holds items that each stand for 2**h input values. When the
+    sketch is full, the lowest full compactor is sorted and every other item (starting at a random
+    offset) is promoted to the next level. Memory is O(k log(n / k)) and the rank error is about 1/k.
+    Compaction coin flips come from a Random seeded by the caller, so results are reproducible.
+    '''
+
+    def __init__(self, k: int = 200, seed=0) -> None:
+        '''Constructor method with type hints; k trades memory for accuracy'''
+        if k < 2:
+            raise ValueError("The sketch size k must be at least 2.")
+        self.k = k
+        self.compactors: List[list] = []
+        self.size = 0
+        self.max_size = 0
+        self._random = random.Random(seed)
+        self._grow()
+
+    def capacity(self, level: int) -> int:
+        '''How many items level may hold before it is compacted; lower levels get geometrically less room'''
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def update(self, value) -> None:
+        '''Add one value'''
+        self.compactors[0].append(value)
+        self.size += 1
+        if self.size >= self.max_size:
+            self._compress()
+
+    def merge(self, other: 'KLLSketch') -> None:
+        '''Fold another sketch into this one; the result is as accurate as a sketch of the combined stream'''
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level].extend(compactor)
+        self.size = sum(len(compactor) for compactor in self.compactors)
+        while self.size >= self.max_size:
+            self._compress()
+
+    def quantile(self, q) -> Optional[Decimal]:
+        '''Approximate value at quantile q (0-1); None for an empty sketch'''
+        weighted = sorted((item, 1 << level) for level, compactor in enumerate(self.compactors) for item in compactor)
+        if not weighted:
+            return None
+        target = q * sum(weight for _, weight in weighted)
+        seen = 0
+        for item, weight in weighted:
+            seen += weight
+            if seen >= target:
+                return item
+        return weighted[-1][0]
+
+    def _grow(self) -> None:
+        '''Add a level on top; every level's capacity grows with the height'''
+        self.compactors.append([])
+        self.max_size = sum(self.capacity(level) for level in range(len(self.compactors)))
+
+    def _compress(self) -> None:
+        '''Compact the lowest full level into the one above it'''
+        for level, compactor in enumerate(self.compactors):
+            if len(compactor) >= self.capacity(level):
+                if level + 1 >= len(self.compactors):
+                    self._grow()
+                compactor.sort()
+                # An odd item out stays behind so that every promoted item stands for exactly two
+                leftover = [compactor.pop()] if len(compactor) % 2 else []
+                self.compactors[level + 1].extend(compactor[self._random.random() < 0.5::2])
+                compactor[:] = leftover
+                self.size = sum(len(compactor) for compactor in self.compactors)
+                if self.size < self.max_size:
+                    break
+
+class StreamSummary:
+    '''
+    Count, mean, variance, min and max of a stream in one pass, plus a KLL sketch for quantiles.
+
+    The sum and sum of squares are kept exactly, so partial summaries merge without error and the
+    mean and variance are rounded once, to the current Decimal context, when read.
+    '''
+
+    def __init__(self, k: int = 200, seed=0) -> None:
+        '''Constructor method with type hints'''
+        self.count = 0
+        self.total = Decimal(0)
+        self.total_squares = Decimal(0)
+        self.minimum: Optional[Decimal] = None
+        self.maximum: Optional[Decimal] = None
+        self.sketch = KLLSketch(k, seed)
+
+    def update(self, values: Iterable[Decimal]) -> 'StreamSummary':
+        '''Add every value in values'''
+        with localcontext() as ctx:
+            ctx.prec = MAX_PREC
+            for value in values:
+                self.count += 1
+                self.total += value
+                self.total_squares += value * value
+                if self.minimum is None or value < self.minimum:
+                    self.minimum = value
+                if self.maximum is None or value > self.maximum:
+                    self.maximum = value
+                self.sketch.update(value)
+        return self
+
+    def merge(self, other: 'StreamSummary') -> 'StreamSummary':
+        '''Fold another summary into this one'''
+        with localcontext() as ctx:
+            ctx.prec = MAX_PREC
+            self.count += other.count
+            self.total += other.total
+            self.total_squares += other.total_squares
+        self.minimum = min(value for value in (self.minimum, other.minimum) if value is not None) if self.count else None
+        self.maximum = max(value for value in (self.maximum, other.maximum) if value is not None) if self.count else None
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def mean(self) -> Decimal:
+        '''Arithmetic mean; raises ValueError for no values'''
+        if not self.count:
+            raise ValueError("Cannot take the mean of no values.")
+        return self.total / self.count
+
+    @property
+    def variance(self) -> Decimal:
+        '''Sample variance (n - 1 denominator), rounded once; raises ValueError for fewer than two values'''
+        if self.count < 2:
+            raise ValueError("The variance needs at least two values.")
+        with localcontext() as ctx:
+            ctx.prec = MAX_PREC
+            spread = self.count * self.total_squares - self.total * self.total
+        return spread / (self.count * (self.count - 1))
+
+    @property
+    def stdev(self) -> Decimal:
+        '''Sample standard deviation'''
+        return self.variance.sqrt()
+
+    def quantiles(self, qs: Sequence[Decimal] = DEFAULT_QUANTILES) -> List[Tuple[Decimal, Decimal]]:
+        '''(q, approximate value) for each quantile in qs'''
+        return [(q, self.sketch.quantile(q)) for q in qs]
+
+    def __str__(self):
+        '''The summary as one line per statistic'''
+        if not self.count:
+            return "count: 0"
+        lines = [f"count: {self.count}", f"mean: {self.mean}"]
+        if self.count > 1:
+            lines += [f"variance: {self.variance}", f"stdev: {self.stdev}"]
+        lines += [f"min: {self.minimum}", f"max: {self.maximum}"]
+        lines += [f"p{float(q) * 100:g}: {value}" for q, value in self.quantiles()]
+        return "\n".join(lines)
+
+def _summarize_chunks(numbered_chunks: List[Tuple[int, List[Decimal]]], k: int, seed) -> StreamSummary:
+    '''Summarize numbered chunks; chunk i is sketched with its own seed derived from (seed, i)'''
+    summary = None
+    for index, chunk in numbered_chunks:
+        partial_summary = StreamSummary(k, f"{seed}:{index}").update(chunk)
+        summary = partial_summary if summary is None else summary.merge(partial_summary)
+    return summary
+
+def describe(values: Iterable[Decimal], chunk_size: int = 4096, workers: int = 0, k: int = 200, seed=0) -> StreamSummary:
+    '''
+    Summarize a stream of values in one pass.
+
+    The stream is cut into chunks of chunk_size values; each chunk is summarized (in worker processes
+    when workers > 1) and the partial summaries are merged in stream order. Every chunk's sketch is
+    seeded from seed and its position, so the result depends only on the values, chunk_size, k and
+    seed, not on the number of workers.
+    '''
+    numbered = enumerate(_chunks(values, chunk_size))
+    summary = StreamSummary(k, seed)
+    for partial_summary in _reduce_chunks(numbered, partial(_summarize_chunks, k=k, seed=seed), 1, workers):
+        summary.merge(partial_summary)
+    return summary
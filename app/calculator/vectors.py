@@ -0,0 +1,162 @@
+'''app/calculator/vectors.py: Element-wise vector and matrix operations. Exact mode applies the Decimal Operations to whole rows at once; float mode uses NumPy when it is installed.'''
+import math
+from decimal import Decimal, MAX_PREC, localcontext
+from typing import Callable, Iterable, Iterator, List, Sequence, Tuple, Union
+from app.calculator.operations import Operations as op
+
+try:
+    import numpy as np
+    _NUMPY_OPERATIONS = {op.addition: np.add, op.subtraction: np.subtract,
+                         op.multiplication: np.multiply, op.division: np.divide}
+except ImportError:  # NumPy is optional; float mode falls back to plain Python floats
+    np = None
+
+Number = Union[Decimal, float]
+
+# Matrices with more elements than this are shown by shape only
+_SHOWN_ELEMENTS = 12
+
+class Matrix:
+    '''
+    An immutable rectangular grid of numbers; a vector is a matrix with one row and a scalar one with one element.
+
+    Exact matrices hold Decimals. Float matrices hold floats (integers included, exact up to 2**53) and
+    are computed with NumPy when it is available.
+    '''
+    __slots__ = ('rows', 'exact')
+
+    def __init__(self, rows: Iterable[Iterable[Number]], exact: bool = True) -> None:
+        '''Constructor method with type hints; raises ValueError for an empty or ragged grid'''
+        convert = (lambda value: value if isinstance(value, Decimal) else Decimal(str(value))) if exact else float
+        self.rows: Tuple[Tuple[Number, ...], ...] = tuple(tuple(convert(value) for value in row) for row in rows)
+        self.exact = exact
+        if not self.rows or not self.rows[0]:
+            raise ValueError("A matrix needs at least one value.")
+        if any(len(row) != len(self.rows[0]) for row in self.rows):
+            raise ValueError("Every row of a matrix must have the same number of values.")
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        '''(rows, columns)'''
+        return len(self.rows), len(self.rows[0])
+
+    @property
+    def is_scalar(self) -> bool:
+        '''True for a single value, which broadcasts against any shape'''
+        return self.shape == (1, 1)
+
+    @property
+    def is_vector(self) -> bool:
+        '''True for a single row or a single column'''
+        return 1 in self.shape
+
+    def values(self) -> Iterator[Number]:
+        '''Every value, row by row'''
+        for row in self.rows:
+            yield from row
+
+    def columns(self) -> List[Tuple[Number, ...]]:
+        '''The columns of the matrix'''
+        return list(zip(*self.rows))
+
+    def __eq__(self, other):
+        return isinstance(other, Matrix) and self.rows == other.rows
+
+    def __hash__(self):
+        return hash(self.rows)
+
+    def __sizeof__(self):
+        '''Bytes held by the matrix, its rows and its values, for history memory accounting'''
+        return (object.__sizeof__(self) + self.rows.__sizeof__() + sum(row.__sizeof__() for row in self.rows)
+                + sum(value.__sizeof__() for value in self.values()))
+
+    def __str__(self):
+        '''Rows separated by semicolons, e.g. 1 2; 3 4'''
+        return "; ".join(" ".join(str(value) for value in row) for row in self.rows)
+
+    def __repr__(self):
+        '''The values for small matrices, the shape for large ones'''
+        rows, columns = self.shape
+        if rows * columns > _SHOWN_ELEMENTS:
+            return f"<{rows}x{columns} matrix>"
+        return f"[{self}]"
+
+class VectorOperations():
+    '''Element-wise arithmetic with scalar broadcasting, dot product and matrix multiply over Matrix operands'''
+
+    @staticmethod
+    def vector_addition(a: Matrix, b: Matrix) -> Matrix:
+        '''Element-wise sum of a & b'''
+        return _elementwise(a, b, op.addition)
+
+    @staticmethod
+    def vector_subtraction(a: Matrix, b: Matrix) -> Matrix:
+        '''Element-wise difference of a & b'''
+        return _elementwise(a, b, op.subtraction)
+
+    @staticmethod
+    def vector_multiplication(a: Matrix, b: Matrix) -> Matrix:
+        '''Element-wise product of a & b'''
+        return _elementwise(a, b, op.multiplication)
+
+    @staticmethod
+    def vector_division(a: Matrix, b: Matrix) -> Matrix:
+        '''Element-wise quotient of a & b; raises ValueError if any divisor is zero'''
+        if any(value == 0 for value in b.values()):
+            raise ValueError("Cannot divide by zero.")
+        return _elementwise(a, b, op.division)
+
+    @staticmethod
+    def dot_product(a: Matrix, b: Matrix) -> Number:
+        '''Dot product of two vectors of the same length; exact mode rounds once, at the end'''
+        if not (a.is_vector and b.is_vector):
+            raise ValueError("The dot product needs two vectors.")
+        left, right = list(a.values()), list(b.values())
+        if len(left) != len(right):
+            raise ValueError(f"Cannot take the dot product of vectors of length {len(left)} and {len(right)}.")
+        return _dot(left, right, _mode(a, b))
+
+    @staticmethod
+    def matrix_multiplication(a: Matrix, b: Matrix) -> Matrix:
+        '''Matrix product of a (m x k) & b (k x n); each element is an exact-mode dot product'''
+        if a.shape[1] != b.shape[0]:
+            raise ValueError(f"Cannot multiply a {a.shape[0]}x{a.shape[1]} matrix by a {b.shape[0]}x{b.shape[1]} matrix.")
+        exact = _mode(a, b)
+        if not exact and np is not None:
+            return Matrix(np.matmul(np.asarray(a.rows, dtype=float), np.asarray(b.rows, dtype=float)).tolist(), exact=False)
+        columns = b.columns()
+        return Matrix(([_dot(row, column, exact) for column in columns] for row in a.rows), exact)
+
+def _mode(a: Matrix, b: Matrix) -> bool:
+    '''Operands must share a mode; mixing exact and float values would silently lose exactness'''
+    if a.exact != b.exact:
+        raise ValueError("Cannot combine exact and float matrices.")
+    return a.exact
+
+def _elementwise(a: Matrix, b: Matrix, operation: Callable[[Number, Number], Number]) -> Matrix:
+    '''Apply operation element by element, broadcasting a scalar operand against the other's shape'''
+    exact = _mode(a, b)
+    if a.shape != b.shape and not (a.is_scalar or b.is_scalar):
+        raise ValueError(f"Cannot combine a {a.shape[0]}x{a.shape[1]} matrix with a {b.shape[0]}x{b.shape[1]} matrix.")
+    if not exact and np is not None:
+        return Matrix(_NUMPY_OPERATIONS[operation](np.asarray(a.rows, dtype=float), np.asarray(b.rows, dtype=float)).tolist(),
+                      exact=False)
+    # Batched path: whole rows at a time straight through the Operations, with no per-element checks or history
+    if a.is_scalar and not b.is_scalar:
+        scalar = a.rows[0][0]
+        return Matrix(([operation(scalar, value) for value in row] for row in b.rows), exact)
+    if b.is_scalar and not a.is_scalar:
+        scalar = b.rows[0][0]
+        return Matrix(([operation(value, scalar) for value in row] for row in a.rows), exact)
+    return Matrix(([operation(x, y) for x, y in zip(left, right)] for left, right in zip(a.rows, b.rows)), exact)
+
+def _dot(left: Sequence[Number], right: Sequence[Number], exact: bool) -> Number:
+    '''Sum of products: exact products and an exact sum rounded once for Decimal, NumPy or fsum for float'''
+    if not exact:
+        if np is not None:
+            return float(np.dot(np.asarray(left, dtype=float), np.asarray(right, dtype=float)))
+        return math.fsum(x * y for x, y in zip(left, right))
+    with localcontext() as ctx:
+        ctx.prec = MAX_PREC
+        products = [x * y for x, y in zip(left, right)]
+    return op.summation(products)
@@ -1,10 +1,15 @@
 '''app/commands/__init__.py'''
+import time
 from abc import ABC, abstractmethod
 from typing import Dict
 import logging
+from app.events import COMMAND_EVENTS, bus
 
 class Command(ABC):
     '''Abstract base class for commands.'''
+    # Commands that set this take the rest of the command line, e.g. 'set rate 0.07', as execute(args)
+    accepts_arguments = False
+
     @abstractmethod
     def execute(self):
         '''Execute method for the command.'''
@@ -19,9 +24,40 @@ class CommandHandler:
         '''Register a command'''
         self.commands[command_name] = command
 
+    def replace_commands(self, updates: Dict[str, Command], removed=()):
+        '''Register, replace and remove several commands at once; the table is swapped in one assignment, so a lookup never sees half of the change'''
+        commands = {**self.commands, **updates}
+        for command_name in removed:
+            commands.pop(command_name, None)
+        self.commands = commands
+
     def execute_command(self, command_name: str):
-        '''Execute a registered command by name.'''
-        try:
-            self.commands[command_name].execute()
-        except KeyError:
+        '''Execute a registered command by name; for commands that accept arguments, text after the name is passed to execute.'''
+        if command_name in self.commands:
+            return self.commands[command_name].execute()
+        name, _, args = command_name.strip().partition(' ')
+        command = self.commands.get(name)
+        if command is None or not command.accepts_arguments:
             raise KeyError(f"Unknown command: {command_name}")
+        return command.execute(args.strip())
+
+    def _execute_with_hooks(self, command_name: str):
+        '''execute_command, publishing command.before, command.after (with the result) and command.error events'''
+        bus.publish('command.before', command=command_name)
+        started = time.perf_counter()
+        try:
+            result = CommandHandler._execute_plain(self, command_name)
+        except Exception as e:
+            bus.publish('command.error', command=command_name, error=e, elapsed=time.perf_counter() - started)
+            raise
+        bus.publish('command.after', command=command_name, result=result, elapsed=time.perf_counter() - started)
+        return result
+
+    # The hook-free version, swapped back in when the command events lose their last subscriber
+    _execute_plain = execute_command
+
+def _select_dispatch(hooked: bool) -> None:
+    '''Use the hooked execute_command only while someone subscribes to command events'''
+    CommandHandler.execute_command = CommandHandler._execute_with_hooks if hooked else CommandHandler._execute_plain
+
+bus.watch(COMMAND_EVENTS, _select_dispatch)
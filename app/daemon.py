@@ -0,0 +1,175 @@
+'''app/daemon.py: Persistent calculator daemon. Keeps a warm App with its plugins loaded and serves command lines sent by client.py over a local Unix socket.'''
+import argparse
+import builtins
+import contextlib
+import fcntl
+import io
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Iterable, List, Optional
+from app import App
+
+DEFAULT_IDLE_TIMEOUT = 300.0
+# Seconds a client has to send its request and read the reply before the daemon drops it
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+def default_socket_path() -> str:
+    '''The socket path from CALC_DAEMON_SOCKET, or a per-user path in the temp directory'''
+    return os.environ.get('CALC_DAEMON_SOCKET') or os.path.join('/tmp', f"calculator-{os.getuid()}.sock")
+
+def read_message(connection: socket.socket) -> str:
+    '''Read everything the peer sends until it shuts down its side of the connection'''
+    chunks = []
+    while chunk := connection.recv(65536):
+        chunks.append(chunk)
+    return b''.join(chunks).decode('utf-8')
+
+class CalculatorDaemon:
+    '''
+    Serve requests against one warm App.
+
+    A request is a command line followed by the answers to its prompts, one per line; the reply is
+    everything the command printed. Requests are handled one at a time, and a client that has not
+    finished within request_timeout seconds is dropped. The daemon exits after idle_timeout seconds
+    without a request, or when it receives 'exit'. A lock file next to the socket keeps a second
+    daemon from replacing the socket of one already running.
+    '''
+
+    def __init__(self, socket_path: Optional[str] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 request_timeout: float = DEFAULT_REQUEST_TIMEOUT) -> None:
+        '''Create the App and load its plugins once'''
+        self.socket_path = socket_path or default_socket_path()
+        self.idle_timeout = idle_timeout
+        self.request_timeout = request_timeout
+        self.app = App()
+        self.app.load_plugins()
+        self.running = False
+
+    def handle(self, request: str) -> str:
+        '''Run one request and return its output'''
+        lines = request.splitlines()
+        if not lines or not lines[0].strip():
+            return "No command given.\n"
+        command = lines[0].strip()
+        if command.lower() == 'exit':
+            self.running = False
+            return "Calculator daemon stopped.\n"
+        answers = iter(lines[1:])
+
+        def scripted_input(prompt=''):
+            print(prompt, end='')
+            try:
+                answer = next(answers)
+            except StopIteration:
+                raise EOFError("Not enough input for the command.") from None
+            print(answer)
+            return answer
+
+        original_input = builtins.input
+        builtins.input = scripted_input
+        try:
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                try:
+                    self.app.command_handler.execute_command(command)
+                except KeyError:
+                    logging.error(f"Unknown command: {command}")
+                    print(f"Unknown command: {command}")
+                except EOFError as e:
+                    print(f"\n{e}")
+                except SystemExit as e:
+                    print(e)
+                except Exception as e:
+                    logging.exception(f"Command '{command}' failed.")
+                    print(f"\nError: {e}")
+        finally:
+            builtins.input = original_input
+        return output.getvalue()
+
+    def serve_forever(self) -> None:
+        '''Accept requests until idle for idle_timeout seconds or told to exit; returns at once if another daemon owns the socket'''
+        lock = os.open(self.socket_path + '.lock', os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logging.info(f"Another calculator daemon is serving {self.socket_path}.")
+                return
+            self._serve()
+        finally:
+            os.close(lock)
+
+    def _serve(self) -> None:
+        '''The accept loop; the caller holds the lock, so a socket file left at the path is stale'''
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            # Created owner-only from the start, rather than chmod-ed after bind has made it reachable
+            previous_umask = os.umask(0o177)
+            try:
+                server.bind(self.socket_path)
+            finally:
+                os.umask(previous_umask)
+            server.listen()
+            server.settimeout(self.idle_timeout)
+            self.running = True
+            logging.info(f"Calculator daemon listening on {self.socket_path}.")
+            while self.running:
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    logging.info("Calculator daemon idle; exiting.")
+                    break
+                with connection:
+                    connection.settimeout(self.request_timeout)
+                    try:
+                        connection.sendall(self.handle(read_message(connection)).encode('utf-8'))
+                    except OSError as e:
+                        logging.warning(f"Dropped a client request: {e}")
+        finally:
+            server.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+
+def time_cold_start(lines: List[str], runs: int = 5, cwd: Optional[str] = None) -> float:
+    '''Median seconds for `python main.py` to start, run the request and exit'''
+    script = "\n".join(lines + ['exit']) + "\n"
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'main.py'], input=script, capture_output=True, text=True, cwd=cwd, check=False)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+def time_client(lines: List[str], runs: int = 5, cwd: Optional[str] = None) -> float:
+    '''Median seconds for `python client.py` to send the request to a warm daemon and print the reply'''
+    subprocess.run([sys.executable, 'client.py'] + lines, capture_output=True, cwd=cwd, check=False)  # warm the daemon
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'client.py'] + lines, capture_output=True, cwd=cwd, check=False)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    '''Command line entry point: python -m app.daemon [--idle-timeout S] [--compare]'''
+    parser = argparse.ArgumentParser(description="Run the calculator daemon.")
+    parser.add_argument('--socket', default=None, help="Unix socket path (default: CALC_DAEMON_SOCKET or /tmp)")
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT)
+    parser.add_argument('--compare', action='store_true', help="Compare cold-start and client latency for 'add 2 3'")
+    args = parser.parse_args(argv)
+    if args.compare:
+        lines = ['add', '2', '3']
+        cold, warm = time_cold_start(lines), time_client(lines)
+        print(f"cold start (python main.py): {cold * 1000:.1f} ms")
+        print(f"client to warm daemon:       {warm * 1000:.1f} ms ({cold / warm:.1f}x faster)")
+        return 0
+    CalculatorDaemon(args.socket, args.idle_timeout).serve_forever()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+'''app/events.py: Lifecycle event bus. Commands and calculations publish before, after and error events that plugins can subscribe to.'''
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+COMMAND_EVENTS = ('command.before', 'command.after', 'command.error')
+CALCULATION_EVENTS = ('calculation.before', 'calculation.after', 'calculation.error')
+
+@dataclass(frozen=True)
+class Event:
+    '''Something that happened: its name (e.g. 'command.after'), its details and when it was published'''
+    name: str
+    payload: Dict[str, Any]
+    timestamp: float = field(default_factory=time.time)
+
+class EventBus:
+    '''
+    Publish/subscribe for lifecycle events.
+
+    Synchronous subscribers run in the publishing thread, in subscription order; asynchronous ones are
+    handed to a single background thread, so they see events in order without slowing the publisher.
+    A failing subscriber is logged and never breaks the command or calculation that published.
+
+    Publishers on hot paths do not check for subscribers on every call: they register a watcher with
+    watch(), which is told whenever their events gain a first subscriber or lose the last one, and swap
+    between a plain implementation and a hooked one.
+    '''
+
+    def __init__(self) -> None:
+        '''Constructor method with type hints'''
+        # Replaced, never mutated, so publish() can read it without a lock
+        self._subscribers: Dict[str, Tuple[Tuple[Callable[[Event], None], bool], ...]] = {}
+        # [names, watcher, whether names had subscribers when the watcher was last told]
+        self._watchers: List[list] = []
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def subscribe(self, name: str, callback: Callable[[Event], None], asynchronous: bool = False) -> Callable[[], None]:
+        '''Call callback(event) for every event called name; returns a function that unsubscribes it'''
+        with self._lock:
+            self._subscribers = {**self._subscribers, name: self._subscribers.get(name, ()) + ((callback, asynchronous),)}
+        self._notify(name)
+        return lambda: self.unsubscribe(name, callback)
+
+    def unsubscribe(self, name: str, callback: Callable[[Event], None]) -> None:
+        '''Stop calling callback for name; unknown subscriptions are ignored'''
+        with self._lock:
+            remaining = tuple(entry for entry in self._subscribers.get(name, ()) if entry[0] != callback)
+            subscribers = dict(self._subscribers)
+            if remaining:
+                subscribers[name] = remaining
+            else:
+                subscribers.pop(name, None)
+            self._subscribers = subscribers
+        self._notify(name)
+
+    def has_subscribers(self, *names: str) -> bool:
+        '''True if any of names has a subscriber'''
+        return any(name in self._subscribers for name in names)
+
+    def watch(self, names: Tuple[str, ...], watcher: Callable[[bool], None]) -> None:
+        '''Call watcher(active) now and whenever names go from no subscribers to some, or back'''
+        active = self.has_subscribers(*names)
+        self._watchers.append([names, watcher, active])
+        watcher(active)
+
+    def publish(self, name: str, **payload) -> None:
+        '''Deliver an event to the subscribers of name; does nothing if there are none'''
+        subscribers = self._subscribers.get(name)
+        if not subscribers:
+            return
+        event = Event(name, payload)
+        for callback, asynchronous in subscribers:
+            if asynchronous:
+                self._background().submit(_deliver, callback, event)
+            else:
+                _deliver(callback, event)
+
+    def drain(self) -> None:
+        '''Wait until every asynchronous delivery so far has run'''
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def clear(self) -> None:
+        '''Remove every subscriber, after delivering pending asynchronous events'''
+        self.drain()
+        with self._lock:
+            names, self._subscribers = list(self._subscribers), {}
+        for name in names:
+            self._notify(name)
+
+    def _background(self) -> ThreadPoolExecutor:
+        '''The thread that runs asynchronous subscribers, started on first use'''
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='events')
+            return self._executor
+
+    def _notify(self, name: str) -> None:
+        '''Tell the watchers of name whether their events now have subscribers'''
+        for entry in self._watchers:
+            names, watcher, was_active = entry
+            if name in names and self.has_subscribers(*names) != was_active:
+                entry[2] = not was_active
+                watcher(entry[2])
+
+def _deliver(callback: Callable[[Event], None], event: Event) -> None:
+    '''Run one subscriber, logging rather than raising its errors'''
+    try:
+        callback(event)
+    except Exception:
+        logging.exception(f"Subscriber {getattr(callback, '__name__', callback)} failed on '{event.name}'.")
+
+# The application-wide bus; plugins subscribe with bus.subscribe('command.after', callback)
+bus = EventBus()
@@ -0,0 +1,230 @@
+'''app/jobs.py: Background jobs. Runs command lines on a bounded pool of worker threads while the REPL keeps reading input.'''
+import builtins
+import io
+import itertools
+import shlex
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from app.commands import CommandHandler
+from app.calculator import Calculator
+from app.calculator.calc_history import CalculationHistory
+
+class JobState(Enum):
+    '''Where a job is in its life'''
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+FINISHED_STATES = (JobState.DONE, JobState.FAILED, JobState.CANCELLED)
+
+@dataclass
+class Job:
+    '''A command line run in the background, with the answers to its prompts, and what came of it'''
+    id: int
+    command: str
+    answers: List[str]
+    state: JobState = JobState.QUEUED
+    result: Any = None
+    output: str = ''
+    error: Optional[str] = None
+    submitted: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    future: Optional[Future] = field(default=None, repr=False)
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def elapsed(self) -> float:
+        '''Seconds from submission to completion (or until now)'''
+        return (self.finished or time.perf_counter()) - self.submitted
+
+    def __str__(self):
+        return f"[{self.id}] {self.state.value:<9} {self.elapsed:8.2f}s  {self.command} {shlex.join(self.answers)}".rstrip()
+
+# The prompt answers and output buffer of the job running on the current thread
+_job_io = threading.local()
+
+class _RoutedInput:
+    '''Stands in for builtins.input while jobs run: job threads are answered from their job, others prompt as usual'''
+
+    def __init__(self, original) -> None:
+        self.original = original
+
+    def __call__(self, prompt=''):
+        answers = getattr(_job_io, 'answers', None)
+        if answers is None:
+            return self.original(prompt)
+        try:
+            answer = next(answers)
+        except StopIteration:
+            raise EOFError("Not enough input for the command.") from None
+        print(f"{prompt}{answer}")
+        return answer
+
+class _RoutedOutput:
+    '''Stands in for sys.stdout while jobs run: job threads write to their job's buffer, others to the terminal'''
+
+    def __init__(self, original) -> None:
+        self.original = original
+
+    def write(self, text):
+        output = getattr(_job_io, 'output', None)
+        return (self.original if output is None else output).write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.original, name)
+
+class JobScheduler:
+    '''
+    Run command lines in the background on at most max_workers threads.
+
+    A job's prompts are answered from the words given after the command name (quote answers with
+    spaces, e.g. vector 1 "1 2 3" "4 5 6"), and what it prints is kept for 'result'. Each job records
+    its calculations in a history of its own, merged into the submitting session's history when the
+    job finishes, so history lists whole jobs in completion order. Cancelling a job stops a heavy
+    calculation through Calculator.cancellable; jobs still queued never start.
+    '''
+
+    def __init__(self, handler: Optional[CommandHandler] = None, max_workers: int = 2) -> None:
+        '''Constructor method with type hints'''
+        self.handler = handler
+        self.max_workers = max_workers
+        self.jobs: Dict[int, Job] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active = 0
+        self._unreported: List[Job] = []
+        self._saved_io = None
+
+    def configure(self, handler: CommandHandler, max_workers: Optional[int] = None) -> None:
+        '''Run jobs with handler on up to max_workers threads; takes effect for the next pool started'''
+        self.handler = handler
+        if max_workers is not None:
+            self.max_workers = max_workers
+
+    def split(self, line: str):
+        '''(command, answers) for a job line: a command that takes arguments keeps the whole line'''
+        if self.handler is None:
+            raise RuntimeError("The job scheduler has no command handler.")
+        if line in self.handler.commands:
+            return line, []
+        words = shlex.split(line)
+        if not words:
+            raise KeyError("No command given.")
+        command = self.handler.commands.get(words[0])
+        if command is None:
+            raise KeyError(f"Unknown command: {words[0]}")
+        if command.accepts_arguments:
+            return line, []
+        return words[0], words[1:]
+
+    def submit(self, line: str) -> Job:
+        '''Start running line in the background and return its job; raises KeyError for an unknown command'''
+        command, answers = self.split(line)
+        history = Calculator.session_history()
+        with self._lock:
+            job = Job(next(self._ids), command, answers)
+            self.jobs[job.id] = job
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+            if self._active == 0:
+                self._route_io()
+            self._active += 1
+            job.future = self._executor.submit(self._run, job, history)
+        return job
+
+    def get(self, job_id) -> Job:
+        '''The job with job_id (an int or its text); raises KeyError if there is none'''
+        try:
+            return self.jobs[int(job_id)]
+        except (ValueError, KeyError):
+            raise KeyError(f"No job {job_id}.") from None
+
+    def wait(self, job_id, timeout: Optional[float] = None) -> Job:
+        '''Block until the job finishes (or timeout seconds pass) and return it'''
+        job = self.get(job_id)
+        job.done.wait(timeout)
+        return job
+
+    def cancel(self, job_id) -> Job:
+        '''Cancel a job: a queued job never starts, a running one is stopped at its next cancellation check'''
+        job = self.get(job_id)
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, JobState.CANCELLED)
+        return job
+
+    def finished(self) -> List[Job]:
+        '''Jobs that finished since the last call, in completion order'''
+        with self._lock:
+            finished, self._unreported = self._unreported, []
+        return finished
+
+    def shutdown(self, cancel: bool = True) -> None:
+        '''Stop the pool, cancelling outstanding jobs unless cancel is False, and wait for running ones'''
+        if cancel:
+            for job in list(self.jobs.values()):
+                if job.state not in FINISHED_STATES:
+                    self.cancel(job.id)
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _run(self, job: Job, target: CalculationHistory) -> None:
+        '''Worker thread: run the job with its answers and output buffer, then merge its history into target'''
+        job.state = JobState.RUNNING
+        output = io.StringIO()
+        _job_io.output, _job_io.answers = output, iter(job.answers)
+        history = CalculationHistory(target.policy, target.sample_rate)
+        state = JobState.DONE
+        try:
+            with Calculator.session(history), Calculator.cancellable(job.cancel_event):
+                job.result = self.handler.execute_command(job.command)
+        except KeyError as e:
+            state, job.error = JobState.FAILED, str(e.args[0]) if e.args else "Unknown command."
+        except SystemExit:
+            state, job.error = JobState.FAILED, "Commands that exit cannot run in the background."
+        except Exception as e:
+            state, job.error = JobState.FAILED, str(e)
+        finally:
+            _job_io.output = _job_io.answers = None
+        if job.cancel_event.is_set():
+            state = JobState.CANCELLED
+        job.output = output.getvalue()
+        target.merge(history)  # under the target history's own lock, which the session's recording takes too
+        self._finish(job, state)
+
+    def _finish(self, job: Job, state: JobState) -> None:
+        '''Mark a job finished and stop routing I/O when it was the last one outstanding'''
+        with self._lock:
+            job.state, job.finished = state, time.perf_counter()
+            self._unreported.append(job)
+            self._active -= 1
+            if self._active == 0:
+                self._restore_io()
+        job.done.set()
+
+    def _route_io(self) -> None:
+        '''Send job threads' prompts and prints to their jobs; called with the lock held'''
+        self._saved_io = (builtins.input, sys.stdout)
+        builtins.input, sys.stdout = _RoutedInput(builtins.input), _RoutedOutput(sys.stdout)
+
+    def _restore_io(self) -> None:
+        '''Undo _route_io, unless something else has replaced input or stdout since; called with the lock held'''
+        original_input, original_stdout = self._saved_io
+        if isinstance(builtins.input, _RoutedInput):
+            builtins.input = original_input
+        if isinstance(sys.stdout, _RoutedOutput):
+            sys.stdout = original_stdout
+
+# The application-wide scheduler; App configures it with its command handler and CALC_JOB_WORKERS
+scheduler = JobScheduler()
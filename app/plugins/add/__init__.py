@@ -1,6 +1,7 @@
 '''app/plugins/add/__init__.py'''
 from app.commands import Command
 from app.calculator import Calculator
+from app.calculator.limits import OperationAborted
 from app.utils.validation import validate_decimal_input
 import logging
 
@@ -17,7 +18,12 @@ class AddCommand(Command):
         num1 = validate_decimal_input("Enter the first number: ")
         num2 = validate_decimal_input("Enter the second number: ")
 
-        logging.info("Performing addition...")
-        result = Calculator.add(num1, num2)
-        print(f"The result of {num1} + {num2} is: {result}")
-        return result # for test_add_command.py
+        try:
+            logging.info("Performing addition...")
+            result = Calculator.add(num1, num2)
+            print(f"The result of {num1} + {num2} is: {result}")
+            return result # for test_add_command.py
+        except OperationAborted as e:
+            logging.info(f"Calculation aborted: {e}")
+            print(e)
+            return str(e)
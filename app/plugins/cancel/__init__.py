@@ -0,0 +1,29 @@
+'''app/plugins/cancel/__init__.py'''
+from app.commands import Command
+from app.jobs import FINISHED_STATES, scheduler
+import logging
+
+class CancelCommand(Command):
+    '''A command class to cancel a background job, e.g. 'cancel 3'.'''
+    accepts_arguments = True
+
+    def execute(self, args: str = ''):
+        '''
+        Execute the CancelCommand.
+
+        This method cancels a queued or running job; the job id is prompted for when not given
+        on the command line.
+        '''
+        logging.info("Command 'cancel' from plugin 'menu' selected.")
+        job_id = args or input("Enter the job id: ").strip()
+        try:
+            job = scheduler.get(job_id)
+        except KeyError as e:
+            print(e.args[0])
+            return None
+        if job.state in FINISHED_STATES:
+            print(f"Job {job.id} has already finished ({job.state.value}).")
+            return job
+        scheduler.cancel(job.id)
+        print(f"Job {job.id} cancelled.")
+        return job
@@ -0,0 +1,18 @@
+'''app/plugins/cells/__init__.py'''
+from app.commands import Command
+from app.calculator import Calculator
+import logging
+
+class CellsCommand(Command):
+    '''A command class to list the named cells and how many recomputations they have needed.'''
+
+    def execute(self):
+        '''Execute the CellsCommand'''
+        logging.info("Command 'cells' from plugin 'menu' selected.")
+        sheet = Calculator.cells
+        if not sheet.cells:
+            print("No cells defined.")
+            return
+        for cell in sheet.cells.values():
+            print(cell)
+        print(f"Recomputations: {sheet.last_recomputations} on the last update, {sheet.recomputations} in total")
@@ -1,6 +1,7 @@
 '''app/plugins/divide/__init__.py'''
 from app.commands import Command
 from app.calculator import Calculator
+from app.calculator.limits import OperationAborted
 from app.utils.validation import validate_decimal_input
 import logging
 
@@ -22,6 +23,10 @@ class DivideCommand(Command):
             result = Calculator.divide(num1, num2)
             print(f"The result of {num1} / {num2} is: {result}")
             return result
+        except OperationAborted as e:
+            logging.info(f"Calculation aborted: {e}")
+            print(e)
+            return str(e)
         except ValueError:
             logging.info("User attempted undefined calculation...")
             print("Cannot divide by zero.")
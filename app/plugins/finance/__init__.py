@@ -0,0 +1,120 @@
+'''app/plugins/finance/__init__.py'''
+import sys
+import time
+from contextlib import nullcontext
+from decimal import Decimal
+from app.commands import Command
+from app.calculator import Calculator
+from app.calculator.finance import Rounding, amortize, future_value, payment, present_value, read_loans, summarize_many, write_schedule
+from app.calculator.limits import OperationAborted
+from app.utils.validation import validate_decimal_input
+import logging
+
+CHOICES = {'1': 'payment', '2': 'future value', '3': 'present value', '4': 'schedule', '5': 'batch'}
+
+# Schedules are kept to the cent: interest rounded half-even, the level payment half-up
+ROUNDING = Rounding()
+
+def validate_periods(prompt: str) -> int:
+    '''Prompt for a number of periods; raises ValueError unless it is a whole number, LimitExceeded past the step limit'''
+    periods = validate_decimal_input(prompt)
+    if not periods.is_finite() or periods != periods.to_integral_value():
+        raise ValueError("The number of periods must be a whole number.")
+    Calculator.limits.check_steps(periods)
+    return int(periods)
+
+class FinanceCommand(Command):
+    '''A command class for loan and compound-interest calculations: payment, future and present value, and amortization schedules.'''
+
+    def execute(self):
+        '''
+        Execute the FinanceCommand.
+
+        This method prompts the user for a calculation and its inputs. Rates are per period (0.005 for
+        0.5% a month). A schedule is written to the console or a file as it is computed; a batch reads
+        loans from a file, one 'principal rate periods' per line, and reports their totals. Schedules and
+        batches stop at the time limit, on cancel, or on Ctrl-C.
+        '''
+        logging.info("Command 'finance' from plugin 'menu' selected.")
+        print("Choose a calculation:")
+        for choice, name in CHOICES.items():
+            print(f"{choice}. {name}")
+        choice = input("Enter your choice: ")
+        if choice not in CHOICES:
+            print("Invalid choice")
+            return None
+
+        name = CHOICES[choice]
+        try:
+            logging.info(f"Performing {name}...")
+            if name == 'schedule':
+                return self.schedule()
+            if name == 'batch':
+                return self.batch()
+            return self.closed_form(name)
+        except (ValueError, ArithmeticError) as e:
+            logging.info("User attempted undefined calculation...")
+            print(e)
+            return str(e)
+        except OperationAborted as e:
+            logging.info(f"Calculation aborted: {e}")
+            print(e)
+            return str(e)
+        except KeyboardInterrupt:
+            logging.info("Calculation aborted: interrupted.")
+            print("Calculation cancelled.")
+            return "Calculation cancelled."
+        except OSError as e:
+            logging.error(f"Finance file error: {e}")
+            print(f"Could not use the file: {e}")
+            return None
+
+    def closed_form(self, name: str) -> Decimal:
+        '''Compute a payment, future value or present value from its closed-form formula'''
+        if name == 'payment':
+            principal = validate_decimal_input("Enter the principal: ")
+            rate = validate_decimal_input("Enter the interest rate per period: ")
+            result = payment(principal, rate, validate_periods("Enter the number of periods: "))
+        else:
+            amount = validate_decimal_input("Enter the present amount: " if name == 'future value' else "Enter the future amount: ")
+            rate = validate_decimal_input("Enter the interest rate per period: ")
+            periods = validate_periods("Enter the number of periods: ")
+            deposit = validate_decimal_input("Enter the payment each period (0 for none): ")
+            result = (future_value if name == 'future value' else present_value)(amount, rate, periods, deposit)
+        print(f"The {name} is: {result}")
+        return result
+
+    def schedule(self) -> int:
+        '''Stream a loan's amortization schedule to the console or a file; returns the number of periods'''
+        principal = validate_decimal_input("Enter the principal: ")
+        rate = validate_decimal_input("Enter the interest rate per period: ")
+        periods = validate_periods("Enter the number of periods: ")
+        path = input("Write the schedule to a file (blank for the console): ").strip()
+        check = Calculator.limits.checkpoint(Calculator._cancel_event())
+        rows = amortize(principal, rate, periods, ROUNDING, check=check)
+        if not path:
+            return write_schedule(rows, sys.stdout)
+        with open(path, 'w', encoding='utf-8') as out:
+            count = write_schedule(rows, out)
+        print(f"Wrote {count} period(s) to {path}")
+        return count
+
+    def batch(self) -> int:
+        '''Summarize every loan in a file, a chunk at a time, printing the totals; returns the number of loans'''
+        path = input("Enter the loans file (principal rate periods per line): ").strip().lstrip('@').strip()
+        output = input("Write each loan's totals to a file (blank for the grand totals only): ").strip()
+        started = time.perf_counter()
+        check = Calculator.limits.checkpoint(Calculator._cancel_event())
+        count, paid, interest = 0, Decimal(0), Decimal(0)
+        with open(path, encoding='utf-8') as lines, (open(output, 'w', encoding='utf-8') if output else nullcontext()) as out:
+            if out is not None:
+                out.write("payment,periods,total_paid,total_interest\n")
+            loans = read_loans(lines, Calculator.limits.max_steps)
+            for summary in summarize_many(loans, ROUNDING, Calculator.reduce_chunk_size, Calculator.reduce_workers, check):
+                if out is not None:
+                    out.write(f"{summary.payment},{summary.periods},{summary.total_paid},{summary.total_interest}\n")
+                count += 1
+                paid += summary.total_paid
+                interest += summary.total_interest
+        print(f"{count} loan(s): {paid} paid, {interest} interest, in {time.perf_counter() - started:.3f} s")
+        return count
@@ -1,19 +1,60 @@
 '''app/plugins/history/__init__.py'''
-from app.commands import Command
-from app.calculator.calc_history import CalculationHistory
+from decimal import Context, ROUND_HALF_EVEN
+import decimal
 import logging
+import sys
+from app.commands import Command
+from app.calculator import Calculator
+from app.calculator.calc_history import RecordingPolicy, page_entries
+from app.calculator.replay import replay_history
+
+# Lines are written to the terminal this many at a time
+BLOCK_LINES = 256
+
+# 'history filter' name -> the recorded operation's __name__: the command and Calculator names users type
+FILTERS = {
+    'add': 'addition', 'subtract': 'subtraction', 'multiply': 'multiplication', 'divide': 'division',
+    'power': 'power', 'root': 'root', 'sqrt': 'square_root', 'exp': 'exponential', 'ln': 'natural_log',
+    'log10': 'log10', 'log': 'logarithm',
+    'sum': 'summation', 'product': 'product', 'mean': 'mean', 'min': 'minimum', 'max': 'maximum', 'stats': 'describe',
+    'vector_add': 'vector_addition', 'vector_subtract': 'vector_subtraction',
+    'vector_multiply': 'vector_multiplication', 'vector_divide': 'vector_division',
+    'dot': 'dot_product', 'matmul': 'matrix_multiplication',
+}
 
 class HistoryCommand(Command):
-    '''A command class to manage calculation history'''
+    '''
+    A command class to manage calculation history.
+
+    Besides the menu, the history can be browsed a page at a time from the command line:
+    'history page [offset] [limit]', 'history next', 'history prev', 'history tail [n]' and
+    'history filter [operation]', where operation is a command name such as add or sqrt. Pages are taken from a snapshot, so next and prev stay put
+    while new calculations are made.
+    '''
+    accepts_arguments = True
+    page_size = 20
 
-    def execute(self):
+    def __init__(self):
+        '''Constructor method; no page has been shown yet'''
+        self.operation = None
+        self._snapshot = None
+        self._page = []
+        self._limit = None
+
+    def execute(self, args: str = ''):
         '''Execute the HistoryCommand'''
-        
+        if args:
+            self.browse(args)
+            return
+
         logging.info("Command 'history' from plugin 'menu' selected.\n")
         print("Choose an option:")
         print("1. Retrieve the most recent calculation")
         print("2. Retrieve all calculations so far")
         print("3. Clear calculation history")
+        print("4. Replay calculation history under a new precision")
+        print("5. Show calculation history memory usage")
+        print("6. Show the first page of calculation history")
         choice = input("Enter your choice: ")
 
         if choice == '1':
@@ -22,30 +63,137 @@ class HistoryCommand(Command):
             self.retrieve_all_calculations()
         elif choice == '3':
             self.clear_history()
+        elif choice == '4':
+            self.replay()
+        elif choice == '5':
+            self.show_memory_usage()
+        elif choice == '6':
+            self.show_page()
         else:
             print("Invalid choice")
 
     def retrieve_latest_calculation(self):
         '''Retrieve the most recent calculation from the history and print its result'''
-        latest_calculation = CalculationHistory.get_latest_history()
+        latest_calculation = Calculator.session_history().get_latest_history()
         self.print_result(latest_calculation)
 
     def retrieve_all_calculations(self):
-        '''Retrieve all calculations from the history and print their results'''
-        all_calculations = CalculationHistory.get_history()
+        '''Retrieve all calculations from the history and print their results; a snapshot, so calculations made meanwhile are not seen'''
+        all_calculations = Calculator.session_history().snapshot()
         print("All Calculations:")
-        for calculation in all_calculations:
-            self.print_result(calculation)
+        self.write_lines(self.format_result(calculation) for calculation in all_calculations)
+
+    def browse(self, args: str):
+        '''Run a paging subcommand: page, next, prev, tail or filter'''
+        subcommand, *values = args.split()
+        try:
+            numbers = [int(value) for value in values] if subcommand != 'filter' else []
+            if any(number < 0 for number in numbers):
+                raise ValueError(values)
+        except ValueError:
+            print("Offsets, limits and counts must be whole numbers.")
+            return
+        if subcommand == 'page':
+            offset = numbers[0] if numbers else 0
+            self.show_page(offset=offset, limit=numbers[1] if len(numbers) > 1 else self.page_size)
+        elif subcommand == 'next':
+            self.show_page(cursor=self._page[-1][0] + 1 if self._page else 0, limit=self._limit, snapshot=self._snapshot)
+        elif subcommand == 'prev':
+            self.show_page(cursor=self._page[0][0] if self._page else 0, limit=self._limit, snapshot=self._snapshot,
+                           backwards=True)
+        elif subcommand == 'tail':
+            self.show_page(limit=numbers[0] if numbers else self.page_size, backwards=True)
+        elif subcommand == 'filter':
+            name = values[0].lower() if values else None
+            if name is not None and name not in FILTERS and name not in FILTERS.values():
+                print(f"Unknown operation: {name}. Usage: history filter [{' | '.join(FILTERS)}]")
+                return
+            self.operation = FILTERS.get(name, name)
+            print(f"Showing {self.operation or 'all'} calculations.")
+        else:
+            print("Usage: history [page [offset] [limit] | next | prev | tail [n] | filter [operation]]")
+
+    def show_page(self, cursor=None, offset=0, limit=None, snapshot=None, backwards=False):
+        '''
+        Print one page of history, filtered by the current operation.
+
+        A new snapshot is taken unless one is given (next and prev reuse the last page's, and its size).
+        Without a cursor the page starts at the beginning, or ends at the end going backwards (the tail).
+        '''
+        snapshot = Calculator.session_history().snapshot() if snapshot is None else snapshot
+        cursor = (len(snapshot) if backwards else 0) if cursor is None else cursor
+        limit = limit or self.page_size
+        page = page_entries(snapshot, cursor, limit, self.operation, offset, backwards)
+        if not page:
+            print("No more calculations.")
+            return
+        self._snapshot, self._page, self._limit = snapshot, page, limit
+        shown = f" {self.operation}" if self.operation else ""
+        print(f"Calculations{shown} {page[0][0] + 1}-{page[-1][0] + 1} of {len(snapshot)}:")
+        if self.write_lines(f"[{position + 1}] {self.format_result(calculation)}" for position, calculation in page):
+            print("Type 'history next' or 'history prev' for more.")
 
     def clear_history(self):
         '''Clear the calculation history'''
-        CalculationHistory.clear_history()
+        Calculator.session_history().clear_history()
         print("Calculation history cleared.")
 
+    def replay(self):
+        '''Prompt for a precision and rounding mode, replay the history under them and print the changed results'''
+        try:
+            precision = int(input("Enter the precision: "))
+            rounding = input("Enter the rounding mode (blank for ROUND_HALF_EVEN): ").strip().upper() or ROUND_HALF_EVEN
+            if not hasattr(decimal, rounding) or not rounding.startswith('ROUND_'):
+                raise ValueError(rounding)
+            context = Context(prec=precision, rounding=getattr(decimal, rounding))
+        except ValueError:
+            print("Invalid precision or rounding mode.")
+            return
+        changes = replay_history(context)
+        print(f"{len(changes)} calculation(s) changed:")
+        for change in changes:
+            print(f"[{change.index}] {change.calculation}: {change.original} -> {change.replayed}")
+
+    def show_memory_usage(self):
+        '''Print how much memory the calculation history holds'''
+        history = Calculator.session_history()
+        usage = history.memory_usage()
+        print(f"{usage['entries']} entries for {usage['calculations']} calculations: "
+              f"{usage['total_bytes']} bytes ({usage['bytes_per_calculation']:.1f} bytes per calculation)")
+        policy = history.policy
+        rate = f" (1 in {history.sample_rate})" if policy is RecordingPolicy.SAMPLED else ""
+        counted = ", ".join(f"{name}: {count}" for name, count in history.counts.items()) or "none"
+        print(f"Recording policy: {policy.value}{rate}; calculations counted: {counted}")
+
+    def write_lines(self, lines) -> bool:
+        '''
+        Write lines to the terminal in blocks of BLOCK_LINES rather than one print each.
+
+        Lines are produced (and results recomputed) lazily, a block at a time; Ctrl-C stops the listing
+        and returns to the prompt instead of ending the session. Returns False if interrupted.
+        '''
+        block = []
+        try:
+            for line in lines:
+                block.append(line)
+                if len(block) >= BLOCK_LINES:
+                    sys.stdout.write("\n".join(block) + "\n")
+                    block = []
+        except KeyboardInterrupt:
+            sys.stdout.write("\n".join(block + ["Listing interrupted."]) + "\n")
+            return False
+        if block:
+            sys.stdout.write("\n".join(block) + "\n")
+        return True
+
     def print_result(self, calculation):
         '''Print the result of a calculation, handling cases where the calculation is undefined'''
+        print(self.format_result(calculation))
+
+    def format_result(self, calculation) -> str:
+        '''The result of a calculation as a line of text, handling cases where the calculation is undefined'''
         try:
             result = calculation.compute()
-            print(f"{calculation} results in {result}")
+            return f"{calculation} results in {result}"
         except:
-            print(f"{calculation} is undefined.")
+            return f"{calculation} is undefined."
@@ -0,0 +1,21 @@
+'''app/plugins/jobs/__init__.py'''
+from app.commands import Command
+from app.jobs import scheduler
+import logging
+
+class JobsCommand(Command):
+    '''A command class to list background jobs (started by ending a command line with '&').'''
+
+    def execute(self):
+        '''
+        Execute the JobsCommand.
+
+        This method prints every background job with its state and how long it has taken.
+        '''
+        logging.info("Command 'jobs' from plugin 'menu' selected.")
+        if not scheduler.jobs:
+            print("No background jobs. End a command with '&' to run it in the background, e.g. add 2 3 &")
+            return []
+        for job in scheduler.jobs.values():
+            print(job)
+        return list(scheduler.jobs.values())
@@ -0,0 +1,29 @@
+'''app/plugins/let/__init__.py'''
+from app.commands import Command
+from app.calculator import Calculator
+import logging
+
+class LetCommand(Command):
+    '''A command class to define a named cell by a formula, e.g. 'let total = price * (1 + rate)'.'''
+    accepts_arguments = True
+
+    def execute(self, args: str = ''):
+        '''
+        Execute the LetCommand.
+
+        This method defines the cell by the formula, computes it and recomputes the cells that depend on it.
+        The cell name and formula are prompted for when not given on the command line.
+        '''
+        logging.info("Command 'let' from plugin 'menu' selected.")
+        name, _, formula = args.partition('=')
+        name = name.strip() or input("Enter the cell name: ").strip()
+        formula = formula.strip() or input("Enter the formula: ").strip()
+        try:
+            recomputed = Calculator.cells.let(name, formula)
+        except ValueError as e:
+            print(e)
+            return None
+        cell = Calculator.cells.cells[name]
+        logging.info(f"Cell '{name}' defined; {recomputed} cell(s) recomputed.")
+        print(f"{cell} ({recomputed} cell(s) recomputed)")
+        return recomputed
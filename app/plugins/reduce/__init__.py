@@ -0,0 +1,48 @@
+'''app/plugins/reduce/__init__.py'''
+from decimal import InvalidOperation
+from app.commands import Command
+from app.calculator import Calculator
+from app.calculator.limits import OperationAborted
+from app.utils.validation import validate_decimal_list_input
+import logging
+
+REDUCTIONS = {'1': 'sum', '2': 'product', '3': 'mean', '4': 'min', '5': 'max'}
+
+class ReduceCommand(Command):
+    '''A command class to reduce many numbers to one: sum, product, mean, min or max.'''
+
+    def execute(self):
+        '''
+        Execute the ReduceCommand.
+
+        This method prompts the user for a reduction and a list of numbers (or a file of numbers)
+        and records the result as a single history entry.
+        '''
+        logging.info("Command 'reduce' from plugin 'menu' selected.")
+        print("Choose a reduction:")
+        for choice, name in REDUCTIONS.items():
+            print(f"{choice}. {name}")
+        choice = input("Enter your choice: ")
+        if choice not in REDUCTIONS:
+            print("Invalid choice")
+            return None
+
+        name = REDUCTIONS[choice]
+        values = validate_decimal_list_input("Enter numbers separated by spaces or commas (or @file): ")
+        try:
+            logging.info(f"Performing {name}...")
+            result = getattr(Calculator, name)(values)
+            print(f"The {name} of the values is: {result}")
+            return result
+        except OperationAborted as e:
+            logging.info(f"Calculation aborted: {e}")
+            print(e)
+            return str(e)
+        except InvalidOperation:
+            logging.info("INVALID number in file.")
+            print("The file contains an invalid number.")
+            return "The file contains an invalid number."
+        except ValueError as e:
+            logging.info("User attempted undefined calculation...")
+            print(e)
+            return str(e)
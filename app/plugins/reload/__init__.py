@@ -0,0 +1,31 @@
+'''app/plugins/reload/__init__.py'''
+from app.commands import Command
+import logging
+
+class ReloadCommand(Command):
+    '''A command class to pick up new, changed and removed plugins without restarting the session.'''
+
+    def __init__(self, app):
+        '''
+        Initialize the ReloadCommand with the App whose plugins it reloads.
+
+        Parameters:
+        - app (App): The running application.
+        '''
+        self.app = app
+
+    def execute(self):
+        '''
+        Execute the ReloadCommand.
+
+        This method re-imports only the plugin packages that changed on disk and reports what changed;
+        history, cells and everything else in the session are kept.
+        '''
+        logging.info("Command 'reload' from plugin 'menu' selected.")
+        changes = self.app.reload_plugins()
+        if not any(changes.values()):
+            print("No plugins changed.")
+        for change, plugin_names in changes.items():
+            if plugin_names:
+                print(f"{change.capitalize()}: {', '.join(plugin_names)}")
+        return changes
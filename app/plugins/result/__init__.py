@@ -0,0 +1,36 @@
+'''app/plugins/result/__init__.py'''
+from app.commands import Command
+from app.jobs import FINISHED_STATES, scheduler
+import logging
+
+def print_job(job):
+    '''Print what a finished job printed, or why it failed'''
+    print(job)
+    if job.output:
+        print(job.output, end='' if job.output.endswith("\n") else "\n")
+    if job.error:
+        print(f"Job {job.id} failed: {job.error}")
+
+class ResultCommand(Command):
+    '''A command class to show the output of a background job, e.g. 'result 3'.'''
+    accepts_arguments = True
+
+    def execute(self, args: str = ''):
+        '''
+        Execute the ResultCommand.
+
+        This method prints the output of a finished job without waiting; the job id is prompted
+        for when not given on the command line.
+        '''
+        logging.info("Command 'result' from plugin 'menu' selected.")
+        job_id = args or input("Enter the job id: ").strip()
+        try:
+            job = scheduler.get(job_id)
+        except KeyError as e:
+            print(e.args[0])
+            return None
+        if job.state not in FINISHED_STATES:
+            print(f"Job {job.id} is {job.state.value}; use 'wait {job.id}' to wait for it.")
+            return None
+        print_job(job)
+        return job.result
@@ -0,0 +1,54 @@
+'''app/plugins/scientific/__init__.py'''
+from app.commands import Command
+from app.calculator import Calculator
+from app.calculator.limits import OperationAborted
+from app.utils.validation import validate_decimal_input
+import logging
+
+# choice -> (Calculator method, prompt for the second operand or None for unary operations)
+OPERATIONS = {
+    '1': ('power', "Enter the exponent: "),
+    '2': ('root', "Enter the root degree: "),
+    '3': ('sqrt', None),
+    '4': ('exp', None),
+    '5': ('ln', None),
+    '6': ('log10', None),
+    '7': ('log', "Enter the base: "),
+}
+
+class ScientificCommand(Command):
+    '''A command class for scientific operations: powers, roots, exponentials and logarithms.'''
+
+    def execute(self):
+        '''
+        Execute the ScientificCommand.
+
+        This method prompts the user for an operation and its operands and performs it
+        at the current Decimal precision.
+        '''
+        logging.info("Command 'scientific' from plugin 'menu' selected.")
+        print("Choose an operation:")
+        for choice, (name, _) in OPERATIONS.items():
+            print(f"{choice}. {name}")
+        choice = input("Enter your choice: ")
+        if choice not in OPERATIONS:
+            print("Invalid choice")
+            return None
+
+        name, second_prompt = OPERATIONS[choice]
+        operands = [validate_decimal_input("Enter the number: ")]
+        if second_prompt is not None:
+            operands.append(validate_decimal_input(second_prompt))
+        try:
+            logging.info(f"Performing {name}...")
+            result = getattr(Calculator, name)(*operands)
+            print(f"The result of {name}({', '.join(str(operand) for operand in operands)}) is: {result}")
+            return result
+        except OperationAborted as e:
+            logging.info(f"Calculation aborted: {e}")
+            print(e)
+            return str(e)
+        except ValueError as e:
+            logging.info("User attempted undefined calculation...")
+            print(e)
+            return str(e)
@@ -0,0 +1,34 @@
+'''app/plugins/set/__init__.py'''
+from decimal import InvalidOperation
+from app.commands import Command
+from app.calculator import Calculator
+from app.calculator.limits import OperationAborted
+import logging
+
+class SetCommand(Command):
+    '''A command class to set a named cell to a number, e.g. 'set rate 0.07'.'''
+    accepts_arguments = True
+
+    def execute(self, args: str = ''):
+        '''
+        Execute the SetCommand.
+
+        This method sets the cell to the number and recomputes the cells that depend on it.
+        The cell name and number are prompted for when not given on the command line.
+        '''
+        logging.info("Command 'set' from plugin 'menu' selected.")
+        name, _, value = args.replace('=', ' ').partition(' ')
+        name = name or input("Enter the cell name: ").strip()
+        value = value.strip() or input("Enter the number: ").strip()
+        try:
+            recomputed = Calculator.cells.set(name, value)
+        except (ValueError, InvalidOperation):
+            print("Invalid cell name or number.")
+            return None
+        except OperationAborted as e:
+            logging.info(f"Cell '{name}' not set: {e}")
+            print(e)
+            return None
+        logging.info(f"Cell '{name}' set; {recomputed} dependent cell(s) recomputed.")
+        print(f"{name} = {Calculator.cells.cells[name].value} ({recomputed} dependent cell(s) recomputed)")
+        return recomputed
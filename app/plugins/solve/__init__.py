@@ -0,0 +1,101 @@
+'''app/plugins/solve/__init__.py'''
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from app.commands import Command
+from app.calculator import Calculator
+from app.calculator.limits import OperationAborted
+from app.calculator.solver import METHODS, Formula, default_tolerance, tabulate
+from app.utils.validation import validate_decimal_input
+import logging
+
+CHOICES = {'1': 'tabulate', '2': 'bisection', '3': 'newton', '4': 'brent'}
+
+# Tabulated rows are printed this many at a time
+BLOCK_LINES = 256
+
+def validate_operand(prompt: str) -> Decimal:
+    '''Prompt for a number; raises LimitExceeded if it has too many digits or too large an exponent'''
+    value = validate_decimal_input(prompt)
+    if value.is_finite():
+        Calculator.limits.check_operand(value)
+    return value
+
+class SolveCommand(Command):
+    '''A command class to tabulate a formula in x over a grid, or find where it is zero by bisection, Newton or Brent.'''
+
+    def execute(self):
+        '''
+        Execute the SolveCommand.
+
+        This method prompts the user for a method and a formula in x, built from + - * / ** and sqrt, exp,
+        ln and log10, in which named cells may appear as constants. Tabulating prompts for a grid and
+        prints it as it is computed; root finding prompts for a bracket or a starting guess and a
+        tolerance, and reports the root with the iterations and time it took. Tables are capped at the step
+        limit and stop at the time limit, on cancel, or on Ctrl-C.
+        '''
+        logging.info("Command 'solve' from plugin 'menu' selected.")
+        print("Choose a method:")
+        for choice, name in CHOICES.items():
+            print(f"{choice}. {name}")
+        choice = input("Enter your choice: ")
+        if choice not in CHOICES:
+            print("Invalid choice")
+            return None
+
+        name = CHOICES[choice]
+        try:
+            constants = {cell.name: cell.value for cell in Calculator.cells.cells.values()}
+            formula = Formula(input("Enter a formula in x (e.g. 1000 * (1 + x) ** 10 - 2000): "),
+                              constants=constants, exact=Calculator.vector_exact)
+            if name == 'tabulate':
+                return self.tabulate(formula)
+            return self.solve(name, formula)
+        except OperationAborted as e:
+            logging.info(f"Calculation aborted: {e}")
+            print(e)
+            return str(e)
+        except KeyboardInterrupt:
+            logging.info("Calculation aborted: interrupted.")
+            print("Calculation cancelled.")
+            return "Calculation cancelled."
+        except (ValueError, ArithmeticError) as e:
+            logging.info("User attempted undefined calculation...")
+            print(e)
+            return str(e)
+
+    def tabulate(self, formula: Formula) -> int:
+        '''Print x and the formula's value at each grid point, a block at a time; returns the number of points'''
+        start = validate_operand("Enter the first x: ")
+        stop = validate_operand("Enter the last x: ")
+        step = validate_operand("Enter the step: ")
+        logging.info(f"Tabulating {formula.source}...")
+        started = time.perf_counter()
+        cancel_event = Calculator._cancel_event()
+        rows = tabulate(formula, start, stop, step, cancel_event=cancel_event, max_points=Calculator.limits.max_steps,
+                        check=Calculator.limits.checkpoint(cancel_event))
+        count = 0
+        while block := list(islice(rows, BLOCK_LINES)):
+            print("\n".join(f"{x}\t{'undefined' if y is None else y}" for x, y in block))
+            count += len(block)
+        print(f"{count} point(s) in {(time.perf_counter() - started) * 1e3:.3f} ms")
+        return count
+
+    def solve(self, name: str, formula: Formula):
+        '''Find a root of the formula by the named method and print it with the iterations and time taken'''
+        if name == 'newton':
+            where = (validate_operand("Enter the starting guess: "),)
+        else:
+            where = (validate_operand("Enter the low end of the bracket: "),
+                     validate_operand("Enter the high end of the bracket: "))
+        text = input("Enter the tolerance (blank for the default): ").strip()
+        try:
+            tolerance = formula.number(text) if text else default_tolerance(formula.exact)
+        except (InvalidOperation, ValueError):
+            print("Invalid tolerance.")
+            return None
+        logging.info(f"Solving {formula.source} = 0 by {name}...")
+        solution = METHODS[name](formula, *(formula.number(value) for value in where), tolerance,
+                                 cancel_event=Calculator._cancel_event())
+        print(solution)
+        return solution
@@ -0,0 +1,33 @@
+'''app/plugins/stats/__init__.py'''
+from decimal import InvalidOperation
+from app.commands import Command
+from app.calculator import Calculator
+from app.calculator.limits import OperationAborted
+from app.utils.validation import validate_decimal_list_input
+import logging
+
+class StatsCommand(Command):
+    '''A command class to summarize many numbers: count, mean, variance, min, max and approximate quantiles.'''
+
+    def execute(self):
+        '''
+        Execute the StatsCommand.
+
+        This method prompts the user for a list of numbers (or a file of numbers, which is streamed
+        rather than read into memory) and records the summary as a single history entry.
+        '''
+        logging.info("Command 'stats' from plugin 'menu' selected.")
+        values = validate_decimal_list_input("Enter numbers separated by spaces or commas (or @file): ")
+        try:
+            logging.info("Performing stats...")
+            summary = Calculator.stats(values)
+            print(summary)
+            return summary
+        except OperationAborted as e:
+            logging.info(f"Calculation aborted: {e}")
+            print(e)
+            return str(e)
+        except InvalidOperation:
+            logging.info("INVALID number in file.")
+            print("The file contains an invalid number.")
+            return "The file contains an invalid number."
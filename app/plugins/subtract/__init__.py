@@ -1,6 +1,7 @@
 '''app/plugins/subtract/__init__.py'''
 from app.commands import Command
 from app.calculator import Calculator
+from app.calculator.limits import OperationAborted
 from app.utils.validation import validate_decimal_input
 import logging
 
@@ -16,7 +17,12 @@ class SubtractCommand(Command):
         num1 = validate_decimal_input("Enter the first number: ")
         num2 = validate_decimal_input("Enter the second number: ")
 
-        logging.info("Performing subtraction...")
-        result = Calculator.subtract(num1, num2)
-        print(f"The result of {num1} - {num2} is: {result}")
-        return result
+        try:
+            logging.info("Performing subtraction...")
+            result = Calculator.subtract(num1, num2)
+            print(f"The result of {num1} - {num2} is: {result}")
+            return result
+        except OperationAborted as e:
+            logging.info(f"Calculation aborted: {e}")
+            print(e)
+            return str(e)
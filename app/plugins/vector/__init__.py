@@ -0,0 +1,48 @@
+'''app/plugins/vector/__init__.py'''
+from app.commands import Command
+from app.calculator import Calculator
+from app.calculator.limits import OperationAborted
+from app.calculator.vectors import Matrix
+from app.utils.validation import validate_matrix_input
+import logging
+
+OPERATIONS = {'1': 'vector_add', '2': 'vector_subtract', '3': 'vector_multiply',
+              '4': 'vector_divide', '5': 'dot', '6': 'matmul'}
+
+class VectorCommand(Command):
+    '''A command class for element-wise vector and matrix arithmetic, dot product and matrix multiply.'''
+
+    def execute(self):
+        '''
+        Execute the VectorCommand.
+
+        This method prompts the user for an operation and two vectors or matrices (typed inline or
+        read from files) and records the whole operation as a single history entry. A single number
+        is broadcast against the other operand.
+        '''
+        logging.info("Command 'vector' from plugin 'menu' selected.")
+        print("Choose an operation:")
+        for choice, name in OPERATIONS.items():
+            print(f"{choice}. {name}")
+        choice = input("Enter your choice: ")
+        if choice not in OPERATIONS:
+            print("Invalid choice")
+            return None
+
+        name = OPERATIONS[choice]
+        prompt = "Enter the {} operand: numbers separated by spaces, rows by ';' (or @file): "
+        left = Matrix(validate_matrix_input(prompt.format('first')), Calculator.vector_exact)
+        right = Matrix(validate_matrix_input(prompt.format('second')), Calculator.vector_exact)
+        try:
+            logging.info(f"Performing {name}...")
+            result = getattr(Calculator, name)(left, right)
+            print(f"The result of {name} is: {result}")
+            return result
+        except OperationAborted as e:
+            logging.info(f"Calculation aborted: {e}")
+            print(e)
+            return str(e)
+        except ValueError as e:
+            logging.info("User attempted undefined calculation...")
+            print(e)
+            return str(e)
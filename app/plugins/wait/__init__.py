@@ -0,0 +1,31 @@
+'''app/plugins/wait/__init__.py'''
+from app.commands import Command
+from app.jobs import scheduler
+from app.plugins.result import print_job
+import logging
+
+class WaitCommand(Command):
+    '''A command class to wait for a background job and show its output, e.g. 'wait 3'.'''
+    accepts_arguments = True
+
+    def execute(self, args: str = ''):
+        '''
+        Execute the WaitCommand.
+
+        This method blocks until the job finishes and prints its output. Ctrl-C stops waiting
+        (the job keeps running) and returns to the prompt.
+        '''
+        logging.info("Command 'wait' from plugin 'menu' selected.")
+        job_id = args or input("Enter the job id: ").strip()
+        try:
+            job = scheduler.get(job_id)
+            while not job.done.wait(0.1):
+                pass
+        except KeyError as e:
+            print(e.args[0])
+            return None
+        except KeyboardInterrupt:
+            print(f"Stopped waiting; job {job_id} is still running.")
+            return None
+        print_job(job)
+        return job.result
@@ -0,0 +1,181 @@
+'''app/utils/benchmarks.py: Micro-benchmarks of single calculator features: history recording policies, integer powers, exact rationals and the binary calculation encoding.'''
+import argparse
+import json
+import pickle
+import random
+import sys
+import time
+from decimal import Decimal, localcontext
+from fractions import Fraction
+from itertools import islice
+from typing import Dict, Optional, Sequence, Tuple
+from app.calculator import Calculator
+from app.calculator.calc_history import CalculationHistory, RecordingPolicy
+from app.calculator.calculation import Calculation
+from app.calculator.encoding import decode_batch, encode_batch
+from app.calculator.operations import Operations
+from app.calculator.rational import Rational
+from app.calculator.scientific import ScientificOperations
+from app.utils.loadtest import generate_workload
+
+def benchmark_policies(operations: int = 100000, seed: int = 0, sample_rate: int = 100) -> Dict[str, Tuple[float, int]]:
+    '''
+    Time the same workload straight through Calculator (no commands or prompts) under each recording policy.
+
+    Returns:
+        dict: policy name -> (operations per second, history entries stored).
+    '''
+    methods = {'add': Calculator.add, 'subtract': Calculator.subtract,
+               'multiply': Calculator.multiply, 'divide': Calculator.divide}
+    workload = [(methods[name], a, b) for name, a, b in islice(generate_workload(seed), operations)]
+    results = {}
+    for policy in RecordingPolicy:
+        with Calculator.session(CalculationHistory(policy, sample_rate)) as history:
+            start = time.perf_counter()
+            for method, a, b in workload:
+                method(a, b)
+            elapsed = time.perf_counter() - start
+        results[policy.value] = (operations / elapsed, len(history))
+    return results
+
+def _naive_integer_power(a: Decimal, exponent: int) -> Decimal:
+    '''a ** exponent by exponent - 1 multiplications, each rounded; the baseline integer_power is measured against'''
+    result = a
+    for _ in range(exponent - 1):
+        result *= a
+    return result
+
+def benchmark_power(base: Decimal = Decimal('1.0001'), exponent: int = 10000, precision: int = 50,
+                    runs: int = 5) -> Dict[str, Tuple[float, int]]:
+    '''
+    Compare integer_power (repeated squaring) with naive repeated multiplication at the given precision.
+
+    Returns:
+        dict: method name -> (median seconds per call, digits that agree with the exact result).
+    '''
+    with localcontext() as ctx:
+        ctx.prec = precision * 2 + len(str(exponent))
+        exact = base ** exponent
+    methods = {'squaring': lambda: ScientificOperations.integer_power(base, Decimal(exponent)),
+               'naive': lambda: _naive_integer_power(base, exponent)}
+    results = {}
+    with localcontext() as ctx:
+        ctx.prec = precision
+        for name, method in methods.items():
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                result = method()
+                timings.append(time.perf_counter() - start)
+            error = abs(result - exact) / exact
+            correct = precision if not error else min(precision, max(0, -error.adjusted() - 1))
+            results[name] = (sorted(timings)[len(timings) // 2], correct)
+    return results
+
+def benchmark_rational(steps: int = 2000, seed: int = 0, precisions: Sequence[int] = (28, 200, 1000),
+                       runs: int = 3) -> Dict[str, Tuple[float, Optional[int]]]:
+    '''
+    Compare exact Rationals, fractions.Fraction and Decimal at several precisions on one seeded chain of
+    + - * / steps with short operands (the kind of chain where 1/3*3 drifts).
+
+    Returns:
+        dict: method name -> (median seconds for the chain, correct significant digits, or None if exact).
+    '''
+    rng = random.Random(seed)
+    operations = (Operations.addition, Operations.subtraction, Operations.multiplication, Operations.division)
+    chain = [(rng.choice(operations), Decimal(rng.randint(1, 999)) / 10) for _ in range(steps)]
+
+    def run(convert):
+        value = convert(Decimal(1))
+        for operation, operand in chain:
+            value = operation(value, convert(operand))
+        return value
+
+    exact = run(Fraction)
+    methods = {'rational': (Rational.exact, None), 'fraction': (Fraction, None)}
+    methods.update({f'decimal:{precision}': (lambda operand: +operand, precision) for precision in precisions})
+    results = {}
+    for name, (convert, precision) in methods.items():
+        timings = []
+        with localcontext() as ctx:
+            ctx.prec = precision or ctx.prec
+            for _ in range(runs):
+                start = time.perf_counter()
+                result = run(convert)
+                timings.append(time.perf_counter() - start)
+        result = result.fraction if isinstance(result, Rational) else Fraction(result)
+        error = abs(result - exact) / abs(exact)
+        if error:
+            with localcontext() as ctx:
+                ctx.prec = 50
+                correct = max(0, int(Decimal(error.denominator).log10() - Decimal(error.numerator).log10()))
+        else:
+            correct = None
+        results[name] = (sorted(timings)[len(timings) // 2], correct)
+    return results
+
+def benchmark_encoding(count: int = 20000, seed: int = 0, runs: int = 3) -> Dict[str, Tuple[float, float, float]]:
+    '''
+    Compare the binary calculation encoding with pickle and JSON on a seeded workload of calculations and results.
+
+    Returns:
+        dict: format -> (encoded records per second, decoded records per second, bytes per record).
+    '''
+    operations = {'add': Operations.addition, 'subtract': Operations.subtraction,
+                  'multiply': Operations.multiplication, 'divide': Operations.division}
+    calculations = [Calculation(a, b, operations[name]) for name, a, b in islice(generate_workload(seed), count)]
+    results = [calculation.compute() for calculation in calculations]
+    by_name = {operation.__name__: operation for operation in operations.values()}
+
+    def to_json():
+        return json.dumps([[c.operation.__name__, str(c.a), str(c.b), str(r)] for c, r in zip(calculations, results)]).encode()
+
+    def from_json(data):
+        records = json.loads(data)
+        return ([Calculation(Decimal(a), Decimal(b), by_name[name]) for name, a, b, _ in records],
+                [Decimal(r) for *_, r in records])
+
+    formats = {
+        'binary': (lambda: encode_batch(calculations, results), decode_batch),
+        'pickle': (lambda: pickle.dumps((calculations, results), pickle.HIGHEST_PROTOCOL), pickle.loads),
+        'json': (to_json, from_json),
+    }
+    report = {}
+    for name, (encode, decode) in formats.items():
+        encode_timings, decode_timings = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            data = encode()
+            encode_timings.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            decode(data)
+            decode_timings.append(time.perf_counter() - start)
+        report[name] = (count / sorted(encode_timings)[runs // 2], count / sorted(decode_timings)[runs // 2], len(data) / count)
+    return report
+
+def main(argv=None):
+    '''Command line entry point: python -m app.utils.benchmarks {policies,power,rational,encoding}'''
+    parser = argparse.ArgumentParser(description="Benchmark single calculator features.")
+    parser.add_argument('benchmark', choices=['policies', 'power', 'rational', 'encoding'],
+                        help="policies: Calculator under every recording policy; power: integer power by squaring "
+                             "against repeated multiplication; rational: exact rationals against high-precision "
+                             "Decimal; encoding: the binary calculation encoding against pickle and JSON")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--operations', type=int, default=10000, help="Workload size for policies and encoding")
+    args = parser.parse_args(argv)
+    if args.benchmark == 'policies':
+        for policy, (throughput, stored) in benchmark_policies(args.operations, args.seed).items():
+            print(f"{policy:>9}: {throughput:10.0f} ops/s, {stored} history entries")
+    elif args.benchmark == 'power':
+        for name, (seconds, correct) in benchmark_power().items():
+            print(f"{name:>9}: {seconds * 1e6:10.1f} us per call, {correct} correct digits")
+    elif args.benchmark == 'rational':
+        for name, (seconds, correct) in benchmark_rational(seed=args.seed).items():
+            print(f"{name:>12}: {seconds * 1e3:10.2f} ms per chain, {'exact' if correct is None else f'{correct} correct digits'}")
+    else:
+        for name, (encoded, decoded, size) in benchmark_encoding(args.operations, args.seed).items():
+            print(f"{name:>6}: {encoded:10.0f} records/s encoded, {decoded:10.0f} records/s decoded, {size:6.1f} bytes per record")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+'''app/utils/loadtest.py: Load and soak testing harness. Generates seeded workloads and drives them through the CommandHandler without console I/O.'''
+import argparse
+import random
+import resource
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from app.commands import CommandHandler
+from app.calculator import Calculator
+from app.calculator.calc_history import CalculationHistory, entry_bytes
+from app.plugins.add import AddCommand
+from app.plugins.subtract import SubtractCommand
+from app.plugins.multiply import MultiplyCommand
+from app.plugins.divide import DivideCommand
+from app.utils.scripted_io import scripted_io
+
+DEFAULT_MIX = {'add': 1.0, 'subtract': 1.0, 'multiply': 1.0, 'divide': 1.0}
+_POINTER_BYTES = struct.calcsize('P')
+
+@dataclass
+class MemorySample:
+    '''A point-in-time memory reading taken while the workload runs'''
+    operations: int
+    elapsed: float
+    rss_bytes: int
+    history_length: int
+    history_bytes: int
+
+@dataclass
+class LoadReport:
+    '''Summary of a load run: throughput, latency percentiles and memory growth'''
+    operations: int
+    elapsed: float
+    latencies_ns: array = field(repr=False)
+    samples: List[MemorySample] = field(default_factory=list)
+    history_memory: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        '''Operations per second over the whole run'''
+        return self.operations / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, pct: float) -> float:
+        '''Latency at the given percentile (0-100) in microseconds, using the nearest-rank method'''
+        if not self.latencies_ns:
+            return 0.0
+        ordered = sorted(self.latencies_ns)
+        rank = max(1, -(-len(ordered) * pct // 100))
+        return ordered[int(rank) - 1] / 1000
+
+    @property
+    def rss_growth(self) -> int:
+        '''Change in resident set size between the first and last sample, in bytes'''
+        if len(self.samples) < 2:
+            return 0
+        return self.samples[-1].rss_bytes - self.samples[0].rss_bytes
+
+    @property
+    def history_bytes_growth(self) -> int:
+        '''Change in the estimated size of the history between the first and last sample, in bytes'''
+        if len(self.samples) < 2:
+            return 0
+        return self.samples[-1].history_bytes - self.samples[0].history_bytes
+
+    @property
+    def history_growth(self) -> int:
+        '''Change in history length between the first and last sample'''
+        if len(self.samples) < 2:
+            return 0
+        return self.samples[-1].history_length - self.samples[0].history_length
+
+    def summary(self) -> str:
+        '''Human readable multi-line summary of the run'''
+        lines = [
+            f"Operations: {self.operations} in {self.elapsed:.3f}s ({self.throughput:.0f} ops/s)",
+            f"Latency p50/p90/p99/max (us): {self.percentile(50):.1f} / {self.percentile(90):.1f} / "
+            f"{self.percentile(99):.1f} / {self.percentile(100):.1f}",
+            f"RSS growth: {self.rss_growth} bytes, history growth: {self.history_growth} entries "
+            f"(~{self.history_bytes_growth} bytes)",
+        ]
+        if self.history_memory:
+            lines.append(f"History at end: {self.history_memory['entries']} entries for {self.history_memory['calculations']} "
+                         f"calculations, {self.history_memory['total_bytes']} bytes "
+                         f"({self.history_memory['bytes_per_calculation']:.1f} bytes per calculation)")
+        return "\n".join(lines)
+
+def generate_workload(seed: int = 0, mix: Optional[Dict[str, float]] = None, digits: int = 6,
+                      zero_divide_rate: float = 0.0) -> Iterator[Tuple[str, Decimal, Decimal]]:
+    '''
+    Yield an endless, deterministic stream of (command, a, b) tuples.
+
+    Args:
+        seed (int): Seed for the random generator; the same seed always gives the same stream.
+        mix (dict): Relative weights of each command name; defaults to an even mix.
+        digits (int): Maximum number of integer digits in each operand.
+        zero_divide_rate (float): Probability (0-1) that a divide uses a zero divisor.
+    '''
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    upper = 10 ** digits - 1
+    while True:
+        name = rng.choices(names, weights)[0]
+        a = Decimal(rng.randint(-upper, upper))
+        if name == 'divide' and rng.random() < zero_divide_rate:
+            b = Decimal(0)
+        else:
+            b = Decimal(rng.randint(1, upper))
+        yield name, a, b
+
+def build_command_handler() -> CommandHandler:
+    '''Create a CommandHandler with the arithmetic commands registered'''
+    handler = CommandHandler()
+    handler.register_command('add', AddCommand())
+    handler.register_command('subtract', SubtractCommand())
+    handler.register_command('multiply', MultiplyCommand())
+    handler.register_command('divide', DivideCommand())
+    return handler
+
+def current_rss() -> int:
+    '''Current resident set size in bytes; falls back to peak RSS where /proc is unavailable'''
+    try:
+        with open('/proc/self/statm', encoding='ascii') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def estimate_history_bytes(history: Sequence, sample_size: int = 64) -> int:
+    '''
+    Estimate the memory held by history entries: the list of entry pointers plus the average size
+    (see entry_bytes) of up to sample_size evenly spaced entries.
+    '''
+    container = sys.getsizeof([]) + len(history) * _POINTER_BYTES
+    if not history:
+        return container
+    step = max(1, len(history) // sample_size)
+    sampled = history[::step]
+    sampled_bytes = sum(entry_bytes(entry) for entry in sampled)
+    return container + sampled_bytes * len(history) // len(sampled)
+
+def _sample(done: int, elapsed: float) -> MemorySample:
+    '''Take a memory sample of the process and the session history'''
+    history = Calculator.session_history().snapshot()
+    return MemorySample(done, elapsed, current_rss(), len(history), estimate_history_bytes(history))
+
+def run_load(workload: Iterator[Tuple[str, Decimal, Decimal]], handler: Optional[CommandHandler] = None,
+             max_operations: Optional[int] = None, duration: Optional[float] = None,
+             sample_every: int = 1000, history: Optional[CalculationHistory] = None) -> LoadReport:
+    '''
+    Drive a workload through the CommandHandler and measure it.
+
+    Stops after max_operations commands or duration seconds, whichever comes first; at least one
+    of them must be given. Memory is sampled every sample_every operations.
+
+    The run records into its own session history (history, or a new one with the default recording
+    policy), so results do not depend on what ran before and the caller's history is left untouched.
+    '''
+    if max_operations is None and duration is None:
+        raise ValueError("Either max_operations or duration must be set.")
+    handler = handler or build_command_handler()
+    latencies = array('q')
+    samples = []
+    answers: List[str] = []
+    done = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+    with Calculator.session(history) as session_history, scripted_io(answers) as sink:
+        samples.append(_sample(0, 0.0))
+        for name, a, b in workload:
+            if max_operations is not None and done >= max_operations:
+                break
+            answers[:] = [str(b), str(a)]
+            began = time.perf_counter_ns()
+            handler.execute_command(name)
+            latencies.append(time.perf_counter_ns() - began)
+            done += 1
+            if done % sample_every == 0:
+                sink.seek(0)
+                sink.truncate()
+                now = time.perf_counter()
+                samples.append(_sample(done, now - start))
+                if deadline is not None and now >= deadline:
+                    break
+            elif deadline is not None and done % 64 == 0 and time.perf_counter() >= deadline:
+                break
+        elapsed = time.perf_counter() - start
+        samples.append(_sample(done, elapsed))
+        history_memory = session_history.memory_usage()
+    return LoadReport(done, elapsed, latencies, samples, history_memory)
+
+def main(argv=None):
+    '''Command line entry point: python -m app.utils.loadtest --operations 100000'''
+    parser = argparse.ArgumentParser(description="Load and soak test the calculator commands.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--operations', type=int, default=None)
+    parser.add_argument('--duration', type=float, default=None)
+    parser.add_argument('--digits', type=int, default=6)
+    parser.add_argument('--zero-divide-rate', type=float, default=0.0)
+    parser.add_argument('--mix', default=None, help="Comma separated weights, e.g. add=3,divide=1")
+    parser.add_argument('--intern', action='store_true', help="Intern repeated Decimal operands in the history")
+    parser.add_argument('--deduplicate', action='store_true', help="Store repeated calculations once in the history")
+    parser.add_argument('--policy', default=None, help="History recording policy: full, sampled[:N], aggregate or off")
+    parser.add_argument('--max-history-growth', type=int, default=None,
+                        help="Exit non-zero if history grows by more than this many entries")
+    args = parser.parse_args(argv)
+    if args.operations is None and args.duration is None:
+        args.operations = 10000
+    mix = None
+    if args.mix:
+        mix = {name: float(weight) for name, weight in (item.split('=') for item in args.mix.split(','))}
+    workload = generate_workload(args.seed, mix, args.digits, args.zero_divide_rate)
+    history = CalculationHistory()
+    history.intern_operands = args.intern
+    history.deduplicate = args.deduplicate
+    if args.policy:
+        history.parse_policy(args.policy)
+    report = run_load(workload, max_operations=args.operations, duration=args.duration, history=history)
+    print(report.summary())
+    if args.max_history_growth is not None and report.history_growth > args.max_history_growth:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+'''app/utils/scripted_io.py: Run commands without a console, answering their prompts from a list and discarding what they print.'''
+import builtins
+import contextlib
+import io
+from typing import List
+
+@contextlib.contextmanager
+def scripted_io(answers: List[str]):
+    '''
+    Feed prompts from the answers list and discard anything printed.
+
+    Answers are popped from the end of the list, so give them in reverse; a prompt with none left
+    raises IndexError. Yields the buffer that output goes to, which callers may truncate between commands.
+    '''
+    original_input = builtins.input
+    builtins.input = lambda prompt='': answers.pop()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()) as sink:
+            yield sink
+    finally:
+        builtins.input = original_input
@@ -0,0 +1,172 @@
+'''app/utils/trace.py: Workload capture and replay. Records the commands typed in a session, with their prompt answers and timing, to a compact trace file and replays it through the CommandHandler.'''
+import argparse
+import builtins
+import contextlib
+import gzip
+import logging
+import sys
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from app.commands import CommandHandler
+from app.utils.scripted_io import scripted_io
+
+TRACE_HEADER = "calculator-trace 1"
+# Fields within a record; prompt answers and command lines are single lines of typed text, so they never contain it
+SEPARATOR = "\x1f"
+
+class TraceRecord(NamedTuple):
+    '''One captured command: when it started (microseconds into the session), how long it took, the line and the prompt answers'''
+    offset_us: int
+    elapsed_us: int
+    command: str
+    answers: List[str]
+
+def _open(path: str, mode: str):
+    '''Open a trace file as text, gzip-compressed if its name ends in .gz'''
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+class TraceRecorder:
+    '''
+    Capture commands to a trace file as they run.
+
+    Each record is one line: start offset and duration in microseconds, the command line and the answers
+    typed at its prompts, separated by the ASCII unit separator. Records are flushed as they are written,
+    so a trace survives the session being killed.
+    '''
+
+    def __init__(self, path: str) -> None:
+        '''Constructor method with type hints; starts a new trace file at path'''
+        self.path = path
+        self.records = 0
+        self._file = _open(path, 'w')
+        self._file.write(TRACE_HEADER + "\n")
+        self._file.flush()
+        self._start = time.perf_counter_ns()
+
+    @contextlib.contextmanager
+    def command(self, line: str):
+        '''Record the command run inside the with block, and every answer given to its prompts'''
+        answers: List[str] = []
+        original_input = builtins.input
+
+        def recording_input(prompt=''):
+            answer = original_input(prompt)
+            answers.append(answer)
+            return answer
+
+        began = time.perf_counter_ns()
+        builtins.input = recording_input
+        try:
+            yield
+        finally:
+            builtins.input = original_input
+            ended = time.perf_counter_ns()
+            fields = [str((began - self._start) // 1000), str((ended - began) // 1000), line, *answers]
+            self._file.write(SEPARATOR.join(fields) + "\n")
+            self._file.flush()
+            self.records += 1
+
+    def close(self) -> None:
+        '''Finish the trace file'''
+        self._file.close()
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    '''Stream the records of a trace file; raises ValueError if it is not a trace'''
+    with _open(path, 'r') as trace:
+        if trace.readline().rstrip("\n") != TRACE_HEADER:
+            raise ValueError(f"{path} is not a calculator trace.")
+        for line in trace:
+            offset, elapsed, command, *answers = line.rstrip("\n").split(SEPARATOR)
+            yield TraceRecord(int(offset), int(elapsed), command, answers)
+
+@dataclass
+class ReplayReport:
+    '''Throughput and per-command latency of a replayed trace'''
+    operations: int = 0
+    elapsed: float = 0.0
+    errors: int = 0
+    latencies_ns: Dict[str, array] = field(default_factory=dict, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        '''Commands per second over the whole replay'''
+        return self.operations / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, pct: float, command: Optional[str] = None) -> float:
+        '''Latency at the given percentile (0-100) in microseconds, for one command or all of them (nearest rank)'''
+        if command is None:
+            ordered = sorted(latency for latencies in self.latencies_ns.values() for latency in latencies)
+        else:
+            ordered = sorted(self.latencies_ns.get(command, ()))
+        if not ordered:
+            return 0.0
+        rank = max(1, -(-len(ordered) * pct // 100))
+        return ordered[int(rank) - 1] / 1000
+
+    def summary(self) -> str:
+        '''Human readable summary: totals, then one line per command'''
+        lines = [f"Replayed {self.operations} commands in {self.elapsed:.3f}s ({self.throughput:.0f} commands/s), "
+                 f"{self.errors} failed",
+                 f"{'command':<12} {'count':>7} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10} {'max us':>10}"]
+        for command in sorted(self.latencies_ns):
+            lines.append(f"{command:<12} {len(self.latencies_ns[command]):>7} "
+                         + " ".join(f"{self.percentile(pct, command):>10.1f}" for pct in (50, 90, 99, 100)))
+        return "\n".join(lines)
+
+def replay_trace(records: Iterator[TraceRecord], handler: CommandHandler, original_pacing: bool = False) -> ReplayReport:
+    '''
+    Run trace records through handler with prompts answered from the trace and output discarded.
+
+    Commands run back to back by default; with original_pacing each one starts at its recorded offset.
+    A command that fails (unknown, asking for more answers than were recorded, or raising anything else)
+    is logged and counted as an error, and the replay goes on with the next one.
+    Latencies are grouped by command name, the first word of the command line.
+    '''
+    report = ReplayReport()
+    answers: List[str] = []
+    start = time.perf_counter_ns()
+    with scripted_io(answers) as sink:
+        for record in records:
+            if original_pacing:
+                delay = record.offset_us / 1e6 - (time.perf_counter_ns() - start) / 1e9
+                if delay > 0:
+                    time.sleep(delay)
+            answers[:] = list(reversed(record.answers))
+            name = record.command.split(' ', 1)[0] or '(empty)'
+            began = time.perf_counter_ns()
+            try:
+                handler.execute_command(record.command)
+            except SystemExit:
+                pass
+            except Exception as e:
+                report.errors += 1
+                logging.warning(f"Replayed command {report.operations + 1} ({record.command!r}) failed: "
+                                f"{type(e).__name__}: {e}")
+            report.latencies_ns.setdefault(name, array('q')).append(time.perf_counter_ns() - began)
+            report.operations += 1
+            sink.seek(0)
+            sink.truncate()
+    report.elapsed = (time.perf_counter_ns() - start) / 1e9
+    return report
+
+def main(argv=None):
+    '''Command line entry point: python -m app.utils.trace TRACE [--original-pacing]'''
+    parser = argparse.ArgumentParser(description="Replay a captured calculator trace and report its performance.")
+    parser.add_argument('trace', help="Trace file written with CALC_CAPTURE set")
+    parser.add_argument('--original-pacing', action='store_true', help="Start each command at its recorded time")
+    args = parser.parse_args(argv)
+    from app import App  # imported here: the App configures logging and limits, which the trace format does not need
+    from app.calculator import Calculator
+    app = App()
+    app.load_plugins()
+    with Calculator.session():
+        report = replay_trace(read_trace(args.trace), app.command_handler, args.original_pacing)
+    print(report.summary())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
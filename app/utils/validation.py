@@ -1,7 +1,11 @@
 '''utils/validation.py: validate user input'''
+import re
 from decimal import Decimal, InvalidOperation
+from typing import Iterable, Iterator, List
 import logging
 
+_SEPARATORS = re.compile(r'[\s,]+')
+
 def validate_decimal_input(prompt):
     '''
     Validate user input as a Decimal.
@@ -25,3 +29,109 @@ def validate_decimal_input(prompt):
         except InvalidOperation:
             logging.info("INVALID input.")
             print("Invalid input. Please enter a valid number.")
+
+def parse_decimals(lines: Iterable[str]) -> Iterator[Decimal]:
+    '''
+    Parse numbers separated by whitespace or commas into Decimals, one line at a time.
+
+    Args:
+        lines (Iterable[str]): Lines of text, e.g. an open file; nothing beyond the current line is held in memory.
+
+    Yields:
+        Decimal: Each number in order.
+
+    Raises:
+        InvalidOperation: If a token is not a valid number.
+    '''
+    for line in lines:
+        for token in _SEPARATORS.split(line.strip()):
+            if token:
+                yield Decimal(token)
+
+def read_decimals(path: str) -> Iterator[Decimal]:
+    '''Stream Decimals from a text file of numbers separated by whitespace, commas or newlines'''
+    with open(path, encoding='utf-8') as numbers:
+        yield from parse_decimals(numbers)
+
+def validate_decimal_list_input(prompt):
+    '''
+    Validate user input as a list of Decimals.
+
+    Prompts the user until they enter numbers separated by spaces or commas,
+    or '@' followed by the path of a readable file of numbers.
+
+    Args:
+        prompt (str): The message to display to the user as a prompt.
+
+    Returns:
+        Iterable[Decimal]: A list for numbers typed inline; for a file, a stream that reads it lazily
+        and raises InvalidOperation when it reaches an invalid number.
+    '''
+    logging.info("User validation in progress.")
+    while True:
+        text = input(prompt).strip()
+        try:
+            if text.startswith('@'):
+                path = text[1:].strip()
+                with open(path, encoding='utf-8'):
+                    pass
+                logging.info("VALID file.")
+                return read_decimals(path)
+            values = list(parse_decimals([text]))
+            logging.info("VALID input.")
+            return values
+        except InvalidOperation:
+            logging.info("INVALID input.")
+            print("Invalid input. Please enter numbers separated by spaces or commas.")
+        except OSError:
+            logging.info("INVALID file.")
+            print("Could not read that file. Please try again.")
+
+def parse_matrix(rows: Iterable[str]) -> List[List[Decimal]]:
+    '''
+    Parse rows of numbers into a list of rows of Decimals, skipping blank rows.
+
+    Raises:
+        InvalidOperation: If a token is not a valid number.
+        ValueError: If there are no numbers or the rows differ in length.
+    '''
+    matrix = [values for values in (list(parse_decimals([row])) for row in rows) if values]
+    if not matrix:
+        raise ValueError("No numbers were given.")
+    if any(len(row) != len(matrix[0]) for row in matrix):
+        raise ValueError("Every row must have the same number of values.")
+    return matrix
+
+def validate_matrix_input(prompt):
+    '''
+    Validate user input as a vector or matrix of Decimals.
+
+    Prompts the user until they enter numbers separated by spaces or commas, with rows separated
+    by semicolons, or '@' followed by the path of a file with one row per line.
+
+    Args:
+        prompt (str): The message to display to the user as a prompt.
+
+    Returns:
+        list: The rows of the matrix, each a list of Decimals; a vector is a single row.
+    '''
+    logging.info("User validation in progress.")
+    while True:
+        text = input(prompt).strip()
+        try:
+            if text.startswith('@'):
+                with open(text[1:].strip(), encoding='utf-8') as rows:
+                    matrix = parse_matrix(rows)
+            else:
+                matrix = parse_matrix(text.split(';'))
+            logging.info("VALID input.")
+            return matrix
+        except InvalidOperation:
+            logging.info("INVALID input.")
+            print("Invalid input. Please enter numbers separated by spaces or commas, and rows separated by ';'.")
+        except ValueError as e:
+            logging.info("INVALID input.")
+            print(f"Invalid input. {e}")
+        except OSError:
+            logging.info("INVALID file.")
+            print("Could not read that file. Please try again.")
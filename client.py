@@ -0,0 +1,62 @@
+'''client.py: Thin client for the calculator daemon. Sends one command line (and the answers to its prompts) and prints the reply.
+
+Usage: python client.py add 2 3
+       python client.py "set rate 0.07"
+
+Deliberately imports nothing from the app so that it starts fast; the daemon is started on first use.'''
+import os
+import socket
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def socket_path() -> str:
+    '''Must match app.daemon.default_socket_path'''
+    return os.environ.get('CALC_DAEMON_SOCKET') or os.path.join('/tmp', f"calculator-{os.getuid()}.sock")
+
+def send(lines, path: str) -> str:
+    '''Send the request lines to the daemon at path and return its reply'''
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall(("\n".join(lines) + "\n").encode('utf-8'))
+        connection.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := connection.recv(65536):
+            chunks.append(chunk)
+    return b''.join(chunks).decode('utf-8')
+
+def start_daemon(path: str, wait: float = 10.0) -> None:
+    '''Start the daemon in the background and wait for its socket to accept connections'''
+    subprocess.Popen([sys.executable, '-m', 'app.daemon', '--socket', path], cwd=PROJECT_DIR,
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(path)
+                probe.shutdown(socket.SHUT_WR)
+                probe.recv(1)
+            return
+        except OSError:
+            time.sleep(0.02)
+    raise OSError(f"Calculator daemon did not start on {path}")
+
+def main(argv) -> int:
+    '''Send argv to the daemon, starting it first if needed'''
+    if not argv:
+        print(__doc__)
+        return 2
+    path = socket_path()
+    try:
+        reply = send(argv, path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        start_daemon(path)
+        reply = send(argv, path)
+    sys.stdout.write(reply)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
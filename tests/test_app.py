@@ -3,6 +3,9 @@ import logging
 from unittest.mock import patch, MagicMock
 import pytest
 from app import App, MenuCommand
+from app.calculator import Calculator
+from app.calculator.limits import OperationLimits
+from app.calculator.calc_history import RecordingPolicy
 
 @pytest.fixture
 def app_instance():
@@ -183,3 +186,66 @@ def test_start_unknown_command(app_instance, caplog):
     # Check if the KeyError is logged
     assert "Unknown command: unknown_command" in caplog.text, \
         "Expected log message for unknown command"
+
+
+
+# Tests for configure_limits method
+def test_configure_limits_from_environment(app_instance, monkeypatch):
+    '''Valid limit settings are applied and 'none' removes the time limit'''
+    monkeypatch.setattr(Calculator, 'limits', Calculator.limits)
+    app_instance.settings = {'CALC_MAX_SECONDS': 'none', 'CALC_MAX_DIGITS': '500', 'CALC_MAX_EXPONENT': '1000'}
+    app_instance.configure_limits()
+    assert Calculator.limits.max_seconds is None
+    assert Calculator.limits.max_digits == 500
+    assert Calculator.limits.max_exponent == 1000
+
+@pytest.mark.parametrize("env_var, raw_value", [
+    ('CALC_MAX_SECONDS', 'soon'),
+    ('CALC_MAX_DIGITS', '-3'),
+    ('CALC_MAX_EXPONENT', '1.5'),
+])
+def test_configure_limits_with_malformed_values(app_instance, caplog, monkeypatch, env_var, raw_value):
+    '''Malformed limit settings fall back to the defaults with a warning'''
+    monkeypatch.setattr(Calculator, 'limits', Calculator.limits)
+    app_instance.settings = {env_var: raw_value}
+    app_instance.configure_limits()
+    defaults = OperationLimits()
+    assert (Calculator.limits.max_seconds, Calculator.limits.max_digits, Calculator.limits.max_exponent) == \
+        (defaults.max_seconds, defaults.max_digits, defaults.max_exponent)
+    assert f"Invalid {env_var} '{raw_value}'" in caplog.text
+
+@pytest.mark.parametrize("raw_value, policy", [
+    ('sampled:50', RecordingPolicy.SAMPLED),
+    ('bogus', RecordingPolicy.FULL),
+])
+def test_configure_history(app_instance, monkeypatch, raw_value, policy):
+    '''CALC_HISTORY_POLICY sets the recording policy; malformed values are ignored'''
+    monkeypatch.setattr(Calculator.history, 'policy', RecordingPolicy.FULL)
+    monkeypatch.setattr(Calculator.history, 'sample_rate', 10)
+    app_instance.settings = {'CALC_HISTORY_POLICY': raw_value}
+    app_instance.configure_history()
+    assert Calculator.history.policy is policy
+
+@pytest.mark.parametrize("raw_value, exact", [
+    ('float', False),
+    ('bogus', True),
+])
+def test_configure_vectors(app_instance, monkeypatch, raw_value, exact):
+    '''CALC_VECTOR_MODE chooses exact or float vectors; malformed values are ignored'''
+    monkeypatch.setattr(Calculator, 'vector_exact', True)
+    app_instance.settings = {'CALC_VECTOR_MODE': raw_value}
+    app_instance.configure_vectors()
+    assert Calculator.vector_exact is exact
+
+@pytest.mark.parametrize("raw_value, rational", [
+    ('rational', True),
+    ('bogus', False),
+])
+def test_configure_numbers(app_instance, monkeypatch, raw_value, rational):
+    '''CALC_NUMBER_MODE chooses rounded Decimals or exact Rationals; malformed values are ignored'''
+    monkeypatch.setattr(Calculator, 'rational', False)
+    monkeypatch.setattr(Calculator.cells, 'rational', False)
+    app_instance.settings = {'CALC_NUMBER_MODE': raw_value}
+    app_instance.configure_numbers()
+    assert Calculator.rational is rational
+    assert Calculator.cells.rational is rational
@@ -0,0 +1,36 @@
+'''Tests for app/utils/benchmarks.py'''
+from app.calculator import Calculator
+from app.calculator.calc_history import RecordingPolicy
+from app.utils.benchmarks import benchmark_encoding, benchmark_policies, benchmark_power, benchmark_rational, main
+
+def test_benchmark_policies():
+    '''Every recording policy is benchmarked in its own session'''
+    Calculator.history.clear_history()
+    results = benchmark_policies(operations=200, sample_rate=10)
+    assert list(results) == ['full', 'sampled', 'aggregate', 'off']
+    assert [stored for _, stored in results.values()] == [200, 20, 0, 0]
+    assert Calculator.history.policy is RecordingPolicy.FULL
+    assert not Calculator.history.get_history()
+
+def test_benchmark_power():
+    '''Squaring is at least as accurate as repeated multiplication'''
+    results = benchmark_power(exponent=500, precision=20, runs=1)
+    assert results['squaring'][1] >= results['naive'][1]
+
+def test_benchmark_rational():
+    '''Rationals and Fractions are exact; more Decimal precision gives more correct digits'''
+    results = benchmark_rational(steps=200, precisions=(10, 50), runs=1)
+    assert results['rational'][1] is None and results['fraction'][1] is None
+    assert results['decimal:10'][1] < results['decimal:50'][1]
+
+def test_benchmark_encoding():
+    '''The binary encoding is measured against pickle and JSON, and is the most compact'''
+    results = benchmark_encoding(count=500, runs=1)
+    assert list(results) == ['binary', 'pickle', 'json']
+    assert all(encoded > 0 and decoded > 0 for encoded, decoded, _ in results.values())
+    assert results['binary'][2] < min(results['pickle'][2], results['json'][2])
+
+def test_main(capsys):
+    '''The command line runs the chosen benchmark'''
+    assert main(['encoding', '--operations', '200']) == 0
+    assert "bytes per record" in capsys.readouterr().out
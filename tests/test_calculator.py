@@ -1,8 +1,18 @@
 '''Test File: app/calculator/__init__.py'''
 # Disable specific pylint warnings that are not relevant for this file.
 # pylint: disable=unnecessary-dunder-call, invalid-name
+import time
+from decimal import Decimal
+from unittest.mock import patch
 import pytest
 from app.calculator import Calculator
+from app.calculator.calc_history import CalculationHistory, RecordingPolicy
+from app.calculator.limits import LimitExceeded
+from app.calculator.rational import Rational
+from app.calculator.vectors import Matrix
+from app.events import bus
+
+his = Calculator.history
 
 def test_calculator_operations(a, b, operation, expected):
     '''Test Calculator class _perform_calculations method'''
@@ -28,3 +38,123 @@ def test_calculator_divide_by_zero():
     '''Test calculator divide by zero exception'''
     with pytest.raises(ValueError):
         Calculator.divide(2, 0)
+
+def test_reduction_records_single_history_entry():
+    '''Test that an n-ary reduction adds one history entry'''
+    his.clear_history()
+    assert Calculator.sum(Decimal(n) for n in range(1000)) == Decimal(499500)
+    assert Calculator.max([Decimal(1), Decimal(5)]) == Decimal(5)
+    assert len(his.get_history()) == 2
+    assert repr(his.get_history()[0]) == "ReductionCalculation(1000 values, summation)"
+    assert his.get_history()[0].count == 1000
+
+def test_undefined_reduction_is_recorded():
+    '''Test that an undefined reduction is recorded with its error, like a division by zero'''
+    his.clear_history()
+    with pytest.raises(ValueError):
+        Calculator.mean([])
+    with pytest.raises(ValueError):
+        his.get_latest_history().compute()
+
+def test_reduction_in_worker_processes(monkeypatch):
+    '''Test that reductions use the configured chunk size and worker count'''
+    monkeypatch.setattr(Calculator, 'reduce_chunk_size', 100)
+    monkeypatch.setattr(Calculator, 'reduce_workers', 2)
+    assert Calculator.sum(Decimal(n) for n in range(1000)) == Decimal(499500)
+
+@pytest.mark.parametrize("policy, sample_rate, stored, counted", [
+    (RecordingPolicy.FULL, 1, 10, 10),
+    (RecordingPolicy.SAMPLED, 4, 3, 10),
+    (RecordingPolicy.AGGREGATE, 1, 0, 10),
+    (RecordingPolicy.OFF, 1, 0, 0),
+])
+def test_recording_policies(monkeypatch, policy, sample_rate, stored, counted):
+    '''Test that each recording policy stores and counts the expected calculations'''
+    monkeypatch.setattr(his, 'policy', policy)
+    monkeypatch.setattr(his, 'sample_rate', sample_rate)
+    his.clear_history()
+    for n in range(10):
+        assert Calculator.add(Decimal(n), Decimal(1)) == Decimal(n + 1)
+    assert len(his.get_history()) == stored
+    assert his.counts.get('addition', 0) == counted
+    his.clear_history()
+
+def test_off_policy_creates_no_calculation(monkeypatch):
+    '''Test that the off policy never creates a Calculation'''
+    monkeypatch.setattr(his, 'policy', RecordingPolicy.OFF)
+    with patch('app.calculator.Calculation.create_calculation') as mock_create:
+        assert Calculator.multiply(Decimal(2), Decimal(3)) == Decimal(6)
+    mock_create.assert_not_called()
+
+def test_scientific_operations_are_recorded():
+    '''Test that unary and binary scientific operations are recorded like arithmetic'''
+    his.clear_history()
+    assert Calculator.power(Decimal(2), Decimal(8)) == Decimal(256)
+    assert Calculator.sqrt(Decimal(81)) == Decimal(9)
+    assert [repr(calc) for calc in his.get_history()] == ["Calculation(2, 8, power)", "Calculation(81, square_root)"]
+    assert his.get_latest_history().compute() == Decimal(9)
+    his.clear_history()
+
+def test_vector_operation_is_one_history_entry():
+    '''Test that a vector operation is checked against the limits and recorded once, not per element'''
+    his.clear_history()
+    result = Calculator.vector_add(Matrix([[1, 2, 3]]), Matrix([[10]]))
+    assert result == Matrix([[11, 12, 13]])
+    assert [repr(calc) for calc in his.get_history()] == ["Calculation(1 2 3, 10, vector_addition)"]
+    assert his.get_latest_history().compute() == result
+    with pytest.raises(LimitExceeded):
+        Calculator.dot(Matrix([[Decimal('1E+999999')]]), Matrix([[Decimal('1E+999999')]]))
+    assert len(his.get_history()) == 1
+    his.clear_history()
+
+def test_stats_is_one_history_entry():
+    '''Test that a summary is recorded as a single reduction'''
+    his.clear_history()
+    summary = Calculator.stats(Decimal(n) for n in range(100))
+    assert summary.maximum == Decimal(99)
+    assert repr(his.get_latest_history()) == "ReductionCalculation(100 values, describe)"
+    his.clear_history()
+
+def test_session_binds_a_history():
+    '''Test that calculations inside Calculator.session are recorded in that session's history only'''
+    his.clear_history()
+    with Calculator.session() as session:
+        Calculator.add(Decimal(1), Decimal(2))
+        assert Calculator.session_history() is session
+    assert len(session) == 1
+    assert not his.get_history()
+    assert Calculator.session_history() is his
+
+def test_calculation_hooks():
+    '''Test that calculation events are published only while subscribed'''
+    seen = []
+    bus.subscribe('calculation.after', lambda event: seen.append((event.payload['operation'], event.payload['result'])))
+    bus.subscribe('calculation.error', lambda event: seen.append((event.payload['operation'], str(event.payload['error']))))
+    try:
+        Calculator.add(Decimal(1), Decimal(2))
+        with pytest.raises(ValueError):
+            Calculator.divide(Decimal(1), Decimal(0))
+    finally:
+        bus.clear()
+    Calculator.add(Decimal(3), Decimal(4))
+    assert seen == [('addition', Decimal(3)), ('division', "Cannot divide by zero.")]
+
+def test_rational_mode(monkeypatch):
+    '''Test that rational mode keeps + - * / exact, records Rationals and leaves other operations in Decimal'''
+    monkeypatch.setattr(Calculator, 'rational', True)
+    with Calculator.session() as session:
+        third = Calculator.divide(Decimal(1), Decimal(3))
+        assert Calculator.multiply(third, Decimal(3)) == 1
+        assert isinstance(session.get_latest_history().a, Rational)
+        assert isinstance(Calculator.sqrt(Decimal(4)), Decimal)
+        assert Calculator.add(Decimal('Infinity'), third) == Decimal('Infinity')
+    with pytest.raises(ValueError, match="Cannot divide by zero."):
+        Calculator.divide(Decimal(1), Decimal(0))
+
+def test_rational_mode_checks_limits_first(monkeypatch):
+    '''Test that a huge exponent is rejected by the limits before the operand is made exact, as fast as in decimal mode'''
+    monkeypatch.setattr(Calculator, 'rational', True)
+    start = time.monotonic()
+    with pytest.raises(LimitExceeded, match="exponent"):
+        Calculator.add(Decimal('1E+99999999'), Decimal(1))
+    assert time.monotonic() - start < 1
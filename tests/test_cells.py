@@ -0,0 +1,116 @@
+'''Test File: app/calculator/cells.py'''
+from decimal import Decimal
+import pytest
+from app.calculator.cells import Cell, CellSheet
+from app.calculator.limits import LimitExceeded
+
+@pytest.fixture
+def sheet():
+    '''A small model: total = price * (1 + rate), label depends only on count'''
+    model = CellSheet()
+    model.set('price', '100')
+    model.set('rate', '0.07')
+    model.set('count', '3')
+    model.let('total', 'price * (1 + rate)')
+    model.let('doubled', 'total * 2')
+    model.let('label', 'count + 1')
+    return model
+
+def test_formula_values(sheet):
+    '''Formulas evaluate exactly in Decimal'''
+    assert sheet.get('total') == Decimal('107.00')
+    assert sheet.get('doubled') == Decimal('214.00')
+
+def test_change_recomputes_only_dependents(sheet):
+    '''Changing a cell recomputes its dependents and nothing else'''
+    assert sheet.set('rate', '0.10') == 2
+    assert sheet.get('doubled') == Decimal('220.00')
+    assert sheet.set('count', '4') == 1
+    assert sheet.get('label') == Decimal('5')
+
+def test_unchanged_values_stop_propagation(sheet):
+    '''Setting the same value, or a change that does not alter an intermediate, stops early'''
+    assert sheet.set('rate', '0.07') == 0
+    sheet.set('zero', '0')
+    sheet.let('scaled', 'zero * price')
+    sheet.let('after', 'scaled + 1')
+    assert sheet.set('price', '200') == 3, "total, doubled and scaled recompute; after does not"
+
+def test_redefining_a_formula_rewires_the_graph(sheet):
+    '''Redefining a cell drops its old dependencies'''
+    sheet.let('total', 'price')
+    assert sheet.set('rate', '0.5') == 0
+    assert sheet.get('doubled') == Decimal('200')
+
+@pytest.mark.parametrize("name, formula", [
+    ('price', 'total + 1'),        # cycle
+    ('bad', 'missing * 2'),        # unknown cell
+    ('bad', 'price ** 2'),         # unsupported operator
+    ('bad', 'print(price)'),       # unsupported expression
+    ('bad', 'price +'),            # syntax error
+])
+def test_invalid_formulas_are_rejected(sheet, name, formula):
+    '''Cycles, unknown cells and anything beyond + - * / are rejected'''
+    with pytest.raises(ValueError):
+        sheet.let(name, formula)
+
+def test_undefined_cells_propagate(sheet):
+    '''Division by zero makes the cell and its dependents undefined until fixed'''
+    sheet.let('ratio', 'price / count')
+    sheet.let('half', 'ratio / 2')
+    sheet.set('count', '0')
+    with pytest.raises(ValueError):
+        sheet.get('half')
+    sheet.set('count', '4')
+    assert sheet.get('half') == Decimal('12.5')
+
+def test_large_chain_updates_in_proportion_to_change():
+    '''Changing the head of one chain does not touch an independent chain'''
+    model = CellSheet()
+    for chain in ('a', 'b'):
+        model.set(f'{chain}0', '1')
+        for n in range(1, 200):
+            model.let(f'{chain}{n}', f'{chain}{n - 1} + 1')
+    assert model.set('a0', '2') == 199
+    assert model.get('a199') == Decimal('201')
+    assert model.get('b199') == Decimal('200')
+
+def test_rational_sheet():
+    '''With rational set, values and formulas are exact fractions'''
+    model = CellSheet()
+    model.rational = True
+    model.set('x', '1')
+    model.let('third', 'x / 3')
+    model.let('whole', 'third * 3')
+    assert model.get('whole') == 1
+    assert str(model.get('whole')) == '1'
+
+def test_rational_sheet_checks_limits_first():
+    '''A huge exponent is rejected by the limits before it is made exact, as a value or in a formula'''
+    model = CellSheet()
+    model.rational = True
+    with pytest.raises(LimitExceeded):
+        model.set('x', '1E+99999999')
+    model.set('y', '1')
+    model.let('z', 'y + 1E+99999999')
+    with pytest.raises(ValueError, match="exponent"):
+        model.get('z')
+
+def test_invalid_value_leaves_the_sheet_unchanged(sheet):
+    '''A value that is not a number is rejected before the cell is created or its formula dropped'''
+    with pytest.raises(ValueError):
+        sheet.set('new', 'abc')
+    assert 'new' not in sheet.cells
+    with pytest.raises(ValueError):
+        sheet.set('total', 'abc')
+    assert sheet.get('total') == Decimal('107.00')
+    assert sheet.set('rate', '0.10') == 2, "total still depends on rate"
+
+def test_cell_without_a_value_is_undefined(sheet):
+    '''A cell holding no value reads as undefined, and formulas over it are undefined rather than crashing'''
+    sheet.cells['empty'] = Cell('empty')
+    with pytest.raises(ValueError):
+        sheet.get('empty')
+    sheet.let('after', 'empty + 1')
+    with pytest.raises(ValueError):
+        sheet.get('after')
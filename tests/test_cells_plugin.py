@@ -0,0 +1,52 @@
+'''Tests for app/plugins/set, app/plugins/let and app/plugins/cells'''
+from decimal import Decimal
+from unittest.mock import patch
+import pytest
+from app.calculator import Calculator
+from app.commands import CommandHandler
+from app.plugins.set import SetCommand
+from app.plugins.let import LetCommand
+from app.plugins.cells import CellsCommand
+
+@pytest.fixture
+def handler():
+    '''A CommandHandler with the cell commands and an empty sheet'''
+    Calculator.cells.clear()
+    command_handler = CommandHandler()
+    command_handler.register_command('set', SetCommand())
+    command_handler.register_command('let', LetCommand())
+    command_handler.register_command('cells', CellsCommand())
+    yield command_handler
+    Calculator.cells.clear()
+
+def test_set_and_let_from_command_line(handler, capsys):
+    '''Cells are set and defined with arguments on the command line'''
+    handler.execute_command('set price 100')
+    handler.execute_command('set rate = 0.07')
+    assert handler.execute_command('let total = price * (1 + rate)') == 1
+    assert handler.execute_command('set rate 0.1') == 1
+    assert Calculator.cells.get('total') == Decimal('110.0')
+    handler.execute_command('cells')
+    output = capsys.readouterr().out
+    assert "total = price * (1 + rate) -> 110.0" in output
+    assert "Recomputations: 1 on the last update" in output
+
+def test_set_and_let_prompt_without_arguments(handler):
+    '''Cell names, numbers and formulas are prompted for when not given'''
+    with patch('builtins.input', side_effect=['x', '2', 'y', 'x * 3']):
+        handler.execute_command('set')
+        handler.execute_command('let')
+    assert Calculator.cells.get('y') == Decimal('6')
+
+def test_invalid_input_is_reported(handler, capsys):
+    '''Bad numbers and formulas are reported without raising'''
+    assert handler.execute_command('set rate abc') is None
+    assert handler.execute_command('let total = missing + 1') is None
+    output = capsys.readouterr().out
+    assert "Invalid cell name or number." in output
+    assert "Unknown cell(s): missing" in output
+
+def test_cells_with_no_cells(handler, capsys):
+    '''Listing an empty sheet says so'''
+    handler.execute_command('cells')
+    assert "No cells defined." in capsys.readouterr().out
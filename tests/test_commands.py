@@ -1,6 +1,7 @@
 '''Tests app/commands/__init__.py'''
 import pytest
 from app.commands import Command, CommandHandler
+from app.events import bus
 
 class MockCommand(Command):
     '''Mock command class for testing.'''
@@ -47,3 +48,38 @@ def test_execute_command_unknown_command():
 
     # Assert on the exception message
     assert str(exc_info.value) == "'Unknown command: unknown_command'"
+
+class EchoCommand(Command):
+    '''Mock command that accepts arguments.'''
+    accepts_arguments = True
+
+    def execute(self, args: str = ''):
+        '''Return the arguments it was given.'''
+        return args
+
+def test_execute_command_with_arguments():
+    '''Text after the name is passed to commands that accept arguments, and rejected otherwise.'''
+    handler = CommandHandler()
+    handler.register_command("echo", EchoCommand())
+    handler.register_command("test", MockCommand())
+    assert handler.execute_command("echo  hello world ") == "hello world"
+    with pytest.raises(KeyError):
+        handler.execute_command("test hello")
+
+def test_command_hooks():
+    '''Subscribing to command events swaps in the hooked dispatch; unsubscribing restores the fast path'''
+    handler = CommandHandler()
+    handler.register_command("test", MockCommand())
+    assert CommandHandler.execute_command is CommandHandler._execute_plain
+    seen = []
+    bus.subscribe('command.before', lambda event: seen.append(event.name))
+    bus.subscribe('command.after', lambda event: seen.append((event.name, event.payload['result'])))
+    bus.subscribe('command.error', lambda event: seen.append((event.name, type(event.payload['error']))))
+    try:
+        handler.execute_command("test")
+        with pytest.raises(KeyError):
+            handler.execute_command("missing")
+    finally:
+        bus.clear()
+    assert seen == ['command.before', ('command.after', None), 'command.before', ('command.error', KeyError)]
+    assert CommandHandler.execute_command is CommandHandler._execute_plain
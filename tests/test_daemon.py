@@ -0,0 +1,90 @@
+'''Tests for app/daemon.py and client.py'''
+import os
+import socket
+import stat
+import threading
+from unittest.mock import patch
+import pytest
+import client
+from app.daemon import CalculatorDaemon
+
+@pytest.fixture
+def daemon(tmp_path):
+    '''A daemon with its plugins loaded, not yet listening'''
+    return CalculatorDaemon(str(tmp_path / "calc.sock"), idle_timeout=5)
+
+def test_handle_runs_command_with_answers(daemon):
+    '''Prompts are answered from the request lines and the output is returned'''
+    reply = daemon.handle("add\n2\n3\n")
+    assert "The result of 2 + 3 is: 5" in reply
+
+def test_handle_reports_problems(daemon):
+    '''Unknown commands, missing answers and empty requests give a reply instead of an error'''
+    assert "Unknown command: nope" in daemon.handle("nope\n")
+    assert "Not enough input for the command." in daemon.handle("divide\n1\n")
+    assert daemon.handle("") == "No command given.\n"
+
+def test_client_round_trip_and_exit(daemon):
+    '''The client talks to a running daemon over the socket, and 'exit' stops it'''
+    server = threading.Thread(target=daemon.serve_forever)
+    server.start()
+    try:
+        for _ in range(200):
+            try:
+                reply = client.send(['multiply', '4', '5'], daemon.socket_path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                threading.Event().wait(0.01)
+        assert "The result of 4 * 5 is: 20" in reply
+        assert client.send(['exit'], daemon.socket_path) == "Calculator daemon stopped.\n"
+    finally:
+        server.join(5)
+    assert not server.is_alive()
+
+def test_daemon_exits_when_idle(tmp_path):
+    '''An idle daemon stops by itself and removes its socket'''
+    daemon = CalculatorDaemon(str(tmp_path / "idle.sock"), idle_timeout=0.1)
+    daemon.serve_forever()
+    assert not (tmp_path / "idle.sock").exists()
+
+def test_handle_reports_unexpected_errors(daemon):
+    '''A command that fails unexpectedly gives a reply instead of stopping the daemon'''
+    with patch.object(daemon.app.command_handler, 'execute_command', side_effect=OverflowError("too big")):
+        assert "Error: too big" in daemon.handle("scientific\n")
+
+def start(daemon):
+    '''Serve in a thread and wait until the socket accepts requests'''
+    server = threading.Thread(target=daemon.serve_forever)
+    server.start()
+    for _ in range(200):
+        try:
+            client.send(['menu'], daemon.socket_path)
+            return server
+        except (FileNotFoundError, ConnectionRefusedError):
+            threading.Event().wait(0.01)
+    raise AssertionError("daemon did not start")
+
+def test_socket_is_owner_only_and_not_taken_over(daemon):
+    '''The socket is created 0600, and a second daemon on the same path leaves the running one alone'''
+    server = start(daemon)
+    try:
+        assert stat.S_IMODE(os.stat(daemon.socket_path).st_mode) == 0o600
+        CalculatorDaemon(daemon.socket_path, idle_timeout=5).serve_forever()
+        assert "The result of 4 * 5 is: 20" in client.send(['multiply', '4', '5'], daemon.socket_path)
+    finally:
+        client.send(['exit'], daemon.socket_path)
+        server.join(5)
+
+def test_stalled_client_is_dropped(tmp_path):
+    '''A client that never finishes its request is dropped after request_timeout, and others are served'''
+    daemon = CalculatorDaemon(str(tmp_path / "calc.sock"), idle_timeout=5, request_timeout=0.2)
+    server = start(daemon)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+            stalled.connect(daemon.socket_path)
+            stalled.sendall(b"add\n")
+            assert "The result of 4 * 5 is: 20" in client.send(['multiply', '4', '5'], daemon.socket_path)
+    finally:
+        client.send(['exit'], daemon.socket_path)
+        server.join(5)
+    assert not server.is_alive()
@@ -18,3 +18,10 @@ def test_execute_divide_by_zero(mock_input):
     command = DivideCommand()
     result = command.execute()
     assert result == "Cannot divide by zero.", "Division by zero should return 'Cannot divide by zero.'"
+
+@patch('builtins.input', side_effect=['1E+999999999', '1E-999999999'])
+def test_execute_limit_exceeded(mock_input):
+    '''Test execute function of DivideCommand when the result exceeds the limits.'''
+    command = DivideCommand()
+    result = command.execute()
+    assert result == "Operand exponent exceeds 999999.", "Limit errors should be reported cleanly"
@@ -0,0 +1,116 @@
+'''Test File: app/calculator/encoding.py'''
+import json
+import pickle
+from decimal import Decimal, localcontext
+import pytest
+from app.calculator.calculation import Calculation, ReductionCalculation
+from app.calculator.encoding import MAGIC, OPERATIONS, _write_natural, _write_varint, _zigzag, decode_batch, encode_batch
+from app.calculator.operations import Operations as op
+from app.calculator.rational import Rational
+from app.calculator.scientific import ScientificOperations as sci
+from app.calculator.vectors import Matrix, VectorOperations as vec
+
+OPERANDS = [Decimal('1.0'), Decimal('1.00'), Decimal('-0'), Decimal('0E-5'), Decimal('-12.5E+100'), Decimal(8191),
+            Decimal(8192), Decimal('1E-3000'), Decimal(7) ** 200, Decimal('-' + '9' * 3000 + 'E-5000'),
+            Decimal('NaN'), Decimal('-Infinity'), Decimal('sNaN123'), Rational(-1, 3)]
+
+def same(left, right):
+    '''Equal digit for digit, so 1.0 and 1.00 (and NaNs, which never compare equal) can be told apart'''
+    return type(left) is type(right) and repr(left) == repr(right)
+
+def test_round_trip_is_exact():
+    '''Operands keep their sign, digits and exponent exactly, whatever the current precision'''
+    calculations = [Calculation(value, Decimal('2.50'), op.multiplication) for value in OPERANDS]
+    calculations.append(Calculation(Decimal(4), None, sci.square_root))
+    with localcontext() as ctx:
+        ctx.prec = 5
+        decoded, results, end = decode_batch(encode_batch(calculations, [None] * len(calculations)))
+    assert end > 0
+    for original, copy in zip(calculations, decoded):
+        assert same(original.a, copy.a) and same(original.b, copy.b)
+        assert original.operation is copy.operation
+    assert results == [None] * len(calculations)
+    assert repr(decoded[-1]) == "Calculation(4, square_root)"
+
+def test_results_are_computed_and_undefined_ones_absent():
+    '''Results default to computing each calculation; an undefined one is absent'''
+    calculations = [Calculation(Decimal(1), Decimal(3), op.division), Calculation(Decimal(1), Decimal(0), op.division)]
+    _, results, _ = decode_batch(encode_batch(calculations))
+    assert results == [Decimal(1) / Decimal(3), None]
+
+def test_batches_back_to_back_in_one_buffer():
+    '''Batches append to one buffer and are read in turn through a memoryview'''
+    buffer = bytearray()
+    encode_batch([Calculation(Decimal(1), Decimal(2), op.addition)], out=buffer)
+    encode_batch([Calculation(Decimal(3), Decimal(4), op.subtraction)] * 2, out=buffer)
+    first, _, end = decode_batch(memoryview(buffer))
+    second, results, final = decode_batch(bytes(buffer), end)
+    assert [repr(entry) for entry in first + second] == [
+        "Calculation(1, 2, addition)", "Calculation(3, 4, subtraction)", "Calculation(3, 4, subtraction)"]
+    assert results == [Decimal(-1)] * 2 and final == len(buffer)
+
+@pytest.mark.parametrize("entry", [
+    Calculation(Matrix([[1, 2]]), Matrix([[3, 4]]), vec.vector_addition),
+    Calculation(Decimal(1), Decimal(2), sci.integer_power),
+    Calculation(1.5, Decimal(2), op.addition),
+    ReductionCalculation(op.summation, 3, Decimal(6)),
+])
+def test_unencodable_entries_leave_the_buffer_unchanged(entry):
+    '''Matrices, floats, reductions and operations without a wire id are rejected'''
+    buffer = encode_batch([Calculation(Decimal(1), Decimal(2), op.addition)])
+    before = bytes(buffer)
+    with pytest.raises(ValueError):
+        encode_batch([Calculation(Decimal(1), Decimal(2), op.addition), entry], out=buffer)
+    assert bytes(buffer) == before
+
+@pytest.mark.parametrize("data, message", [
+    (b'JUNK', "Not a calculation batch"),
+    (MAGIC + b'\x02\x00', "Unsupported calculation batch version 2"),
+    (MAGIC + b'\x01\x01\x63\x00\x00', "Unknown operation id 99"),
+])
+def test_invalid_batches(data, message):
+    '''Foreign data, future versions and unknown operation ids are rejected'''
+    with pytest.raises(ValueError, match=message):
+        decode_batch(data)
+
+def record(write_a):
+    '''A one-record addition batch whose operand a is written by write_a(out)'''
+    out = bytearray(MAGIC + b'\x01\x01\x01\x00')
+    write_a(out)
+    return bytes(out)
+
+@pytest.mark.parametrize("write_a, message", [
+    (lambda out: (_write_varint(out, _zigzag(10 ** 30) << 2), _write_natural(out, 2)), "Exponent .* out of range"),
+    (lambda out: (_write_varint(out, _zigzag(-10 ** 30) << 2), _write_natural(out, 2)), "Exponent .* out of range"),
+    (lambda out: (_write_varint(out, 2), _write_natural(out, _zigzag(1)), _write_natural(out, 0)), "Malformed number"),
+    (lambda out: (_write_varint(out, 1 << 3 | 1), _write_natural(out, 10 ** 5000)), "NaN payload too long"),
+    (lambda out: _write_varint(out, 3), "Unknown number kind 3"),
+])
+def test_malformed_numbers(write_a, message):
+    '''Out-of-range exponents, zero denominators and oversized payloads are reported as ValueError'''
+    with pytest.raises(ValueError, match=message):
+        decode_batch(record(write_a))
+
+def test_truncated_batch():
+    '''A batch cut short anywhere is reported as truncated'''
+    data = bytes(encode_batch([Calculation(Decimal(7) ** 100, Decimal('0.5'), op.multiplication)]))
+    for end in range(len(MAGIC) + 1, len(data)):
+        with pytest.raises(ValueError, match="Truncated"):
+            decode_batch(data[:end])
+
+def test_operation_ids_are_stable():
+    '''Wire ids are fixed: reordering OPERATIONS would misread every stored batch'''
+    assert OPERATIONS[1:5] == (op.addition, op.subtraction, op.multiplication, op.division)
+    assert encode_batch([Calculation(Decimal(1), Decimal(2), op.division)])[len(MAGIC) + 2] == 4
+
+def test_smaller_than_pickle_and_json():
+    '''The same calculations and results take far fewer bytes than pickle or JSON'''
+    calculations = [Calculation(Decimal(n), Decimal(n % 97 + 1), op.division) for n in range(1000)]
+    results = [calculation.compute() for calculation in calculations]
+    binary = encode_batch(calculations, results)
+    pickled = pickle.dumps((calculations, results), pickle.HIGHEST_PROTOCOL)
+    as_json = json.dumps([[c.operation.__name__, str(c.a), str(c.b), str(r)] for c, r in zip(calculations, results)]).encode()
+    assert len(binary) * 2 < len(as_json) < len(pickled)
+    decoded, decoded_results, _ = decode_batch(binary)
+    assert decoded_results == pickle.loads(pickled)[1]
+    assert [repr(entry) for entry in decoded] == [repr(entry) for entry in calculations]
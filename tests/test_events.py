@@ -0,0 +1,64 @@
+'''Tests for app/events.py'''
+import threading
+from app.events import EventBus
+
+def test_publish_without_subscribers_does_nothing():
+    '''Publishing to an event nobody listens to is a no-op'''
+    EventBus().publish('command.after', command='add')
+
+def test_synchronous_subscribers_run_in_order():
+    '''Synchronous subscribers see each event in the publishing thread, in subscription order'''
+    bus = EventBus()
+    seen = []
+    bus.subscribe('command.after', lambda event: seen.append(('first', event.payload['command'])))
+    unsubscribe = bus.subscribe('command.after', lambda event: seen.append(('second', event.name)))
+    bus.publish('command.after', command='add')
+    unsubscribe()
+    bus.publish('command.after', command='subtract')
+    assert seen == [('first', 'add'), ('second', 'command.after'), ('first', 'subtract')]
+
+def test_asynchronous_subscribers_run_in_background():
+    '''Asynchronous subscribers run on the event thread and in order'''
+    bus = EventBus()
+    threads, commands = set(), []
+    def record(event):
+        threads.add(threading.current_thread().name)
+        commands.append(event.payload['command'])
+    bus.subscribe('command.before', record, asynchronous=True)
+    for name in ('add', 'subtract', 'multiply'):
+        bus.publish('command.before', command=name)
+    bus.drain()
+    assert commands == ['add', 'subtract', 'multiply']
+    assert threading.current_thread().name not in threads
+
+def test_failing_subscriber_is_logged(caplog):
+    '''A subscriber that raises is logged and the others still run'''
+    bus = EventBus()
+    seen = []
+    def broken(event):
+        raise RuntimeError("boom")
+    bus.subscribe('command.error', broken)
+    bus.subscribe('command.error', seen.append)
+    bus.publish('command.error', command='add')
+    assert len(seen) == 1
+    assert "Subscriber broken failed on 'command.error'" in caplog.text
+
+def test_watchers_follow_first_and_last_subscriber():
+    '''Watchers hear when their events gain a first subscriber and lose the last one'''
+    bus = EventBus()
+    states = []
+    bus.watch(('command.before', 'command.after'), states.append)
+    unsubscribe = bus.subscribe('command.after', print)
+    bus.subscribe('calculation.after', print)
+    unsubscribe()
+    assert states == [False, True, False]
+
+def test_watchers_are_only_told_about_changes():
+    '''A second subscriber does not re-notify the watcher'''
+    bus = EventBus()
+    states = []
+    bus.watch(('command.after',), states.append)
+    bus.subscribe('command.after', print)
+    bus.subscribe('command.after', repr)
+    bus.clear()
+    assert states == [False, True, False]
@@ -0,0 +1,108 @@
+'''Test File: app/calculator/finance.py'''
+import io
+import threading
+from decimal import Decimal, ROUND_DOWN
+import pytest
+from app.calculator.limits import LimitExceeded, OperationCancelled, OperationLimits
+from app.calculator.finance import (Rounding, amortize, future_value, payment, present_value, read_loans, summarize,
+                                    summarize_many, write_schedule)
+
+MORTGAGE = (Decimal(200000), Decimal('0.005'), 360)
+
+def test_payment_matches_textbook_value():
+    '''A 30-year 6% mortgage of 200,000 costs 1,199.10 a month'''
+    assert payment(*MORTGAGE).quantize(Decimal('0.01')) == Decimal('1199.10')
+    assert payment(Decimal(1200), Decimal(0), 12) == 100
+
+def test_closed_forms_are_consistent():
+    '''present_value undoes payment, and future_value undoes present_value'''
+    monthly = payment(*MORTGAGE)
+    assert abs(present_value(Decimal(0), MORTGAGE[1], MORTGAGE[2], monthly) - MORTGAGE[0]) < Decimal('1e-20')
+    grown = future_value(Decimal(1000), Decimal('0.05'), 10, Decimal(100))
+    assert abs(present_value(grown, Decimal('0.05'), 10) - (Decimal(1000) + present_value(Decimal(0), Decimal('0.05'), 10, Decimal(100)))) < Decimal('1e-20')
+    assert future_value(Decimal(1000), Decimal('0.05'), 10) == Decimal('1628.894626777441406250000000')
+
+def test_annuity_due_and_balloon():
+    '''Payments at the start of each period are smaller by one period's interest; a balloon lowers them'''
+    ordinary, due = payment(Decimal(1000), Decimal('0.01'), 12), payment(Decimal(1000), Decimal('0.01'), 12, due=True)
+    assert abs(due * Decimal('1.01') - ordinary) < Decimal('1e-25')
+    assert payment(Decimal(1000), Decimal('0.01'), 12, balloon=Decimal(500)) < ordinary
+
+@pytest.mark.parametrize("principal, rate, periods", [(1000, '0.01', 0), (1000, '-1', 12)])
+def test_invalid_loans(principal, rate, periods):
+    '''A loan needs at least one period and a rate above -100%'''
+    with pytest.raises(ValueError):
+        payment(Decimal(principal), Decimal(rate), periods)
+
+def test_schedule_clears_the_loan():
+    '''Every row is rounded to the cent and the last payment clears the balance'''
+    rows = list(amortize(*MORTGAGE))
+    assert len(rows) == 360
+    assert rows[0].interest == Decimal('1000.00') and rows[0].payment == Decimal('1199.10')
+    assert rows[-1].balance == 0 and rows[-1].payment == Decimal('1200.14')
+    assert sum(row.principal for row in rows) == MORTGAGE[0]
+    assert all(row.interest == row.interest.quantize(Decimal('0.01')) for row in rows)
+
+def test_schedule_streams():
+    '''The schedule is a generator, so a long one is never held in memory'''
+    rows = amortize(Decimal(10 ** 6), Decimal('0.001'), 10 ** 6)
+    assert next(rows).number == 1
+    assert next(rows).number == 2
+
+@pytest.mark.parametrize("principal, rate, periods", [(100, 0, 100000), (-100, '0.1', 2), (0, '0.1', 2)])
+def test_invalid_schedules(principal, rate, periods):
+    '''A payment that rounds to nothing, or a principal that is not positive, is rejected rather than scheduled'''
+    with pytest.raises(ValueError):
+        next(amortize(Decimal(principal), Decimal(rate), periods))
+
+def test_schedule_stops_on_cancel_or_time_limit():
+    '''The check is called every period, so a long schedule stops when cancelled or past its time limit'''
+    limits, cancel = OperationLimits(check_every=100), threading.Event()
+    rows = amortize(Decimal(10 ** 6), Decimal('0.001'), 10 ** 6, check=limits.checkpoint(cancel))
+    assert next(rows).number == 1
+    cancel.set()
+    with pytest.raises(OperationCancelled):
+        list(rows)
+    with pytest.raises(LimitExceeded):
+        summarize(Decimal(10 ** 6), Decimal('0.001'), 10 ** 6, check=OperationLimits(max_seconds=0, check_every=100).checkpoint())
+
+def test_rounding_rules():
+    '''Other places and modes are applied each period'''
+    rows = list(amortize(Decimal(1000), Decimal('0.00333'), 3, Rounding(places=0, mode=ROUND_DOWN)))
+    assert [row.interest for row in rows] == [Decimal(3), Decimal(2), Decimal(1)]
+    assert rows[-1].balance == 0
+
+def test_write_schedule():
+    '''Rows are written as CSV under a header'''
+    out = io.StringIO()
+    assert write_schedule(amortize(Decimal(1000), Decimal('0.01'), 3), out) == 3
+    assert out.getvalue().splitlines()[:2] == ["period,payment,interest,principal,balance", "1,340.02,10.00,330.02,669.98"]
+
+def test_summarize_matches_schedule():
+    '''The totals agree with the streamed schedule; without rounding they come from the closed form'''
+    rows = list(amortize(*MORTGAGE))
+    summary = summarize(*MORTGAGE)
+    assert summary.total_paid == sum(row.payment for row in rows)
+    assert summary.total_interest == sum(row.interest for row in rows)
+    assert summary.periods == 360
+    exact = summarize(*MORTGAGE, rounding=None)
+    assert exact.total_paid == exact.payment * 360
+    assert abs(exact.total_paid - summary.total_paid) < 1
+
+def test_summarize_many_in_chunks():
+    '''Loans are summarized in order, chunk by chunk, inline or in worker processes'''
+    loans = [(Decimal(1000 + n), Decimal('0.01'), 12 + n % 5) for n in range(20)]
+    expected_summaries = [summarize(*loan) for loan in loans]
+    assert list(summarize_many(iter(loans), chunk_size=3)) == expected_summaries
+    assert list(summarize_many(iter(loans), chunk_size=7, workers=2)) == expected_summaries
+
+def test_read_loans():
+    '''Loans are read one per line, skipping blank lines'''
+    assert list(read_loans(["1000 0.01 12\n", "\n", "2000,0.02,24"])) == [
+        (Decimal(1000), Decimal('0.01'), 12), (Decimal(2000), Decimal('0.02'), 24)]
+    with pytest.raises(ValueError):
+        list(read_loans(["1000 0.01"]))
+    with pytest.raises(ValueError, match="principal must be positive"):
+        list(read_loans(["-1000 0.01 12"]))
+    with pytest.raises(ValueError, match="more than 100 periods"):
+        list(read_loans(["1000 0.01 101"], max_periods=100))
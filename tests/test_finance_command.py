@@ -0,0 +1,74 @@
+'''Tests for app/plugins/finance/__init__.py'''
+import threading
+from decimal import Decimal
+from unittest.mock import patch
+from app.calculator import Calculator
+from app.plugins.finance import FinanceCommand
+
+@patch('builtins.input', side_effect=['1', '200000', '0.005', '360'])
+def test_execute_payment(mock_input, capsys):
+    '''Test execute function of FinanceCommand computing a payment.'''
+    assert FinanceCommand().execute().quantize(Decimal('0.01')) == Decimal('1199.10')
+    assert "The payment is: 1199.10" in capsys.readouterr().out
+
+@patch('builtins.input', side_effect=['2', '1000', '0.05', '10', '0'])
+def test_execute_future_value(mock_input):
+    '''Test execute function of FinanceCommand computing a future value.'''
+    assert FinanceCommand().execute() == Decimal('1628.894626777441406250000000')
+
+@patch('builtins.input', side_effect=['4', '1000', '0.01', '3', ''])
+def test_execute_schedule_to_console(mock_input, capsys):
+    '''Test execute function of FinanceCommand printing a schedule.'''
+    assert FinanceCommand().execute() == 3
+    assert "3,340.03,3.37,336.66,0.00" in capsys.readouterr().out
+
+def test_execute_schedule_to_file(tmp_path, capsys):
+    '''Test execute function of FinanceCommand writing a schedule to a file.'''
+    path = tmp_path / "schedule.csv"
+    with patch('builtins.input', side_effect=['4', '200000', '0.005', '360', str(path)]):
+        assert FinanceCommand().execute() == 360
+    assert len(path.read_text().splitlines()) == 361
+    assert f"Wrote 360 period(s) to {path}" in capsys.readouterr().out
+
+def test_execute_batch(tmp_path, capsys):
+    '''Test execute function of FinanceCommand summarizing a file of loans.'''
+    loans, totals = tmp_path / "loans.txt", tmp_path / "totals.csv"
+    loans.write_text("1000 0.01 3\n1000 0.01 3\n")
+    with patch('builtins.input', side_effect=['5', f'@{loans}', str(totals)]):
+        assert FinanceCommand().execute() == 2
+    assert "2 loan(s): 2040.14 paid, 40.14 interest" in capsys.readouterr().out
+    assert totals.read_text().splitlines() == ["payment,periods,total_paid,total_interest", "340.02,3,1020.07,20.07",
+                                               "340.02,3,1020.07,20.07"]
+
+def test_execute_batch_errors(tmp_path, capsys):
+    '''Test execute function of FinanceCommand with a bad loan and a missing file.'''
+    loans = tmp_path / "loans.txt"
+    loans.write_text("1000 0.01 3\n1000 x 3\n")
+    with patch('builtins.input', side_effect=['5', str(loans), '']):
+        assert FinanceCommand().execute().startswith("Invalid loan on line 2")
+    with patch('builtins.input', side_effect=['5', str(tmp_path / "missing.txt"), '']):
+        assert FinanceCommand().execute() is None
+    assert "Could not use the file" in capsys.readouterr().out
+
+@patch('builtins.input', side_effect=['1', '1000', '0.01', '2.5'])
+def test_execute_fractional_periods(mock_input, capsys):
+    '''Test execute function of FinanceCommand with a fractional number of periods.'''
+    assert FinanceCommand().execute() == "The number of periods must be a whole number."
+
+@patch('builtins.input', side_effect=['4', '1000', '0.01', '1E+12', ''])
+def test_execute_too_many_periods(mock_input):
+    '''Test execute function of FinanceCommand with more periods than the step limit allows.'''
+    assert FinanceCommand().execute().startswith("More than")
+
+def test_execute_schedule_cancelled(capsys):
+    '''Test execute function of FinanceCommand when the schedule is cancelled part way, as a background job is.'''
+    cancel = threading.Event()
+    cancel.set()
+    with patch('builtins.input', side_effect=['4', '1000000', '0.001', '1000000', '']), Calculator.cancellable(cancel):
+        assert FinanceCommand().execute() == "Calculation cancelled."
+
+@patch('builtins.input', side_effect=['9'])
+def test_execute_invalid_choice(mock_input, capsys):
+    '''Test execute function of FinanceCommand with an invalid choice.'''
+    assert FinanceCommand().execute() is None
+    assert "Invalid choice" in capsys.readouterr().out
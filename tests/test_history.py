@@ -1,10 +1,13 @@
 '''Test File: app/calculator/calc_history.py'''
 from decimal import Decimal
 import pytest
-from app.calculator.calc_history import CalculationHistory as his
+from app.calculator.calc_history import CalculationHistory, RecordingPolicy, page_entries
 from app.calculator.calculation import Calculation as calc
 from app.calculator.operations import Operations as op
 
+# A session history of its own, independent of the Calculator's
+his = CalculationHistory()
+
 @pytest.fixture
 def setup_calculations():
     '''Set up simple calculations to test calc_history.py'''
@@ -37,3 +40,100 @@ def test_get_latest_history_with_empty_history():
     '''Test getting the latest calculation when the history is empty'''
     his.clear_history()
     assert his.get_latest_history() is None, "Expected None for latest calculation with empty history"
+
+@pytest.fixture
+def compact_history(monkeypatch):
+    '''Enable operand interning and deduplication on an empty history'''
+    monkeypatch.setattr(his, 'intern_operands', True)
+    monkeypatch.setattr(his, 'deduplicate', True)
+    his.clear_history()
+    yield
+    his.clear_history()
+
+def test_memory_usage_reports_bytes_per_entry(setup_calculations):
+    '''Memory accounting reports the total and bytes per calculation'''
+    usage = his.memory_usage()
+    assert usage['entries'] == 2 and usage['calculations'] == 2
+    assert usage['total_bytes'] > usage['entry_bytes'] > 0
+    assert usage['bytes_per_calculation'] == usage['total_bytes'] / 2
+
+def test_deduplication_counts_repeats(compact_history):
+    '''Identical calculations are stored once with a repeat count and sequence numbers'''
+    for _ in range(3):
+        his.add_calculation(calc(Decimal('10'), Decimal('5'), op.addition))
+    his.add_calculation(calc(Decimal('10.0'), Decimal('5'), op.addition))
+    his.add_calculation(calc(Decimal('10'), Decimal('5'), op.addition))
+    history = his.get_history()
+    assert len(history) == 2, "10 and 10.0 are different calculations"
+    assert history[0].count == 4 and list(history[0].sequence) == [1, 2, 3, 5]
+    assert his.get_latest_history() is history[0]
+    assert repr(history[0]) == "Calculation(10, 5, addition) x4"
+    assert his.memory_usage()['calculations'] == 5
+
+def test_interning_shares_operands(compact_history, monkeypatch):
+    '''Equal operands share one Decimal object, which shrinks the history'''
+    monkeypatch.setattr(his, 'deduplicate', False)
+    his.add_calculation(calc(Decimal('7'), Decimal('2'), op.addition))
+    his.add_calculation(calc(Decimal('2'), Decimal('7'), op.multiplication))
+    first, second = his.get_history()
+    assert first.a is second.b and first.b is second.a
+    shared = his.memory_usage()['entry_bytes']
+    monkeypatch.setattr(his, 'intern_operands', False)
+    his.clear_history()
+    his.add_calculation(calc(Decimal('7'), Decimal('2'), op.addition))
+    his.add_calculation(calc(Decimal('2'), Decimal('7'), op.multiplication))
+    assert his.memory_usage()['entry_bytes'] > shared
+
+@pytest.mark.parametrize("text, policy, rate", [
+    ('full', RecordingPolicy.FULL, 10),
+    ('Sampled:100', RecordingPolicy.SAMPLED, 100),
+    ('aggregate', RecordingPolicy.AGGREGATE, 10),
+    ('off', RecordingPolicy.OFF, 10),
+])
+def test_parse_policy(monkeypatch, text, policy, rate):
+    '''Recording policies are parsed from text'''
+    monkeypatch.setattr(his, 'policy', RecordingPolicy.FULL)
+    monkeypatch.setattr(his, 'sample_rate', 10)
+    his.parse_policy(text)
+    assert (his.policy, his.sample_rate) == (policy, rate)
+
+@pytest.mark.parametrize("text", ['everything', 'sampled:0', 'sampled:x', 'off:5'])
+def test_parse_policy_rejects_malformed_text(monkeypatch, text):
+    '''Malformed recording policies raise ValueError'''
+    monkeypatch.setattr(his, 'policy', RecordingPolicy.FULL)
+    with pytest.raises(ValueError):
+        his.parse_policy(text)
+
+def test_snapshot_is_stable(setup_calculations):
+    '''A snapshot does not see later appends or clears'''
+    snapshot = his.snapshot()
+    his.add_calculation(calc(Decimal('1'), Decimal('1'), op.addition))
+    assert len(snapshot) == 2 and len(his.get_history()) == 3
+    his.clear_history()
+    assert [entry.a for entry in snapshot] == [Decimal('10'), Decimal('20')]
+    assert snapshot[-1].a == Decimal('20') and len(snapshot[:1]) == 1
+    with pytest.raises(IndexError):
+        _ = snapshot[2]
+    assert not his.get_history()
+
+def test_sessions_are_independent():
+    '''Each CalculationHistory instance keeps its own entries, settings and counts'''
+    first, second = CalculationHistory(), CalculationHistory(RecordingPolicy.AGGREGATE)
+    first.add_calculation(calc(Decimal('1'), Decimal('2'), op.addition))
+    assert first.record(op.addition) and not second.record(op.addition)
+    assert len(first) == 1 and len(second) == 0
+    assert second.counts == {'addition': 1}
+
+def test_page_entries():
+    '''Pages go forward from a cursor or back from it, skip an offset and filter by operation'''
+    paged = CalculationHistory()
+    for value in range(10):
+        paged.add_calculation(calc(Decimal(value), Decimal(1), op.addition if value % 2 else op.subtraction))
+    snapshot = paged.snapshot()
+    assert [position for position, _ in page_entries(snapshot, 0, 3)] == [0, 1, 2]
+    assert [position for position, _ in page_entries(snapshot, 3, 3)] == [3, 4, 5]
+    assert [position for position, _ in page_entries(snapshot, 10, 3, backwards=True)] == [7, 8, 9], "The tail"
+    assert [position for position, _ in page_entries(snapshot, 0, 2, 'addition', offset=1)] == [3, 5]
+    assert [position for position, _ in page_entries(snapshot, 5, 2, 'addition', backwards=True)] == [1, 3]
+    assert page_entries(snapshot, 0, 3, backwards=True) == [], "Nothing comes before the first entry"
+    assert page_entries(snapshot, 10, 3) == [], "Nothing comes after the last entry"
@@ -1,8 +1,10 @@
 '''Test for app/plugins/history/__init__.py'''
 import unittest
+from decimal import Decimal
 from unittest.mock import patch, MagicMock
 from io import StringIO
 from app.plugins.history import HistoryCommand
+from app.calculator import Calculator
 from app.calculator.calculation import Calculation
 from app.calculator.operations import Operations
 
@@ -31,7 +33,7 @@ class TestHistoryCommandExecute(unittest.TestCase):
             expected_output = "Calculation(2, 3, addition) results in 5"
             self.assertIn(expected_output, mock_stdout.getvalue().strip())
 
-    @patch('app.calculator.calc_history.CalculationHistory.get_history')
+    @patch('app.calculator.calc_history.CalculationHistory.snapshot')
     def test_execute_prints_all_calculations(self, mock_get_history):
         '''Test whether execute method prints all calculations correctly.'''
         # Mocking all calculations
@@ -110,7 +112,7 @@ class TestHistoryCommandExecute(unittest.TestCase):
             expected_output = f"{mock_calculation} is undefined."
             self.assertIn(expected_output, mock_stdout.getvalue().strip())
 
-    @patch('app.calculator.calc_history.CalculationHistory.get_history')
+    @patch('app.calculator.calc_history.CalculationHistory.snapshot')
     def test_execute_handles_compute_exception(self, mock_get_history):
         '''Test whether execute method handles compute exception correctly.'''
         # Mocking history with calculations
@@ -139,3 +141,112 @@ class TestHistoryCommandExecute(unittest.TestCase):
                     # Check the output
                     expected_output = "Calculation(2, 0, division) is undefined."
                     self.assertIn(expected_output, mock_stdout.getvalue().strip())
+
+    @patch('app.calculator.calc_history.CalculationHistory.snapshot')
+    def test_execute_replays_history(self, mock_get_history):
+        '''Test whether execute method replays the history under a new precision.'''
+        mock_get_history.return_value = [
+            Calculation(Decimal(1), Decimal(3), Operations.division),
+            Calculation(Decimal(4), Decimal(5), Operations.subtraction),
+        ]
+        history_command = HistoryCommand()
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            with patch('builtins.input', side_effect=['4', '3', 'round_down']):
+                history_command.execute()
+
+            output = mock_stdout.getvalue()
+            self.assertIn("1 calculation(s) changed:", output)
+            self.assertIn("-> 0.333", output)
+
+    def test_execute_replay_invalid_precision(self):
+        '''Test whether execute method rejects an invalid replay precision.'''
+        history_command = HistoryCommand()
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            with patch('builtins.input', side_effect=['4', 'abc']):
+                history_command.execute()
+
+            self.assertIn("Invalid precision or rounding mode.", mock_stdout.getvalue())
+
+    def test_execute_shows_memory_usage(self):
+        '''Test whether execute method prints the history memory usage.'''
+        history_command = HistoryCommand()
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            with patch('builtins.input', side_effect=['5']):
+                history_command.execute()
+
+            self.assertIn("bytes per calculation", mock_stdout.getvalue())
+
+
+class TestHistoryCommandPaging(unittest.TestCase):
+    '''Test case for browsing the history a page at a time.'''
+
+    def setUp(self):
+        '''A session with 50 calculations, alternating addition and subtraction'''
+        self.session = Calculator.session()
+        history = self.session.__enter__()
+        for value in range(50):
+            history.add_calculation(Calculation(Decimal(value), Decimal(1), Operations.addition if value % 2 else Operations.subtraction))
+        self.history_command = HistoryCommand()
+        self.history_command.page_size = 10
+
+    def tearDown(self):
+        self.session.__exit__(None, None, None)
+
+    def run_command(self, args):
+        '''Run a history subcommand and return what it printed'''
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.history_command.execute(args)
+        return mock_stdout.getvalue()
+
+    def test_page_next_prev(self):
+        '''Pages follow on from each other and prev goes back'''
+        self.assertIn("Calculations 6-8 of 50:", self.run_command("page 5 3"))
+        output = self.run_command("next")
+        self.assertIn("[9] Calculation(8, 1, subtraction) results in 7", output)
+        self.assertNotIn("[8]", output)
+        self.assertIn("Calculations 6-8 of 50:", self.run_command("prev"))
+
+    def test_pages_come_from_a_snapshot(self):
+        '''Calculations made while browsing do not move the cursor'''
+        self.run_command("tail 10")
+        Calculator.session_history().add_calculation(Calculation(Decimal(9), Decimal(9), Operations.addition))
+        self.assertIn("No more calculations.", self.run_command("next"))
+        self.assertIn("Calculations 31-40 of 50:", self.run_command("prev"))
+
+    def test_filter(self):
+        '''A filter limits pages to one operation'''
+        self.run_command("filter addition")
+        output = self.run_command("page 0 2")
+        self.assertIn("Calculations addition 2-4 of 50:", output)
+        self.assertNotIn("subtraction", output)
+        self.run_command("filter")
+        self.assertIn("Calculations 1-2 of 50:", self.run_command("page 0 2"))
+
+    def test_filter_by_command_name(self):
+        '''Filters take the command names users type, and unknown names are rejected'''
+        self.assertIn("Showing addition calculations.", self.run_command("filter add"))
+        self.assertIn("Calculations addition 2-4 of 50:", self.run_command("page 0 2"))
+        output = self.run_command("filter plus")
+        self.assertIn("Unknown operation: plus. Usage: history filter [add | subtract", output)
+        self.assertIn("Calculations addition 2-4 of 50:", self.run_command("page 0 2"))
+
+    def test_menu_shows_first_page(self):
+        '''Menu option 6 shows the first page only'''
+        with patch('sys.stdout', new=StringIO()) as mock_stdout, patch('builtins.input', side_effect=['6']):
+            self.history_command.execute()
+        self.assertIn("[10]", mock_stdout.getvalue())
+        self.assertNotIn("[11]", mock_stdout.getvalue())
+
+    def test_invalid_arguments(self):
+        '''Bad numbers and unknown subcommands are reported'''
+        self.assertIn("whole numbers", self.run_command("page x"))
+        self.assertIn("Usage:", self.run_command("sideways"))
+
+    def test_interrupted_listing(self):
+        '''Ctrl-C while a listing is built stops it without ending the session'''
+        with patch.object(HistoryCommand, 'format_result', side_effect=["line", KeyboardInterrupt]):
+            output = self.run_command("page")
+        self.assertIn("line\nListing interrupted.", output)
@@ -0,0 +1,159 @@
+'''Tests for app/jobs.py and the jobs, wait, result and cancel plugins'''
+import builtins
+import sys
+import threading
+import time
+from decimal import Decimal
+from unittest.mock import patch
+import pytest
+from app import App
+from app.calculator import Calculator
+from app.calculator.limits import OperationLimits
+from app.commands import Command, CommandHandler
+from app.jobs import JobScheduler, JobState
+from app.plugins.add import AddCommand
+from app.plugins.cancel import CancelCommand
+from app.plugins.jobs import JobsCommand
+from app.plugins.result import ResultCommand
+from app.plugins.wait import WaitCommand
+
+class SlowCommand(Command):
+    '''Waits until released or cancelled, like a heavy calculation'''
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def execute(self):
+        self.started.set()
+        while not self.release.wait(0.01):
+            if Calculator._cancel_event().is_set():
+                raise RuntimeError("Calculation cancelled.")
+        print("slow done")
+        return 'slow'
+
+def sleepy(a, b):
+    '''A heavy calculation, run in a limits worker process'''
+    time.sleep(5)
+    return a
+
+class HeavyCommand(Command):
+    '''Runs a heavy calculation through the Calculator, so it needs a limits worker'''
+
+    def execute(self):
+        return Calculator._perform_calculation(Decimal(2), Decimal(3), sleepy)
+
+@pytest.fixture
+def slow():
+    '''A slow command, released at teardown so no worker is left waiting'''
+    command = SlowCommand()
+    yield command
+    command.release.set()
+
+@pytest.fixture
+def jobs(slow):
+    '''A one-worker scheduler with the add and slow commands'''
+    handler = CommandHandler()
+    handler.register_command('add', AddCommand())
+    handler.register_command('slow', slow)
+    job_scheduler = JobScheduler(handler, max_workers=1)
+    yield job_scheduler
+    job_scheduler.shutdown()
+
+def test_job_runs_with_answers_and_private_output(jobs, capsys):
+    '''Prompts are answered from the job line and output is kept for the job, not printed'''
+    job = jobs.wait(jobs.submit('add 2 3').id, timeout=5)
+    assert job.state is JobState.DONE
+    assert job.result == Decimal(5)
+    assert "The result of 2 + 3 is: 5" in job.output
+    assert "Enter the first number: 2" in job.output, "Prompts and their answers should be echoed to the job output"
+    assert capsys.readouterr().out == ""
+    assert builtins.input.__class__.__name__ != '_RoutedInput', "Input should be restored when no job is running"
+    assert sys.stdout.__class__.__name__ != '_RoutedOutput'
+
+def test_job_failures(jobs):
+    '''Missing answers fail the job; unknown commands are refused up front'''
+    job = jobs.wait(jobs.submit('add 2').id, timeout=5)
+    assert job.state is JobState.FAILED
+    assert job.error == "Not enough input for the command."
+    with pytest.raises(KeyError):
+        jobs.submit('nope 1 2')
+
+def test_history_in_completion_order(jobs, slow):
+    '''A job's calculations reach the submitting session's history when it finishes'''
+    with Calculator.session() as history:
+        first = jobs.submit('slow')
+        second = jobs.submit('add 1 1')
+        slow.started.wait(5)
+        assert len(history) == 0
+        slow.release.set()
+        jobs.wait(second.id, timeout=5)
+    assert first.state is JobState.DONE and second.state is JobState.DONE
+    assert [calculation.compute() for calculation in history.snapshot()] == [Decimal(2)]
+    assert jobs.finished() == [first, second], "Finished jobs are reported in completion order"
+    assert jobs.finished() == []
+
+def test_worker_limit_and_cancel(jobs, slow):
+    '''With one worker the second job queues; cancelling stops the running one and the queued one never starts'''
+    running = jobs.submit('slow')
+    queued = jobs.submit('add 1 1')
+    slow.started.wait(5)
+    assert queued.state is JobState.QUEUED
+    jobs.cancel(queued.id)
+    jobs.cancel(running.id)
+    assert jobs.wait(running.id, timeout=5).state is JobState.CANCELLED
+    assert queued.state is JobState.CANCELLED and queued.result is None
+
+def test_cancel_job_waiting_behind_heavy_job(monkeypatch):
+    '''A job waiting for a heavy-calculation worker held by another job is cancelled at once'''
+    monkeypatch.setattr(Calculator, 'limits', OperationLimits(max_seconds=None, inline_digits=0, workers=1))
+    handler = CommandHandler()
+    handler.register_command('heavy', HeavyCommand())
+    job_scheduler = JobScheduler(handler, max_workers=2)
+    try:
+        running = job_scheduler.submit('heavy')
+        time.sleep(0.3)
+        waiting = job_scheduler.submit('heavy')
+        time.sleep(0.2)
+        job_scheduler.cancel(waiting.id)
+        assert job_scheduler.wait(waiting.id, timeout=1).state is JobState.CANCELLED
+        assert running.state is JobState.RUNNING
+        job_scheduler.cancel(running.id)
+        assert job_scheduler.wait(running.id, timeout=2).state is JobState.CANCELLED
+    finally:
+        job_scheduler.shutdown()
+        Calculator.limits.shutdown()
+
+def test_plugins(jobs, slow, monkeypatch, capsys):
+    '''jobs lists, wait blocks for and shows, result shows and cancel stops jobs'''
+    monkeypatch.setattr('app.plugins.jobs.scheduler', jobs)
+    monkeypatch.setattr('app.plugins.result.scheduler', jobs)
+    monkeypatch.setattr('app.plugins.wait.scheduler', jobs)
+    monkeypatch.setattr('app.plugins.cancel.scheduler', jobs)
+    added = jobs.submit('add 2 3')
+    assert WaitCommand().execute(str(added.id)) == Decimal(5)
+    running = jobs.submit('slow')
+    slow.started.wait(5)
+    assert len(JobsCommand().execute()) == 2
+    assert ResultCommand().execute(str(running.id)) is None
+    CancelCommand().execute(str(running.id))
+    jobs.wait(running.id, timeout=5)
+    ResultCommand().execute('99')
+    out = capsys.readouterr().out
+    assert "The result of 2 + 3 is: 5" in out
+    assert f"Job {running.id} is running" in out
+    assert f"Job {running.id} cancelled." in out
+    assert "No job 99." in out
+
+def test_app_runs_ampersand_lines_in_background(monkeypatch, capsys):
+    '''A command line ending in & returns a job id straight away'''
+    fresh = JobScheduler()
+    monkeypatch.setattr('app.scheduler', fresh)
+    monkeypatch.setattr('app.plugins.wait.scheduler', fresh)
+    app = App()
+    with patch('builtins.input', side_effect=['add 2 3 &', 'wait 1', 'nope &', 'exit']), pytest.raises(SystemExit):
+        app.start()
+    out = capsys.readouterr().out
+    assert "[1] started" in out
+    assert "The result of 2 + 3 is: 5" in out
+    assert "Cannot start job: Unknown command: nope" in out
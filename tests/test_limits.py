@@ -0,0 +1,206 @@
+'''Test File: app/calculator/limits.py'''
+from decimal import Decimal, localcontext
+import threading
+import time
+import pytest
+from app.calculator import Calculator
+from app.calculator.limits import OperationLimits, LimitExceeded, OperationCancelled
+from app.calculator.operations import Operations as op
+from app.calculator.scientific import ScientificOperations as sci
+from app.calculator.vectors import Matrix, VectorOperations as vec
+
+his = Calculator.history
+
+def slow_operation(a, b):
+    '''Stands in for a pathological calculation'''
+    time.sleep(5)
+    return a
+
+def short_operation(a, b):
+    '''A heavy calculation that takes a moment'''
+    time.sleep(0.5)
+    return a
+
+def test_small_calculation_runs_inline():
+    '''Calculations within the limits return their result'''
+    assert OperationLimits().run(Decimal('6'), Decimal('3'), op.division) == Decimal('2')
+
+@pytest.mark.parametrize("left, right, operation", [
+    (Decimal('1' * 50), Decimal('1'), op.addition),          # operand digits
+    (Decimal('1E+500'), Decimal('1'), op.addition),          # operand exponent
+    (Decimal('1E+300'), Decimal('1E+300'), op.multiplication),  # result exponent
+    (Decimal('1E+300'), Decimal('1E-300'), op.division),     # result exponent
+])
+def test_obviously_excessive_inputs_are_rejected(left, right, operation):
+    '''Inputs that would exceed a limit are rejected before computing'''
+    limits = OperationLimits(max_digits=40, max_exponent=400)
+    with pytest.raises(LimitExceeded):
+        limits.check(left, right, operation)
+
+def test_result_digits_are_checked():
+    '''Products too long for the digit limit are rejected'''
+    limits = OperationLimits(max_digits=30)
+    with localcontext() as ctx:
+        ctx.prec = 100
+        with pytest.raises(LimitExceeded):
+            limits.run(Decimal('9' * 20), Decimal('9' * 20), op.multiplication)
+
+def test_heavy_calculation_runs_in_worker():
+    '''Calculations above the inline threshold give the same result from the worker process'''
+    limits = OperationLimits(inline_digits=10)
+    try:
+        with localcontext() as ctx:
+            ctx.prec = 50
+            assert limits.run(Decimal(1), Decimal(3), op.division) == Decimal(1) / Decimal(3)
+    finally:
+        limits.shutdown()
+
+def test_heavy_calculation_times_out():
+    '''A calculation that runs past the wall time limit is terminated'''
+    limits = OperationLimits(max_seconds=0.2, inline_digits=10)
+    try:
+        with localcontext() as ctx:
+            ctx.prec = 50
+            with pytest.raises(LimitExceeded):
+                limits.run(Decimal(2), Decimal(3), slow_operation)
+    finally:
+        limits.shutdown()
+
+def test_heavy_calculation_can_be_cancelled():
+    '''Setting the cancel event stops a running calculation'''
+    limits = OperationLimits(max_seconds=None, inline_digits=10)
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    try:
+        with localcontext() as ctx:
+            ctx.prec = 50
+            with pytest.raises(OperationCancelled):
+                limits.run(Decimal(2), Decimal(3), slow_operation, cancel)
+    finally:
+        limits.shutdown()
+
+def run_in_thread(limits, operation, cancel=None):
+    '''Start limits.run in a thread; returns the thread and a list that receives its result or exception'''
+    outcome = []
+    def target():
+        with localcontext() as ctx:
+            ctx.prec = 50
+            try:
+                outcome.append(limits.run(Decimal(2), Decimal(3), operation, cancel))
+            except Exception as e:
+                outcome.append(e)
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+def test_heavy_calculations_run_concurrently():
+    '''Heavy calculations on different threads run in separate workers at the same time'''
+    limits = OperationLimits(max_seconds=None, inline_digits=10, workers=2)
+    try:
+        run_in_thread(limits, short_operation)[0].join()  # start the workers
+        start = time.monotonic()
+        runs = [run_in_thread(limits, short_operation) for _ in range(2)]
+        for thread, _ in runs:
+            thread.join()
+        assert time.monotonic() - start < 0.9
+        assert [outcome for _, outcome in runs] == [[Decimal(2)], [Decimal(2)]]
+    finally:
+        limits.shutdown()
+
+def test_waiting_for_a_worker_is_cancellable_and_timed():
+    '''A calculation waiting for a busy worker can be cancelled, and its time limit counts the wait'''
+    limits = OperationLimits(max_seconds=1.5, inline_digits=10, workers=1)
+    cancel = threading.Event()
+    try:
+        busy, busy_outcome = run_in_thread(limits, slow_operation)
+        time.sleep(0.1)
+        waiting, outcome = run_in_thread(limits, short_operation, cancel)
+        time.sleep(0.1)
+        cancel.set()
+        waiting.join(1)
+        assert not waiting.is_alive() and isinstance(outcome[0], OperationCancelled)
+        timed, timed_outcome = run_in_thread(limits, short_operation)
+        timed.join(3)
+        busy.join(3)
+        assert isinstance(timed_outcome[0], LimitExceeded)
+        assert isinstance(busy_outcome[0], LimitExceeded)
+    finally:
+        limits.shutdown()
+
+def test_aborted_calculation_leaves_no_history(monkeypatch):
+    '''Rejected calculations are not recorded, while undefined ones still are'''
+    monkeypatch.setattr(Calculator, 'limits', OperationLimits(max_exponent=10))
+    his.clear_history()
+    with pytest.raises(LimitExceeded):
+        Calculator.multiply(Decimal('1E+8'), Decimal('1E+8'))
+    assert not his.get_history()
+    with pytest.raises(ValueError):
+        Calculator.divide(Decimal(1), Decimal(0))
+    assert len(his.get_history()) == 1
+
+@pytest.mark.parametrize("left, right, operation", [
+    (Decimal('1E+5000000'), Decimal(1), op.addition),
+    (Decimal('1E+600000'), Decimal('1E+600000'), op.multiplication),
+])
+def test_default_limits_stop_decimal_overflow(left, right, operation):
+    '''At the default limits, inputs past the context's Emax are rejected cleanly and not recorded'''
+    his.clear_history()
+    with pytest.raises(LimitExceeded):
+        Calculator._perform_calculation(left, right, operation)
+    assert not his.get_history()
+
+def test_reduction_overflow_is_a_limit():
+    '''Reductions that overflow the Decimal context raise LimitExceeded and leave no history'''
+    his.clear_history()
+    with pytest.raises(LimitExceeded):
+        Calculator.product([Decimal('1E+600000'), Decimal('1E+600000')])
+    assert not his.get_history()
+
+def test_reduction_can_be_cancelled():
+    '''A streaming reduction checks the thread's cancel event between chunks'''
+    cancel = threading.Event()
+    cancel.set()
+    his.clear_history()
+    with Calculator.cancellable(cancel):
+        with pytest.raises(OperationCancelled):
+            Calculator.sum(Decimal(n) for n in range(10000))
+    assert not his.get_history()
+
+def test_calculator_passes_cancel_event(monkeypatch):
+    '''Calculations inside Calculator.cancellable can be cancelled while running in the worker'''
+    monkeypatch.setattr(Calculator, 'limits', OperationLimits(max_seconds=None, inline_digits=0))
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    try:
+        with Calculator.cancellable(cancel):
+            with pytest.raises(OperationCancelled):
+                Calculator._perform_calculation(Decimal(2), Decimal(3), slow_operation)
+    finally:
+        Calculator.limits.shutdown()
+
+def test_large_batch_runs_in_worker():
+    '''A batch with more than check_every values is computed in a worker, with the same result, and is timed out there'''
+    a = Matrix([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+    limits = OperationLimits(check_every=4, max_seconds=0.3)
+    try:
+        assert limits.run_batch(a, a, vec.matrix_multiplication) == vec.matrix_multiplication(a, a)
+        start = time.monotonic()
+        with pytest.raises(LimitExceeded):
+            limits.run_batch(a, a, slow_operation)
+        assert time.monotonic() - start < 2
+        cancel = threading.Event()
+        cancel.set()
+        with pytest.raises(OperationCancelled):
+            OperationLimits(check_every=4, max_seconds=None).run_batch(a, a, slow_operation, cancel)
+    finally:
+        limits.shutdown()
+
+def test_scientific_overflow_is_rejected_up_front():
+    '''Powers and exponentials whose result exponent would be too large are rejected before computing'''
+    limits = OperationLimits()
+    with pytest.raises(LimitExceeded):
+        limits.check(Decimal(10), Decimal(10 ** 9), sci.power)
+    with pytest.raises(LimitExceeded):
+        limits.check(Decimal(10 ** 7), None, sci.exponential)
+    limits.check(Decimal('1.0000001'), Decimal(10 ** 9), sci.power)
+    assert limits.run(Decimal(2), None, sci.square_root) == Decimal(2).sqrt()
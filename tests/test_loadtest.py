@@ -0,0 +1,57 @@
+'''Tests for app/utils/loadtest.py'''
+from decimal import Decimal
+from itertools import islice
+import pytest
+from app.calculator import Calculator
+from app.calculator.calc_history import CalculationHistory
+from app.calculator.calculation import Calculation
+from app.calculator.operations import Operations as op
+from app.utils.loadtest import generate_workload, run_load, main
+
+def test_generate_workload_is_deterministic():
+    '''The same seed produces the same workload'''
+    first = list(islice(generate_workload(seed=7), 50))
+    second = list(islice(generate_workload(seed=7), 50))
+    assert first == second, "Workloads with the same seed should match"
+
+def test_generate_workload_respects_mix_and_zero_rate():
+    '''Only weighted commands appear and every divide uses a zero divisor at rate 1'''
+    workload = list(islice(generate_workload(seed=1, mix={'divide': 1}, zero_divide_rate=1.0), 20))
+    assert all(name == 'divide' and b == Decimal(0) for name, _, b in workload)
+
+def test_run_load_operation_count(capsys):
+    '''A fixed operation count runs silently and records history growth'''
+    report = run_load(generate_workload(seed=3, zero_divide_rate=0.5), max_operations=200, sample_every=50)
+    assert report.operations == 200
+    assert len(report.latencies_ns) == 200
+    assert report.history_growth == 200, "Every command should add a history entry"
+    assert report.percentile(50) <= report.percentile(99)
+    assert capsys.readouterr().out == "", "The harness should not print to the console"
+
+def test_run_load_duration():
+    '''A duration bound stops the run'''
+    report = run_load(generate_workload(seed=3), duration=0.05, sample_every=100)
+    assert report.operations > 0
+    assert report.elapsed < 1
+
+def test_run_load_requires_bound():
+    '''A run must be bounded by operations or time'''
+    with pytest.raises(ValueError):
+        run_load(generate_workload())
+
+def test_main_fails_on_history_growth(capsys):
+    '''The command line entry point signals unbounded history growth'''
+    assert main(['--operations', '100', '--max-history-growth', '10']) == 1
+    assert "ops/s" in capsys.readouterr().out
+
+def test_run_load_isolates_history():
+    '''The run records into a session history of its own and leaves the default one untouched'''
+    Calculator.history.clear_history()
+    Calculator.history.add_calculation(Calculation(Decimal(1), Decimal(2), op.addition))
+    session = CalculationHistory()
+    report = run_load(generate_workload(seed=5), max_operations=100, sample_every=50, history=session)
+    assert report.samples[0].history_length == 0, "The run should start from an empty history"
+    assert report.history_bytes_growth > 0, "History memory growth should be estimated in bytes"
+    assert len(session) == 100, "The run should record into the given history"
+    assert len(Calculator.history.get_history()) == 1, "The default history should be untouched"
+    Calculator.history.clear_history()
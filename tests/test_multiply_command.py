@@ -11,3 +11,10 @@ def test_execute(mock_calculator_multiply, mock_input):
     command = MultiplyCommand()
     result = command.execute()
     assert result == Decimal('6'), "The result of multiplication should be Decimal('6')"
+
+@patch('builtins.input', side_effect=['1E+600000', '1E+600000'])
+def test_execute_limit_exceeded(mock_input):
+    '''Test execute function of MultiplyCommand when the result exceeds the limits.'''
+    command = MultiplyCommand()
+    result = command.execute()
+    assert result == "Result exponent would exceed 999999.", "Limit errors should be reported cleanly"
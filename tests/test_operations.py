@@ -1,7 +1,7 @@
 '''Test File: app/calculator/operations.py'''
 # Disable specific pylint warnings that are not relevant for this file.
 # pylint: disable=unnecessary-dunder-call, invalid-name
-from decimal import Decimal
+from decimal import Decimal, localcontext
 import pytest
 from app.calculator.operations import Operations as op
 from app.calculator.calculation import Calculation
@@ -15,3 +15,46 @@ def test_operation_divide_by_zero():
     '''Test case for division by zero'''
     with pytest.raises(ValueError):
         op.division(Decimal('5'), Decimal('0'))
+
+def test_summation_is_exact_for_decimal():
+    '''Decimal sums are exact before the final rounding, even across chunks'''
+    values = [Decimal('1E+30'), Decimal('1'), Decimal('-1E+30')]
+    assert op.summation(values, chunk_size=1) == Decimal('1')
+
+def test_summation_is_compensated_for_float():
+    '''Float sums use compensated summation'''
+    assert op.summation([0.1] * 10) == 1.0
+
+def test_summation_streams_and_runs_in_parallel():
+    '''Generators are reduced chunk by chunk, optionally in worker processes'''
+    expected = Decimal(sum(range(10000)))
+    assert op.summation(Decimal(i) for i in range(10000)) == expected
+    assert op.summation((Decimal(i) for i in range(10000)), chunk_size=2500, workers=2) == expected
+    assert op.summation([]) == Decimal(0)
+
+@pytest.mark.parametrize("reduction, reduced", [
+    (op.product, Decimal('24')),
+    (op.mean, Decimal('2.5')),
+    (op.minimum, Decimal('1')),
+    (op.maximum, Decimal('4')),
+])
+def test_reductions(reduction, reduced):
+    '''N-ary reductions give the expected result across chunk boundaries'''
+    assert reduction([Decimal(n) for n in (3, 1, 4, 2)], chunk_size=3) == reduced
+
+@pytest.mark.parametrize("reduction", [op.mean, op.minimum, op.maximum])
+def test_reductions_of_no_values(reduction):
+    '''Reductions without an identity reject empty input'''
+    with pytest.raises(ValueError):
+        reduction([])
+
+def test_product_of_floats():
+    '''Float products stay in float'''
+    assert op.product([1.5, 2.0]) == 3.0
+
+def test_parallel_product_uses_caller_context():
+    '''Worker processes reduce under the caller's Decimal context'''
+    with localcontext() as ctx:
+        ctx.prec = 50
+        values = [Decimal(1) / Decimal(7)] * 8
+        assert op.product(values, chunk_size=2, workers=2) == op.product(values, chunk_size=2)
@@ -0,0 +1,88 @@
+'''Test File: app/calculator/rational.py'''
+import pickle
+import random
+from decimal import Decimal, localcontext
+from fractions import Fraction
+import pytest
+from app.calculator.rational import Rational
+
+def test_exact_conversions():
+    '''ints, Decimals and Fractions convert without rounding'''
+    assert Rational.exact(3) == 3
+    assert Rational.exact(Decimal('0.125')).fraction == Fraction(1, 8)
+    assert Rational.exact(Fraction(2, 6)).fraction == Fraction(1, 3)
+    with pytest.raises(ValueError):
+        Rational.exact(Decimal('NaN'))
+    with pytest.raises(TypeError):
+        Rational.exact(0.5)
+
+def test_one_third_times_three_is_exact():
+    '''1/3*3 is exactly 1, where Decimal drifts'''
+    third = Rational.exact(1) / Rational.exact(3)
+    assert third * 3 == 1
+    assert str(third * 3) == '1'
+    assert Decimal(1) / Decimal(3) * 3 != 1
+
+def test_matches_fraction_on_a_random_chain():
+    '''A long chain of mixed steps agrees exactly with Fraction'''
+    rng = random.Random(7)
+    value, expected_value = Rational.exact(1), Fraction(1)
+    for _ in range(500):
+        step = Decimal(rng.randint(1, 999)) / 100
+        choice = rng.randrange(4)
+        if choice == 0:
+            value, expected_value = value + step, expected_value + Fraction(step)
+        elif choice == 1:
+            value, expected_value = value - step, expected_value - Fraction(step)
+        elif choice == 2:
+            value, expected_value = value * step, expected_value * Fraction(step)
+        else:
+            value, expected_value = value / step, expected_value / Fraction(step)
+    assert value.fraction == expected_value
+
+def test_reduction_is_deferred():
+    '''Small intermediate results are left unreduced until they outgrow their operands'''
+    half = Rational.exact(1) / 2
+    product = half * 2
+    assert (product.numerator, product.denominator) == (2, 2)
+    assert product.normalize() is product
+    assert (product.numerator, product.denominator) == (1, 1)
+    value = Rational.exact(Decimal('0.1'))
+    for _ in range(1000):
+        value = value * 3 / 3
+    assert value.bits < 200, "A cancelling chain should be reduced before it grows without bound"
+    assert value == Decimal('0.1')
+
+def test_display_rounds_once_to_the_context():
+    '''str and to_decimal round to the current Decimal context'''
+    third = Rational(1, 3)
+    with localcontext() as context:
+        context.prec = 5
+        assert str(third) == '0.33333'
+    assert third.to_decimal() == Decimal(1) / Decimal(3)
+
+def test_comparisons_hash_and_pickle():
+    '''Rationals compare and hash like the equal Fraction, Decimal or int, and pickle'''
+    assert Rational(2, 4) == Fraction(1, 2) == Rational.exact(Decimal('0.5'))
+    assert hash(Rational(2, 4)) == hash(Fraction(1, 2)) == hash(Decimal('0.5'))
+    assert hash(Rational(4, 2)) == hash(2)
+    assert Rational(1, 3) < Decimal('0.34') and Rational(1, 3) >= Rational(2, 6)
+    assert -Rational(1, 3) == Rational(-1, 3) == Rational(1, -3)
+    assert abs(Rational(-1, 3)) == Rational(1, 3)
+    assert not Rational(0, 5)
+    assert pickle.loads(pickle.dumps(Rational(1, 3))) == Rational(1, 3)
+    assert repr(Rational(2, 6)) == 'Rational(1, 3)'
+
+def test_division_by_zero():
+    '''A zero divisor or denominator raises ZeroDivisionError'''
+    with pytest.raises(ZeroDivisionError):
+        Rational(1, 3) / 0
+    with pytest.raises(ZeroDivisionError):
+        Rational(1, 0)
+
+def test_reflected_operations():
+    '''Plain numbers on the left mix exactly too'''
+    assert 1 - Rational(1, 3) == Rational(2, 3)
+    assert 1 / Rational(1, 3) == 3
+    assert Decimal('0.5') + Rational(1, 2) == 1
+    assert 2 * Rational(1, 2) == 1
@@ -0,0 +1,48 @@
+'''Tests for app/plugins/reduce/__init__.py'''
+from decimal import Decimal
+from unittest.mock import patch
+from app.plugins.reduce import ReduceCommand
+
+# decorator is used to temporarily replace objects with mock objects during the execution of the test.
+@patch('builtins.input', side_effect=['1', '1 2 3'])
+@patch('app.calculator.Calculator.sum', return_value=Decimal('6'))
+def test_execute(mock_calculator_sum, mock_input):
+    '''Test execute function of ReduceCommand.'''
+    command = ReduceCommand()
+    result = command.execute()
+    assert result == Decimal('6'), "The sum should be Decimal('6')"
+    mock_calculator_sum.assert_called_once_with([Decimal(1), Decimal(2), Decimal(3)])
+
+@patch('builtins.input', side_effect=['3', ''])
+def test_execute_mean_of_nothing(mock_input):
+    '''Test execute function of ReduceCommand with no values.'''
+    command = ReduceCommand()
+    result = command.execute()
+    assert result == "Cannot take the mean of no values."
+
+@patch('builtins.input', side_effect=['9'])
+def test_execute_invalid_choice(mock_input, capsys):
+    '''Test execute function of ReduceCommand with an invalid choice.'''
+    command = ReduceCommand()
+    assert command.execute() is None
+    assert "Invalid choice" in capsys.readouterr().out
+
+@patch('builtins.input', side_effect=['2', '1E+600000 1E+600000'])
+def test_execute_limit_exceeded(mock_input):
+    '''Test execute function of ReduceCommand when the product overflows.'''
+    command = ReduceCommand()
+    assert command.execute() == "Result exceeds the Decimal exponent range."
+
+def test_execute_streams_file(tmp_path):
+    '''Test execute function of ReduceCommand reading numbers from a file.'''
+    numbers = tmp_path / "numbers.txt"
+    numbers.write_text("1\n2\n3\n")
+    with patch('builtins.input', side_effect=['5', f'@{numbers}']):
+        assert ReduceCommand().execute() == Decimal(3)
+
+def test_execute_invalid_number_in_file(tmp_path):
+    '''Test execute function of ReduceCommand when the file holds an invalid number.'''
+    numbers = tmp_path / "numbers.txt"
+    numbers.write_text("1\nx\n")
+    with patch('builtins.input', side_effect=['1', f'@{numbers}']):
+        assert ReduceCommand().execute() == "The file contains an invalid number."
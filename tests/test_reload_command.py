@@ -0,0 +1,88 @@
+'''Tests for App.reload_plugins and app/plugins/reload/__init__.py'''
+import os
+import shutil
+import sys
+import pytest
+from app import App
+from app.plugins.reload import ReloadCommand
+
+PLUGIN_NAME = 'zz_reload_probe'
+PLUGIN_PATH = os.path.join('app', 'plugins', PLUGIN_NAME)
+PLUGIN_SOURCE = """from app.commands import Command
+
+class ProbeCommand(Command):
+    def execute(self):
+        return {value!r}
+"""
+
+def write_probe(value):
+    '''Write the probe plugin, returning value from its command'''
+    os.makedirs(PLUGIN_PATH, exist_ok=True)
+    with open(os.path.join(PLUGIN_PATH, '__init__.py'), 'w', encoding='utf-8') as source:
+        source.write(PLUGIN_SOURCE.format(value=value))
+
+@pytest.fixture
+def app_instance():
+    '''An App with its plugins loaded, and no probe plugin left behind afterwards'''
+    app = App()
+    app.load_plugins()
+    yield app
+    shutil.rmtree(PLUGIN_PATH, ignore_errors=True)
+    for name in [name for name in sys.modules if name.startswith(f'app.plugins.{PLUGIN_NAME}')]:
+        del sys.modules[name]
+
+def test_reload_without_changes_touches_nothing(app_instance):
+    '''Nothing is re-imported or replaced when no plugin changed'''
+    commands = app_instance.command_handler.commands
+    assert app_instance.reload_plugins() == {'loaded': [], 'reloaded': [], 'removed': []}
+    assert app_instance.command_handler.commands == commands
+    assert all(app_instance.command_handler.commands[name] is commands[name] for name in commands)
+
+def test_reload_picks_up_new_changed_and_removed_plugins(app_instance):
+    '''A new plugin is loaded, an edit is reloaded into a fresh module and a deleted plugin is removed'''
+    add_command = app_instance.command_handler.commands['add']
+    write_probe('first')
+    assert app_instance.reload_plugins()['loaded'] == [PLUGIN_NAME]
+    old_probe = app_instance.command_handler.commands[PLUGIN_NAME]
+    assert app_instance.command_handler.execute_command(PLUGIN_NAME) == 'first'
+
+    write_probe('second version')
+    assert app_instance.reload_plugins()['reloaded'] == [PLUGIN_NAME]
+    assert app_instance.command_handler.execute_command(PLUGIN_NAME) == 'second version'
+    assert old_probe.execute() == 'first', "A command already held keeps running the old version"
+    assert app_instance.command_handler.commands['add'] is add_command, "Unchanged plugins are not touched"
+
+    shutil.rmtree(PLUGIN_PATH)
+    assert app_instance.reload_plugins()['removed'] == [PLUGIN_NAME]
+    assert PLUGIN_NAME not in app_instance.command_handler.commands
+
+def test_touched_plugin_is_not_reloaded(app_instance):
+    '''A newer mtime with the same content only refreshes the recorded signature'''
+    write_probe('same')
+    app_instance.reload_plugins()
+    probe = app_instance.command_handler.commands[PLUGIN_NAME]
+    stat = os.stat(os.path.join(PLUGIN_PATH, '__init__.py'))
+    os.utime(os.path.join(PLUGIN_PATH, '__init__.py'), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert app_instance.reload_plugins()['reloaded'] == []
+    assert app_instance.command_handler.commands[PLUGIN_NAME] is probe
+
+def test_broken_plugin_keeps_old_version(app_instance, caplog):
+    '''An edit that fails to import leaves the working version registered'''
+    write_probe('working')
+    app_instance.reload_plugins()
+    with open(os.path.join(PLUGIN_PATH, '__init__.py'), 'a', encoding='utf-8') as source:
+        source.write("\nthis is not python\n")
+    assert app_instance.reload_plugins()['reloaded'] == []
+    assert app_instance.command_handler.execute_command(PLUGIN_NAME) == 'working'
+    assert "Error reloading plugin" in caplog.text
+
+def test_reload_command(app_instance, capsys):
+    '''The reload command reports what changed'''
+    command = app_instance.command_handler.commands['reload']
+    assert isinstance(command, ReloadCommand)
+    command.execute()
+    write_probe('new')
+    command.execute()
+    out = capsys.readouterr().out
+    assert "No plugins changed." in out
+    assert f"Loaded: {PLUGIN_NAME}" in out
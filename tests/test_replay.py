@@ -0,0 +1,50 @@
+'''Test File: app/calculator/replay.py'''
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Context, Decimal, ROUND_DOWN
+from unittest.mock import patch
+from app.calculator.calculation import Calculation as calc, ReductionCalculation
+from app.calculator.operations import Operations as op
+from app.calculator.replay import replay_history
+
+HISTORY = [
+    calc(Decimal('1'), Decimal('3'), op.division),
+    calc(Decimal('2'), Decimal('2'), op.addition),
+    calc(Decimal('2'), Decimal('3'), op.division),
+    calc(Decimal('5'), Decimal('0'), op.division),
+]
+
+def test_replay_reports_only_changed_results():
+    '''Only results that differ under the new context are reported'''
+    changes = replay_history(Context(prec=5), history=HISTORY)
+    assert [change.index for change in changes] == [0, 2]
+    assert changes[0].replayed == Decimal('0.33333')
+    assert changes[0].original == Decimal(1) / Decimal(3)
+
+def test_replay_does_not_mutate_history():
+    '''Replaying leaves the original calculations untouched'''
+    before = [repr(item) for item in HISTORY]
+    replay_history(Context(prec=3), history=HISTORY)
+    assert [repr(item) for item in HISTORY] == before
+
+def test_replay_slice_and_rounding():
+    '''A slice of the history can be replayed under a different rounding mode'''
+    changes = replay_history(Context(prec=2, rounding=ROUND_DOWN), start=2, stop=3, history=HISTORY)
+    assert len(changes) == 1 and changes[0].index == 2
+    assert changes[0].replayed == Decimal('0.66')
+
+def test_replay_in_worker_processes():
+    '''Groups above the parallel threshold give the same answer as the serial path'''
+    serial = replay_history(Context(prec=4), history=HISTORY)
+    parallel = replay_history(Context(prec=4), history=HISTORY, batch_size=1, parallel_threshold=1)
+    assert serial == parallel
+
+def test_replay_reductions():
+    '''N-ary reductions keep only their result, so they replay unchanged'''
+    mean = ReductionCalculation(op.mean, 3, Decimal(4) / Decimal(3))
+    assert not replay_history(Context(prec=3), history=[mean])
+
+def test_replay_shares_one_worker_pool():
+    '''Both the original and the replayed pass use the same worker pool'''
+    with patch('app.calculator.replay.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as mock_executor:
+        replay_history(Context(prec=4), history=HISTORY, parallel_threshold=1)
+    mock_executor.assert_called_once()
@@ -0,0 +1,87 @@
+'''Test File: app/calculator/scientific.py'''
+from decimal import Decimal, localcontext
+import pytest
+from app.calculator.scientific import ScientificOperations as sci
+
+def naive_integer_power(a, exponent):
+    '''a ** exponent by repeated multiplication, rounding every step'''
+    result = a
+    for _ in range(exponent - 1):
+        result *= a
+    return result
+
+def test_integer_power_by_squaring():
+    '''Integer powers match Decimal's own power and round only once'''
+    with localcontext() as ctx:
+        ctx.prec = 50
+        assert sci.integer_power(Decimal(2), Decimal(100)) == Decimal(2) ** 100
+        assert sci.integer_power(Decimal('1.0001'), Decimal(10000)) == Decimal('1.0001') ** 10000
+        assert sci.integer_power(Decimal(2), Decimal(-3)) == Decimal('0.125')
+        assert sci.integer_power(Decimal(7), Decimal(0)) == Decimal(1)
+
+def test_integer_power_beats_naive_accuracy():
+    '''Repeated multiplication accumulates rounding error that squaring avoids'''
+    base = Decimal('1.0001')
+    with localcontext() as ctx:
+        ctx.prec = 60
+        exact = base ** 10000
+    with localcontext() as ctx:
+        ctx.prec = 30
+        squared = sci.integer_power(base, Decimal(10000))
+        naive = naive_integer_power(base, 10000)
+        assert abs(squared - exact) <= abs(naive - exact)
+        assert squared == +exact
+
+def test_power_fractional_and_invalid():
+    '''Fractional exponents use exp(b ln a); undefined powers raise ValueError'''
+    assert sci.power(Decimal(4), Decimal('0.5')) == Decimal(2)
+    assert sci.power(Decimal(0), Decimal('0.5')) == Decimal(0)
+    with pytest.raises(ValueError):
+        sci.power(Decimal(-4), Decimal('0.5'))
+    with pytest.raises(ValueError):
+        sci.power(Decimal(0), Decimal(-1))
+    with pytest.raises(ValueError):
+        sci.integer_power(Decimal(2), Decimal('1.5'))
+
+@pytest.mark.parametrize("degree", [Decimal('Infinity'), Decimal('-Infinity')])
+def test_infinite_exponent_or_degree(degree):
+    '''An infinite exponent or root degree is a ValueError, not an OverflowError from int()'''
+    with pytest.raises(ValueError):
+        sci.power(Decimal(2), degree)
+    with pytest.raises(ValueError):
+        sci.integer_power(Decimal(2), degree)
+    with pytest.raises(ValueError):
+        sci.root(Decimal(8), degree)
+
+@pytest.mark.parametrize("precision", [10, 28, 100, 1000])
+def test_root_newton_precision_doubling(precision):
+    '''The n-th root is correct to the context precision'''
+    with localcontext() as ctx:
+        ctx.prec = precision
+        root = sci.root(Decimal(2), Decimal(3))
+        ctx.prec = precision + 10
+        reference = Decimal(2) ** (Decimal(1) / 3)
+    assert abs(root - reference) <= Decimal(10) ** (1 - precision)
+
+def test_root_special_cases():
+    '''Odd roots of negatives, exact roots and invalid degrees'''
+    assert sci.root(Decimal(-27), Decimal(3)) == Decimal(-3)
+    assert str(sci.root(Decimal(32), Decimal(5))) == '2'
+    assert sci.root(Decimal(0), Decimal(4)) == Decimal(0)
+    with pytest.raises(ValueError):
+        sci.root(Decimal(-16), Decimal(4))
+    with pytest.raises(ValueError):
+        sci.root(Decimal(2), Decimal(0))
+
+def test_sqrt_exp_and_logarithms():
+    '''The unary functions ignore b and reject values outside their domain'''
+    assert sci.square_root(Decimal(9)) == Decimal(3)
+    assert sci.exponential(Decimal(0)) == Decimal(1)
+    assert sci.natural_log(Decimal(1)) == Decimal(0)
+    assert sci.log10(Decimal(1000)) == Decimal(3)
+    assert sci.logarithm(Decimal(8), Decimal(2)) == Decimal(3)
+    for function in (sci.square_root, sci.natural_log, sci.log10):
+        with pytest.raises(ValueError):
+            function(Decimal(-1))
+    with pytest.raises(ValueError):
+        sci.logarithm(Decimal(8), Decimal(1))
@@ -0,0 +1,36 @@
+'''Tests for app/plugins/scientific/__init__.py'''
+from decimal import Decimal
+from unittest.mock import patch
+from app.plugins.scientific import ScientificCommand
+
+@patch('builtins.input', side_effect=['1', '2', '10'])
+def test_execute_power(mock_input, capsys):
+    '''Test execute function of ScientificCommand for a binary operation.'''
+    assert ScientificCommand().execute() == Decimal(1024)
+    assert "The result of power(2, 10) is: 1024" in capsys.readouterr().out
+
+@patch('builtins.input', side_effect=['3', '16'])
+def test_execute_sqrt(mock_input):
+    '''Test execute function of ScientificCommand for a unary operation.'''
+    assert ScientificCommand().execute() == Decimal(4)
+
+@patch('builtins.input', side_effect=['5', '-1'])
+def test_execute_undefined(mock_input):
+    '''Test execute function of ScientificCommand outside an operation's domain.'''
+    assert ScientificCommand().execute() == "Logarithms are only defined for positive numbers."
+
+@patch('builtins.input', side_effect=['2', '8', 'Infinity'])
+def test_execute_infinite_degree(mock_input):
+    '''Test execute function of ScientificCommand with an infinite root degree.'''
+    assert ScientificCommand().execute() == "The root degree must be a positive integer."
+
+@patch('builtins.input', side_effect=['4', '1E+7'])
+def test_execute_limit_exceeded(mock_input):
+    '''Test execute function of ScientificCommand when the result would overflow.'''
+    assert ScientificCommand().execute().startswith("Result exponent would exceed")
+
+@patch('builtins.input', side_effect=['9'])
+def test_execute_invalid_choice(mock_input, capsys):
+    '''Test execute function of ScientificCommand with an invalid choice.'''
+    assert ScientificCommand().execute() is None
+    assert "Invalid choice" in capsys.readouterr().out
@@ -0,0 +1,57 @@
+'''Tests for app/plugins/solve/__init__.py'''
+from decimal import Decimal
+from unittest.mock import patch
+import pytest
+from app.calculator import Calculator
+from app.calculator.solver import Solution
+from app.plugins.solve import SolveCommand
+
+@patch('builtins.input', side_effect=['1', '1 / x', '-1', '1', '1'])
+def test_execute_tabulate(mock_input, capsys):
+    '''Test execute function of SolveCommand tabulating a formula with an undefined point.'''
+    assert SolveCommand().execute() == 3
+    out = capsys.readouterr().out
+    assert "-1\t-1\n0\tundefined\n1\t1\n" in out
+    assert "3 point(s) in" in out
+
+def test_execute_brent_with_cells(monkeypatch, capsys):
+    '''Test execute function of SolveCommand finding a rate with named cells as constants.'''
+    monkeypatch.setattr(Calculator, 'cells', type(Calculator.cells)())
+    Calculator.cells.set('price', '1000')
+    with patch('builtins.input', side_effect=['4', 'price * (1 + x) ** 10 - 2 * price', '0', '1', '']):
+        solution = SolveCommand().execute()
+    assert isinstance(solution, Solution) and solution.converged
+    assert abs(solution.root - Decimal('0.0717734625362931642130')) < Decimal('1e-20')
+    assert "brent: x = 0.07177346253629316421" in capsys.readouterr().out
+
+@pytest.mark.parametrize("answers, message", [
+    (['2', 'x * x + 1', '-1', '1', ''], "have the same sign"),
+    (['3', 'x * y', '1', ''], "Unknown name(s) in formula: y"),
+])
+def test_execute_errors(answers, message, capsys):
+    '''Test execute function of SolveCommand with an unsolvable problem and an unknown name.'''
+    with patch('builtins.input', side_effect=answers):
+        assert message in SolveCommand().execute()
+    assert message in capsys.readouterr().out
+
+@patch('builtins.input', side_effect=['3', 'x - 1', '0', 'tiny'])
+def test_execute_invalid_tolerance(mock_input, capsys):
+    '''Test execute function of SolveCommand with an invalid tolerance.'''
+    assert SolveCommand().execute() is None
+    assert "Invalid tolerance." in capsys.readouterr().out
+
+@patch('builtins.input', side_effect=['9'])
+def test_execute_invalid_choice(mock_input, capsys):
+    '''Test execute function of SolveCommand with an invalid choice.'''
+    assert SolveCommand().execute() is None
+    assert "Invalid choice" in capsys.readouterr().out
+
+@pytest.mark.parametrize("answers, message", [
+    (['1', 'x', '0', '1E+12', '1'], "steps requested"),
+    (['2', 'x - 1', '0', '1E+200000000', ''], "Operand exponent exceeds"),
+])
+def test_execute_limits(answers, message, capsys):
+    '''Test execute function of SolveCommand with a grid past the step limit and an operand past the exponent limit.'''
+    with patch('builtins.input', side_effect=answers):
+        assert message in SolveCommand().execute()
+    assert message in capsys.readouterr().out
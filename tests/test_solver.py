@@ -0,0 +1,126 @@
+'''Test File: app/calculator/solver.py'''
+import threading
+import time
+from decimal import Decimal
+import pytest
+from app.calculator.limits import LimitExceeded, OperationCancelled, OperationLimits
+from app.calculator.rational import Rational
+from app.calculator.solver import Formula, bisection, brent, default_tolerance, newton, tabulate
+
+DOUBLING = '1000 * (1 + x) ** 10 - 2000'
+DOUBLING_RATE = Decimal(2) ** (Decimal(1) / 10) - 1
+
+def test_formula_point_and_column_agree():
+    '''Evaluating a column gives the same values as evaluating each point'''
+    formula = Formula('ln(x) + sqrt(x) * 2 - exp(x) / 10 + -x')
+    xs = [Decimal(n) / 4 for n in range(1, 40)]
+    assert formula.evaluate(xs) == [formula(point) for point in xs]
+    assert Formula('2 + 3').evaluate([Decimal(1), Decimal(2)]) == [5, 5]
+
+def test_undefined_points_do_not_stop_a_column():
+    '''A point where the formula is undefined is None in a column, and raises on its own'''
+    formula = Formula('1 / x + sqrt(x)')
+    assert formula.evaluate([Decimal(-1), Decimal(0), Decimal(1)]) == [None, None, Decimal(2)]
+    with pytest.raises(ValueError):
+        formula(0)
+
+@pytest.mark.parametrize("source, message", [
+    ('x +', "Invalid formula"),
+    ('x % 2', "Unsupported operator"),
+    ('sin(x)', "Unsupported function"),
+    ('x < 1', "Unsupported expression"),
+    ('x * rate', "Unknown name(s) in formula: rate"),
+])
+def test_invalid_formulas(source, message):
+    '''Only the supported operators, functions and known names are accepted'''
+    with pytest.raises(ValueError, match=message.replace('(', r'\(').replace(')', r'\)')):
+        Formula(source)
+
+def test_constants():
+    '''Other names are constants, converted to the formula's number type'''
+    formula = Formula('price * (1 + rate)', constants={'price': Decimal(100), 'rate': Rational(7, 100)})
+    assert formula(0) == Decimal('107.00')
+
+def test_tabulate_streams_chunks():
+    '''Grid points are computed from their index and evaluated a chunk at a time'''
+    rows = tabulate(Formula('x * x'), Decimal(0), Decimal(1), Decimal('0.1'), chunk_size=3)
+    first = next(rows)
+    assert first == (Decimal(0), Decimal(0))
+    rest = list(rows)
+    assert len(rest) == 10
+    assert rest[-1] == (Decimal('1.0'), Decimal('1.00'))
+    assert rest[2][0] == Decimal('0.3')
+    assert len(list(tabulate(Formula('x'), Decimal(0), Decimal('0.95'), Decimal('0.1')))) == 10
+
+@pytest.mark.parametrize("start, stop, step", [(0, 1, 0), (0, 1, -1)])
+def test_tabulate_bad_grid(start, stop, step):
+    '''A zero step, or one pointing away from the last point, is rejected'''
+    with pytest.raises(ValueError):
+        list(tabulate(Formula('x'), Decimal(start), Decimal(stop), Decimal(step)))
+
+def test_tabulate_cancelled():
+    '''Tabulation stops between chunks once cancelled'''
+    cancel = threading.Event()
+    rows = tabulate(Formula('x'), Decimal(0), Decimal(10 ** 6), Decimal(1), chunk_size=10, cancel_event=cancel)
+    next(rows)
+    cancel.set()
+    with pytest.raises(OperationCancelled):
+        list(rows)
+
+def test_tabulate_limits():
+    '''A grid past max_points, or with an infinite end, is rejected before anything is computed; check runs per point'''
+    with pytest.raises(LimitExceeded):
+        next(tabulate(Formula('x'), Decimal(0), Decimal('1E+12'), Decimal(1), max_points=1000))
+    with pytest.raises(ValueError):
+        list(tabulate(Formula('x'), Decimal(0), Decimal('Infinity'), Decimal(1)))
+    calls = []
+    assert len(list(tabulate(Formula('x'), 0, 9, 1, chunk_size=4, check=lambda: calls.append(1)))) == 10
+    assert len(calls) == 10
+
+def test_tabulate_stops_at_time_limit():
+    '''A checkpoint stops a long table at the time limit'''
+    limits = OperationLimits(max_seconds=0.05, check_every=64)
+    rows = tabulate(Formula('x * x'), Decimal(0), Decimal(10 ** 6), Decimal(1), check=limits.checkpoint())
+    with pytest.raises(LimitExceeded):
+        for _ in rows:
+            time.sleep(0.0001)
+
+def test_float_grid_keeps_last_point():
+    '''A float span a few ulps short of a whole number of steps still reaches the last point'''
+    assert [x for x, _ in tabulate(Formula('x', exact=False), 0, 0.3, 0.1)] == pytest.approx([0, 0.1, 0.2, 0.3])
+    assert len(list(tabulate(Formula('x', exact=False), 0, 0.35, 0.1))) == 4
+
+@pytest.mark.parametrize("method", [bisection, brent])
+def test_bracketing_methods(method):
+    '''Bisection and Brent find the doubling rate to the tolerance'''
+    solution = method(Formula(DOUBLING), Decimal(0), Decimal(1), Decimal('1e-15'))
+    assert solution.converged
+    assert abs(solution.root - DOUBLING_RATE) <= Decimal('1e-15')
+    assert f"after {solution.iterations} iteration(s)" in str(solution)
+
+def test_brent_beats_bisection():
+    '''Brent needs far fewer iterations than bisection for the same tolerance'''
+    formula, tolerance = Formula(DOUBLING), default_tolerance(True)
+    assert brent(formula, Decimal(0), Decimal(1), tolerance).iterations * 3 < bisection(formula, Decimal(0), Decimal(1), tolerance).iterations
+
+def test_newton():
+    '''Newton converges from a nearby guess with a numerical derivative'''
+    solution = newton(Formula(DOUBLING), Decimal('0.05'), Decimal('1e-20'))
+    assert solution.converged and solution.iterations < 10
+    assert abs(solution.root - DOUBLING_RATE) <= Decimal('1e-20')
+    with pytest.raises(ValueError, match="derivative is zero"):
+        newton(Formula('x * x + 1'), Decimal(0), Decimal('1e-10'))
+
+def test_root_finders_report_failure():
+    '''A bracket without a sign change is rejected; running out of iterations is reported'''
+    with pytest.raises(ValueError, match="same sign"):
+        bisection(Formula('x * x + 1'), Decimal(-1), Decimal(1), Decimal('1e-10'))
+    solution = bisection(Formula(DOUBLING), Decimal(0), Decimal(1), Decimal('1e-20'), max_iterations=5)
+    assert not solution.converged
+    assert "not converged" in str(solution)
+
+def test_float_formulas():
+    '''Float formulas tabulate and solve with doubles'''
+    formula = Formula('x * x - 2', exact=False)
+    assert list(tabulate(formula, 0, 1, 0.5)) == [(0.0, -2.0), (0.5, -1.75), (1.0, -1.0)]
+    assert abs(brent(formula, 0.0, 2.0, 1e-12).root - 2 ** 0.5) < 1e-12
@@ -0,0 +1,66 @@
+'''Test File: app/calculator/stats.py'''
+import random
+from decimal import Decimal
+import pytest
+from app.calculator.stats import KLLSketch, StreamSummary, describe
+
+def _values(count, seed=1):
+    '''Seeded integers in [0, 10**6]'''
+    rng = random.Random(seed)
+    return [Decimal(rng.randint(0, 10 ** 6)) for _ in range(count)]
+
+def test_moments_are_exact():
+    '''Mean and variance match the textbook definitions and min/max are tracked'''
+    summary = StreamSummary().update(Decimal(n) for n in ('2', '4', '4', '4', '5', '5', '7', '9'))
+    assert summary.count == 8
+    assert summary.mean == Decimal(5)
+    assert summary.variance == Decimal(32) / 7
+    assert (summary.minimum, summary.maximum) == (Decimal(2), Decimal(9))
+
+def test_variance_has_no_cancellation():
+    '''A large offset does not swamp a small spread'''
+    summary = StreamSummary().update(Decimal('1E+20') + n for n in (1, 2, 3))
+    assert summary.variance == Decimal(1)
+
+def test_undefined_statistics():
+    '''Statistics that need values raise ValueError'''
+    summary = StreamSummary().update([Decimal(1)])
+    with pytest.raises(ValueError):
+        _ = summary.variance
+    with pytest.raises(ValueError):
+        _ = StreamSummary().mean
+    assert str(StreamSummary()) == "count: 0"
+
+def test_sketch_quantiles_are_close():
+    '''Quantiles from the sketch are within a small rank error of the exact ones'''
+    values = _values(50000)
+    sketch = KLLSketch(k=200, seed=3)
+    for value in values:
+        sketch.update(value)
+    ordered = sorted(values)
+    for q in (Decimal('0.1'), Decimal('0.5'), Decimal('0.9')):
+        rank = ordered.index(sketch.quantile(q)) / len(ordered)
+        assert abs(rank - float(q)) < 0.02
+    assert sum(len(compactor) for compactor in sketch.compactors) < 1000, "The sketch should stay small"
+    assert KLLSketch().quantile(Decimal('0.5')) is None
+
+def test_merged_sketches_match_one_sketch():
+    '''Sketches of two halves merge into one with the same accuracy'''
+    values = _values(20000)
+    left, right = KLLSketch(seed=1), KLLSketch(seed=2)
+    for value in values[:10000]:
+        left.update(value)
+    for value in values[10000:]:
+        right.update(value)
+    left.merge(right)
+    rank = sorted(values).index(left.quantile(Decimal('0.5'))) / len(values)
+    assert abs(rank - 0.5) < 0.02
+
+def test_describe_is_reproducible_and_parallel():
+    '''The same seed gives the same summary, whether or not chunks run in worker processes'''
+    values = _values(20000)
+    first = describe(iter(values), chunk_size=1000, seed=7)
+    assert str(describe(iter(values), chunk_size=1000, seed=7)) == str(first)
+    assert str(describe(iter(values), chunk_size=1000, workers=2, seed=7)) == str(first)
+    assert first.count == 20000
+    assert first.mean == sum(values) / len(values)
@@ -0,0 +1,29 @@
+'''Tests for app/plugins/stats/__init__.py'''
+from decimal import Decimal
+from unittest.mock import patch
+from app.plugins.stats import StatsCommand
+
+@patch('builtins.input', side_effect=['1 2 3 4'])
+def test_execute(mock_input, capsys):
+    '''Test execute function of StatsCommand.'''
+    summary = StatsCommand().execute()
+    assert summary.count == 4
+    assert summary.mean == Decimal('2.5')
+    output = capsys.readouterr().out
+    assert "count: 4" in output
+    assert "p50: 2" in output
+
+def test_execute_streams_file(tmp_path):
+    '''Test execute function of StatsCommand reading numbers from a file.'''
+    numbers = tmp_path / "numbers.txt"
+    numbers.write_text("\n".join(str(n) for n in range(1, 10001)))
+    with patch('builtins.input', side_effect=[f'@{numbers}']):
+        summary = StatsCommand().execute()
+    assert (summary.count, summary.minimum, summary.maximum) == (10000, Decimal(1), Decimal(10000))
+
+def test_execute_invalid_number_in_file(tmp_path):
+    '''Test execute function of StatsCommand when the file holds an invalid number.'''
+    numbers = tmp_path / "numbers.txt"
+    numbers.write_text("1\nx\n")
+    with patch('builtins.input', side_effect=[f'@{numbers}']):
+        assert StatsCommand().execute() == "The file contains an invalid number."
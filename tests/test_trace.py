@@ -0,0 +1,112 @@
+'''Tests for app/utils/trace.py and capture in App.start'''
+import time
+from unittest.mock import patch
+import pytest
+from app import App
+from app.calculator import Calculator
+from app.commands import CommandHandler
+from app.plugins.add import AddCommand
+from app.plugins.divide import DivideCommand
+from app.utils.trace import TraceRecord, TraceRecorder, read_trace, replay_trace, main
+
+@pytest.fixture
+def handler():
+    '''A handler with the add and divide commands'''
+    command_handler = CommandHandler()
+    command_handler.register_command('add', AddCommand())
+    command_handler.register_command('divide', DivideCommand())
+    return command_handler
+
+def test_recorder_round_trip(tmp_path):
+    '''Commands and their prompt answers come back in order, with increasing offsets'''
+    path = str(tmp_path / "session.trace")
+    recorder = TraceRecorder(path)
+    with patch('builtins.input', side_effect=['5', '10', '1', '0']):
+        with recorder.command('add'):
+            input("first: ")
+            input("second: ")
+        with recorder.command('divide'):
+            input("first: ")
+            input("second: ")
+    with recorder.command('history'):
+        pass
+    recorder.close()
+    records = list(read_trace(path))
+    assert [(record.command, record.answers) for record in records] == \
+        [('add', ['5', '10']), ('divide', ['1', '0']), ('history', [])]
+    assert records[0].offset_us <= records[1].offset_us <= records[2].offset_us
+    assert recorder.records == 3
+
+def test_recorder_gzip(tmp_path):
+    '''A .gz trace is compressed and reads back the same'''
+    path = str(tmp_path / "session.trace.gz")
+    recorder = TraceRecorder(path)
+    with recorder.command('menu'):
+        pass
+    recorder.close()
+    assert open(path, 'rb').read(2) == b'\x1f\x8b', "Expected a gzip file"
+    assert [record.command for record in read_trace(path)] == ['menu']
+
+def test_read_trace_rejects_other_files(tmp_path):
+    '''A file without the trace header is refused'''
+    path = tmp_path / "notes.txt"
+    path.write_text("add\n")
+    with pytest.raises(ValueError):
+        list(read_trace(str(path)))
+
+def test_app_start_captures(tmp_path, monkeypatch):
+    '''With CALC_CAPTURE set, App.start writes every command it runs to the trace'''
+    path = str(tmp_path / "captured.trace")
+    monkeypatch.setenv('CALC_CAPTURE', path)
+    app = App()
+    with patch('builtins.input', side_effect=['add', '5', '10', 'nope', 'exit']), pytest.raises(SystemExit):
+        app.start()
+    assert [(record.command, record.answers) for record in read_trace(path)] == [('add', ['5', '10']), ('nope', [])]
+
+def test_app_start_without_capture(tmp_path, monkeypatch):
+    '''Capture is opt-in'''
+    monkeypatch.delenv('CALC_CAPTURE', raising=False)
+    assert App().start_capture() is None
+
+def test_replay_fast(handler, capsys):
+    '''Commands replay silently, with answers from the trace; failures are counted, latencies grouped by command'''
+    records = [TraceRecord(0, 10, 'add', ['5', '10']), TraceRecord(5, 10, 'divide', ['1', '0']),
+               TraceRecord(9, 10, 'add', ['1', '2']), TraceRecord(12, 10, 'nope', []),
+               TraceRecord(15, 10, 'add', ['1'])]
+    with Calculator.session() as history:
+        report = replay_trace(iter(records), handler)
+    assert report.operations == 5
+    assert report.errors == 2, "The unknown command and the one missing an answer should fail"
+    assert {name: len(latencies) for name, latencies in report.latencies_ns.items()} == {'add': 3, 'divide': 1, 'nope': 1}
+    assert len(history) == 3
+    assert report.percentile(50, 'add') <= report.percentile(100, 'add') <= report.percentile(100)
+    assert "add" in report.summary()
+    assert capsys.readouterr().out == "", "Replay should not print command output"
+
+def test_replay_survives_unexpected_errors(handler, caplog):
+    '''A command that raises anything is logged and counted, and the rest of the trace still replays'''
+    records = [TraceRecord(0, 10, 'divide', ['1', '2']), TraceRecord(5, 10, 'add', ['1', '2'])]
+    with patch.object(DivideCommand, 'execute', side_effect=OverflowError("too big")), Calculator.session() as history:
+        report = replay_trace(iter(records), handler)
+    assert (report.operations, report.errors, len(history)) == (2, 1, 1)
+    assert "Replayed command 1 ('divide') failed: OverflowError: too big" in caplog.text
+
+def test_replay_original_pacing(handler):
+    '''With original pacing each command waits for its recorded offset'''
+    records = [TraceRecord(0, 0, 'add', ['1', '2']), TraceRecord(50_000, 0, 'add', ['3', '4'])]
+    started = time.perf_counter()
+    with Calculator.session():
+        replay_trace(iter(records), handler, original_pacing=True)
+    assert time.perf_counter() - started >= 0.05
+
+def test_main(tmp_path, capsys):
+    '''The command line replays a trace through every plugin and prints the summary'''
+    path = str(tmp_path / "session.trace")
+    recorder = TraceRecorder(path)
+    with patch('builtins.input', side_effect=['2', '3']), recorder.command('multiply'):
+        input()
+        input()
+    recorder.close()
+    assert main([path]) == 0
+    out = capsys.readouterr().out
+    assert "Replayed 1 commands" in out and "multiply" in out
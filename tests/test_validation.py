@@ -3,7 +3,7 @@
 # pylint: disable=unnecessary-dunder-call, invalid-name
 from decimal import Decimal
 import pytest
-from app.utils.validation import validate_decimal_input
+from app.utils.validation import validate_decimal_input, validate_decimal_list_input, parse_decimals, validate_matrix_input
 
 @pytest.fixture
 def mock_input(monkeypatch):
@@ -27,3 +27,31 @@ def test_validate_decimal_input(input_values, expected_output, capsys, mock_inpu
 
     captured = capsys.readouterr()
     assert "Invalid input. Please enter a valid number." in captured.out
+
+def test_parse_decimals():
+    '''Numbers separated by whitespace or commas are parsed across lines'''
+    assert list(parse_decimals(["1, 2.5  3\n", "\n", "-4,5"])) == [Decimal(n) for n in ('1', '2.5', '3', '-4', '5')]
+
+def test_validate_decimal_list_input_from_file(tmp_path, capsys, monkeypatch):
+    '''An invalid list and a missing file are rejected before a file of numbers is read'''
+    numbers = tmp_path / "numbers.txt"
+    numbers.write_text("1\n2\n3\n")
+    inputs = iter(['1 x', '@missing.txt', f'@{numbers}'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    assert list(validate_decimal_list_input('Enter numbers: ')) == [Decimal(1), Decimal(2), Decimal(3)]
+
+    captured = capsys.readouterr()
+    assert "Invalid input." in captured.out
+    assert "Could not read that file." in captured.out
+
+def test_validate_matrix_input(tmp_path, capsys, monkeypatch):
+    '''Ragged rows are rejected; rows come from ';' inline or from lines of a file'''
+    matrix = tmp_path / "matrix.txt"
+    matrix.write_text("1 2\n\n3 4\n")
+    inputs = iter(['1 2; 3', '1; 2', f'@{matrix}'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    assert validate_matrix_input('Enter a matrix: ') == [[Decimal(1)], [Decimal(2)]]
+    assert validate_matrix_input('Enter a matrix: ') == [[Decimal(1), Decimal(2)], [Decimal(3), Decimal(4)]]
+    assert "Every row must have the same number of values." in capsys.readouterr().out
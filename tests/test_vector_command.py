@@ -0,0 +1,30 @@
+'''Tests for app/plugins/vector/__init__.py'''
+from decimal import Decimal
+from unittest.mock import patch
+from app.calculator.vectors import Matrix
+from app.plugins.vector import VectorCommand
+
+@patch('builtins.input', side_effect=['3', '1.5 2; 3 4', '2'])
+def test_execute_scale(mock_input, capsys):
+    '''Test execute function of VectorCommand broadcasting a scalar.'''
+    assert VectorCommand().execute() == Matrix([[Decimal('3.0'), 4], [6, 8]])
+    assert "The result of vector_multiply is: 3.0 4; 6 8" in capsys.readouterr().out
+
+def test_execute_dot_from_files(tmp_path):
+    '''Test execute function of VectorCommand reading vectors from files.'''
+    left, right = tmp_path / "left.txt", tmp_path / "right.txt"
+    left.write_text("1 2 3\n")
+    right.write_text("4 5 6\n")
+    with patch('builtins.input', side_effect=['5', f'@{left}', f'@{right}']):
+        assert VectorCommand().execute() == Decimal(32)
+
+@patch('builtins.input', side_effect=['4', '1 2', '0 1'])
+def test_execute_divide_by_zero(mock_input):
+    '''Test execute function of VectorCommand with a zero divisor.'''
+    assert VectorCommand().execute() == "Cannot divide by zero."
+
+@patch('builtins.input', side_effect=['9'])
+def test_execute_invalid_choice(mock_input, capsys):
+    '''Test execute function of VectorCommand with an invalid choice.'''
+    assert VectorCommand().execute() is None
+    assert "Invalid choice" in capsys.readouterr().out
@@ -0,0 +1,62 @@
+'''Test File: app/calculator/vectors.py'''
+from decimal import Decimal, localcontext
+import pytest
+from app.calculator import vectors
+from app.calculator.vectors import Matrix, VectorOperations as vec
+
+def test_elementwise_with_scalar_broadcasting():
+    '''Element-wise operations match shapes and broadcast a single value'''
+    prices = Matrix([[Decimal('1.10'), Decimal('2.20')], [Decimal('3.30'), Decimal('4.40')]])
+    assert vec.vector_multiplication(prices, Matrix([[2]])) == Matrix([[Decimal('2.20'), Decimal('4.40')], [Decimal('6.60'), Decimal('8.80')]])
+    assert vec.vector_subtraction(Matrix([[10]]), prices).rows[1] == (Decimal('6.70'), Decimal('5.60'))
+    assert vec.vector_addition(prices, prices) == vec.vector_multiplication(prices, Matrix([[2]]))
+    with pytest.raises(ValueError):
+        vec.vector_addition(prices, Matrix([[1, 2, 3]]))
+
+def test_division_by_zero():
+    '''Any zero divisor makes the whole division undefined'''
+    with pytest.raises(ValueError, match="Cannot divide by zero."):
+        vec.vector_division(Matrix([[1, 2]]), Matrix([[1, 0]]))
+
+def test_exact_dot_product_rounds_once():
+    '''The exact dot product keeps every product and partial sum exact'''
+    left = Matrix([[Decimal('1E+30'), 1, Decimal('-1E+30')]])
+    right = Matrix([[1, 1, 1]])
+    with localcontext() as ctx:
+        ctx.prec = 5
+        assert vec.dot_product(left, right) == Decimal(1)
+    with pytest.raises(ValueError):
+        vec.dot_product(left, Matrix([[1, 2]]))
+
+def test_matrix_multiplication():
+    '''Matrix product of compatible shapes'''
+    product = vec.matrix_multiplication(Matrix([[1, 2], [3, 4]]), Matrix([[5], [6]]))
+    assert product == Matrix([[17], [39]])
+    with pytest.raises(ValueError):
+        vec.matrix_multiplication(Matrix([[1, 2]]), Matrix([[1, 2]]))
+
+def test_float_mode_without_numpy(monkeypatch):
+    '''Float matrices compute with plain floats when NumPy is not installed'''
+    monkeypatch.setattr(vectors, 'np', None)
+    left = Matrix([[1, 2], [3, 4]], exact=False)
+    assert vec.vector_division(left, Matrix([[2]], exact=False)).rows == ((0.5, 1.0), (1.5, 2.0))
+    assert vec.matrix_multiplication(left, left).rows == ((7.0, 10.0), (15.0, 22.0))
+    assert vec.dot_product(Matrix([[0.1] * 10], exact=False), Matrix([[1] * 10], exact=False)) == 1.0
+    with pytest.raises(ValueError):
+        vec.vector_addition(left, Matrix([[1]]))
+
+def test_float_mode_with_numpy():
+    '''Float matrices compute with NumPy when it is installed, with the same results'''
+    pytest.importorskip('numpy')
+    left = Matrix([[1, 2], [3, 4]], exact=False)
+    assert vec.vector_division(left, Matrix([[2]], exact=False)).rows == ((0.5, 1.0), (1.5, 2.0))
+    assert vec.matrix_multiplication(left, left).rows == ((7.0, 10.0), (15.0, 22.0))
+
+def test_matrix_validation_and_repr():
+    '''Matrices must be rectangular; large ones are shown by shape'''
+    with pytest.raises(ValueError):
+        Matrix([[1, 2], [3]])
+    with pytest.raises(ValueError):
+        Matrix([])
+    assert repr(Matrix([[1, 2]])) == "[1 2]"
+    assert repr(Matrix([range(20)])) == "<1x20 matrix>"